@@ -1,29 +1,39 @@
+import os
 import streamlit as st
-import pywhatkit as kit
 import smtplib
 from email.message import EmailMessage
-from twilio.rest import Client
-import requests
-from bs4 import BeautifulSoup
-import tweepy
-import paramiko
-import google.generativeai as genai
-import speech_recognition as sr
-import pyttsx3
-import cv2
+from nl_cache import NLCommandCache
+from gemini_client import GeminiClient, GeminiError
+from gemini_metrics import GeminiMetrics, start_metrics_server
+from speech_queue import SentenceSplitter, SpeechQueue
 import time
 
+# Heavy third-party packages (twilio, tweepy, pywhatkit, cv2, paramiko,
+# google.generativeai, speech_recognition, pyttsx3, requests/bs4) are imported
+# inside the helpers that use them, and clients are built once per process
+# via st.cache_resource, so opening "Home" pays for none of them.
+# `python import_profile.py app.py` reports what is still imported up front.
+
 # Gemini API setup (direct key as you requested)
-genai.configure(api_key="hide")
-model = genai.GenerativeModel('gemini-1.5-flash')
+GEMINI_MODEL = 'gemini-1.5-flash'
+
+@st.cache_resource
+def get_gemini_model():
+    import google.generativeai as genai
+    genai.configure(api_key="hide")
+    return genai.GenerativeModel(GEMINI_MODEL)
 
-engine = pyttsx3.init()
+@st.cache_resource
+def get_speech_queue():
+    import pyttsx3
+    return SpeechQueue(pyttsx3.init)
 
 # ======================
 # Utility Functions
 # ======================
 
 def send_whatsapp_twilio(account_sid, auth_token, from_whatsapp, to_whatsapp, message):
+    from twilio.rest import Client
     client = Client(account_sid, auth_token)
     message = client.messages.create(
         body=message,
@@ -43,6 +53,7 @@ def send_email_gmail(subject, body, to_email, from_email, password):
         server.send_message(msg)
 
 def send_sms_twilio(account_sid, auth_token, from_number, to_number, message):
+    from twilio.rest import Client
     client = Client(account_sid, auth_token)
     message = client.messages.create(
         body=message,
@@ -52,6 +63,7 @@ def send_sms_twilio(account_sid, auth_token, from_number, to_number, message):
     return message.sid
 
 def make_call(account_sid, auth_token, from_number, to_number, twiml_url):
+    from twilio.rest import Client
     client = Client(account_sid, auth_token)
     call = client.calls.create(
         to=to_number,
@@ -61,21 +73,26 @@ def make_call(account_sid, auth_token, from_number, to_number, twiml_url):
     return call.sid
 
 def post_tweet(api_key, api_secret, access_token, access_secret, text):
+    import tweepy
     auth = tweepy.OAuth1UserHandler(api_key, api_secret, access_token, access_secret)
     api = tweepy.API(auth)
     api.update_status(status=text)
     return "Tweet posted successfully!"
 
 def download_data(url):
+    import requests
+    from bs4 import BeautifulSoup
     response = requests.get(url)
     soup = BeautifulSoup(response.text, 'html.parser')
     return soup.prettify()
 
 def send_whatsapp_kit(number, message):
+    import pywhatkit as kit
     kit.sendwhatmsg_instantly(number, message, wait_time=15, tab_close=True)
     return "WhatsApp message sent!"
 
 def droidcam_stream(ip, port):
+    import cv2
     url = f"http://{ip}:{port}/video"
     cap = cv2.VideoCapture(url)
     placeholder = st.empty()
@@ -94,15 +111,86 @@ def droidcam_stream(ip, port):
     cv2.destroyAllWindows()
     placeholder.empty()
 
+@st.cache_resource
+def get_gemini_metrics():
+    # Per-process call accounting; also served on GEMINI_METRICS_PORT for
+    # Prometheus when that variable is set.
+    metrics = GeminiMetrics()
+    port = os.environ.get("GEMINI_METRICS_PORT")
+    if port:
+        start_metrics_server(metrics, int(port))
+    return metrics
+
+@st.cache_resource
+def get_gemini_client():
+    # One client per process: identical prompts from concurrent sessions are
+    # merged and every page shares the same concurrency and rate budget.
+    return GeminiClient(get_gemini_model(), metrics=get_gemini_metrics())
+
+@st.cache_resource
+def get_nl_cache():
+    return NLCommandCache(os.path.join(os.path.dirname(os.path.abspath(__file__)), "nl_cache.sqlite3"))
+
+# NL_BACKEND picks the command generator: "gemini" (default), "template"
+# (offline rules + menu index), or a chain such as "template+gemini" or
+# "template+llama" (LLAMA_MODEL_PATH points at a local GGUF model).
+NL_BACKEND = os.environ.get("NL_BACKEND", "gemini")
+
+@st.cache_resource
+def get_nl_backend():
+    from nl_backends import build_backend
+    from intent_index import IntentIndex
+    from linux_menu import LINUX_MENU_50, MENU_SYNONYMS
+    return build_backend(
+        NL_BACKEND, gemini_client=get_gemini_client, gemini_model=GEMINI_MODEL,
+        site="yoursarthi", intent_index=IntentIndex(LINUX_MENU_50, MENU_SYNONYMS),
+    )
+
 def yoursarthi(prompt):
-    response = model.generate_content(
-        f'''You are a Linux engineer. Convert the user prompt into a single Linux command.
-        Do not use quotes or bash script, only single command like: date, ls, etc.
-        Prompt: {prompt}'''
+    backend = get_nl_backend()
+    cache = get_nl_cache()
+    if backend.cache_key:
+        command, match = cache.lookup(prompt, backend.cache_key)
+        if command:
+            get_gemini_metrics().record_lookup("yoursarthi", match)
+            return command
+    command, source = backend.translate(prompt)
+    if not command:
+        return None
+    if source == "template":
+        get_gemini_metrics().record_lookup("yoursarthi", source)
+    elif backend.cache_key:
+        cache.put(prompt, backend.cache_key, command)
+    return command
+
+@st.cache_resource
+def get_ssh_pool():
+    # Shared across reruns and sessions so authenticated transports are reused.
+    from ssh_pool import SSHPool
+    return SSHPool()
+
+def render_gemini_diagnostics():
+    import pandas as pd
+    metrics = get_gemini_metrics()
+    if st.button("Reset counters"):
+        metrics.reset()
+    rows = metrics.rows()
+    if rows:
+        st.dataframe(pd.DataFrame(rows), use_container_width=True)
+    else:
+        st.info("No Gemini calls recorded in this process yet.")
+    text = metrics.to_prometheus()
+    port = os.environ.get("GEMINI_METRICS_PORT")
+    st.caption(
+        f"Prometheus scrape endpoint: http://<this host>:{port}/metrics" if port
+        else "Set GEMINI_METRICS_PORT to serve these figures on /metrics for Prometheus."
     )
-    return response.text.strip()
+    st.download_button("Download metrics (Prometheus text)", text, file_name="gemini_metrics.prom", mime="text/plain")
+    with st.expander("Prometheus text"):
+        st.code(text)
 
 def get_voice_input():
+    import speech_recognition as sr
     r = sr.Recognizer()
     with sr.Microphone() as source:
         st.info("Speak now...")
@@ -133,7 +221,8 @@ menu = st.sidebar.selectbox("Navigation", [
     "Twitter", 
     "Web Scraping",
     "Linux Command (Vyuha)",
-    "DroidCam"
+    "DroidCam",
+    "Gemini Diagnostics"
 ])
 
 if menu == "Home":
@@ -214,14 +303,40 @@ elif menu == "Voice Call":
 elif menu == "Google Search":
     st.subheader("Google Search (AI Powered)")
     query = st.text_input("Search Query")
+    read_aloud = st.checkbox("🔊 Read the answer aloud")
     if st.button("Search") and query:
-        with st.spinner("Thinking..."):
-            try:
-                response = model.generate_content(f"Answer as a Google search result: {query}")
-                st.subheader("AI Search Result")
-                st.write(response.text)
-            except Exception as e:
-                st.error(f"Error: {e}")
+        # Clicking Stop reruns the script, which interrupts the loop below;
+        # the request is cancelled and unspoken sentences are dropped.
+        st.button("⏹ Stop", key="stop_search")
+        st.subheader("AI Search Result")
+        box = st.empty()
+        speech = get_speech_queue() if read_aloud else None
+        splitter = SentenceSplitter()
+        stream = get_gemini_client().stream(f"Answer as a Google search result: {query}", site="google_search")
+        completed = False
+        try:
+            for chunk in stream:
+                box.markdown(stream.text + "▌")
+                for sentence in splitter.feed(chunk) if speech else []:
+                    speech.say(sentence)
+            completed = True
+            box.markdown(stream.text)
+            if speech:
+                for sentence in splitter.flush():
+                    speech.say(sentence)
+            if stream.ttft is not None:
+                st.caption(f"First words after {stream.ttft:.2f}s, full answer in {stream.seconds:.2f}s")
+        except GeminiError as e:
+            completed = True
+            st.error(str(e))
+        except Exception as e:
+            completed = True
+            st.error(f"Error: {e}")
+        finally:
+            if not completed:
+                stream.cancel()
+                if speech:
+                    speech.clear()
 
 elif menu == "Twitter":
     st.subheader("Twitter Post")
@@ -260,15 +375,17 @@ elif menu == "Linux Command (Vyuha)":
         else:
             command = st.text_input("Your Command (e.g., 'list files')")
         if st.button("Execute Command"):
-            linux_cmd = yoursarthi(command)
+            try:
+                linux_cmd = yoursarthi(command)
+            except GeminiError as e:
+                st.error(str(e))
+                st.stop()
+            if not linux_cmd:
+                st.error(f"No command for that request (NL backend: {NL_BACKEND}).")
+                st.stop()
             st.write(f"Generated Command: `{linux_cmd}`")
             try:
-                ssh = paramiko.SSHClient()
-                ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                ssh.connect(host, 22, username, password)
-                stdin, stdout, stderr = ssh.exec_command(linux_cmd)
-                output = stdout.read().decode()
-                error = stderr.read().decode()
+                output, error, _ = get_ssh_pool().run(host, 22, username, password, linux_cmd)
                 st.subheader("Command Output")
                 if output:
                     st.code(output)
@@ -284,6 +401,10 @@ elif menu == "DroidCam":
     if st.button("Start Stream"):
         droidcam_stream(ip, port)
 
+elif menu == "Gemini Diagnostics":
+    st.subheader("Gemini Diagnostics")
+    render_gemini_diagnostics()
+
 # Footer
 st.sidebar.markdown("---")
 st.sidebar.info("Vyuha v1.0 | All-in-One Utility Platform")
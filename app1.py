@@ -1,46 +1,44 @@
 import os
-import shutil
-import pandas as pd
 import streamlit as st
-from pathlib import Path
 import datetime
-import subprocess
-import paramiko
-import pyttsx3
-import speech_recognition as sr
-import pyautogui
-import pywhatkit
+import webbrowser
+from gemini_client import GeminiError
+from app_shared import (
+    list_files_df, with_folder_sizes, preview_file, render_index_search, rename_file, delete_path,
+    create_dir, start_file_job, render_file_jobs, render_upload, render_download_link,
+    render_folder_sizes, render_duplicates,
+    get_gemini_client as shared_gemini_client, render_gemini_diagnostics,
+    NL_BACKEND, get_nl_backend as shared_nl_backend, nl_linux_command,
+    run_remote_command, recognize_speech,
+)
+from speech_queue import SentenceSplitter, SpeechQueue
 import smtplib
 from email.message import EmailMessage
-import requests
-from bs4 import BeautifulSoup
-import google.generativeai as genai
+
+# Heavy third-party packages (pandas, paramiko, google.generativeai, pyttsx3,
+# speech_recognition, pyautogui, pywhatkit, requests/bs4) are imported where
+# they are used, and clients are built once per process via
+# st.cache_resource. `python import_profile.py app1.py` shows the rest.
 
 # Import credentials
 from my_credentials import EMAIL, PASSWORD, GEMINI_API_KEY, SSH_IP, SSH_USER, SSH_PASS
 
 # --- Gemini AI Setup ---
-genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel("gemini-pro")
+GEMINI_MODEL = "gemini-pro"
+
+def get_gemini_client():
+    return shared_gemini_client(GEMINI_API_KEY, GEMINI_MODEL)
 
 # --- Text-to-Speech ---
-engine = pyttsx3.init()
-def speak(text):
-    engine.say(text)
-    engine.runAndWait()
+@st.cache_resource
+def get_speech_queue():
+    # The engine lives on the queue's worker thread; speaking no longer
+    # blocks the page.
+    import pyttsx3
+    return SpeechQueue(pyttsx3.init)
 
-# --- Voice Recognition (Local use) ---
-def recognize_speech():
-    recognizer = sr.Recognizer()
-    with sr.Microphone() as source:
-        st.info("🎙 Listening... (Check terminal for output)")
-        try:
-            audio = recognizer.listen(source, timeout=5)
-            command = recognizer.recognize_google(audio)
-            print(f"🗣 You said: {command}")
-            return command
-        except Exception as e:
-            return f"Error: {e}"
+def speak(text):
+    get_speech_queue().say(text)
 
 # --- Email Function ---
 def send_email(to, subject, body):
@@ -53,85 +51,48 @@ def send_email(to, subject, body):
         smtp.login(EMAIL, PASSWORD)
         smtp.send_message(msg)
 
-# --- File System Helpers ---
-def get_human_readable_size(size):
-    for unit in ['bytes', 'KB', 'MB', 'GB']:
-        if size < 1024.0 or unit == 'GB':
-            break
-        size /= 1024.0
-    return f"{size:.2f} {unit}"
-
-def list_files_df(directory):
-    files = os.listdir(directory)
-    data = []
-    for name in files:
-        path = os.path.join(directory, name)
-        if os.path.isfile(path):
-            size = os.path.getsize(path)
-            size_str = get_human_readable_size(size)
-            data.append([name, "📄 File", size_str])
-        else:
-            data.append([name, "📁 Folder", "-"])
-    df = pd.DataFrame(data, columns=["Name", "Type", "Size"])
-    return df
-
-def rename_file(directory, old_name, new_name):
-    old_path = os.path.join(directory, old_name)
-    new_path = os.path.join(directory, new_name)
-    os.rename(old_path, new_path)
-    return "Renamed Successfully"
-
-def delete_path(directory, name):
-    path = os.path.join(directory, name)
-    if os.path.isfile(path):
-        os.remove(path)
-        return "File deleted successfully"
-    elif os.path.isdir(path):
-        shutil.rmtree(path)
-        return "Directory deleted successfully"
-    else:
-        return "Enter correct path"
-
-def create_dir(directory, folder_name):
-    path = os.path.join(directory, folder_name)
-    os.makedirs(path, exist_ok=True)
-    return "Directory Created successfully"
-
-def preview_file(file_path):
-    try:
-        if file_path.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp')):
-            st.image(file_path)
-        elif file_path.lower().endswith(('.txt', '.csv', '.md', '.py', '.json', '.xml')):
-            with open(file_path, 'r') as f:
-                content = f.read()
-            st.code(content, language="text")
-    except Exception as e:
-        st.error(f"Cannot preview file: {e}")
-
 # --- Gemini Natural Language to Linux Command ---
 def nl_to_linux_cmd(prompt):
-    response = model.generate_content(
-        f"You are a Linux engineer. Convert the user prompt into a single Linux command. "
-        f"Do not use quotes or bash script, only single command like: date, ls, etc.\n"
-        f"Prompt: {prompt}"
-    )
-    return response.text.strip()
+    backend = shared_nl_backend("nl_to_linux_cmd", GEMINI_MODEL, get_gemini_client)
+    return nl_linux_command(prompt, backend, "nl_to_linux_cmd")[0]
 
 # --- SSH Command Execution ---
 def run_ssh_command(command):
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    try:
-        ssh.connect(SSH_IP, 22, SSH_USER, SSH_PASS)
-        stdin, stdout, stderr = ssh.exec_command(command)
-        output = stdout.read().decode()
-        error = stderr.read().decode()
-        ssh.close()
-        return output if output else error
-    except Exception as e:
-        return f"SSH Error: {e}"
+    return run_remote_command(SSH_IP, SSH_USER, SSH_PASS, command)
 
 # --- Voice Assistant Command Processor ---
+def ask_gemini_aloud(prompt, site):
+    # Streams the answer into the page and speaks each sentence as soon as it
+    # is complete. Clicking Stop reruns the script, which interrupts the loop
+    # below; the request is cancelled and unspoken sentences are dropped.
+    speech = get_speech_queue()
+    speech.clear()
+    st.button("⏹ Stop", key="stop_gemini")
+    box = st.empty()
+    splitter = SentenceSplitter()
+    stream = get_gemini_client().stream(prompt, site=site)
+    completed = False
+    try:
+        for chunk in stream:
+            box.markdown(stream.text + "▌")
+            for sentence in splitter.feed(chunk):
+                speech.say(sentence)
+        completed = True
+    except GeminiError as e:
+        completed = True
+        box.empty()
+        return f"❌ {e}"
+    finally:
+        if not completed:
+            stream.cancel()
+            speech.clear()
+    for sentence in splitter.flush():
+        speech.say(sentence)
+    box.empty()
+    if stream.ttft is not None:
+        st.caption(f"First words after {stream.ttft:.2f}s, full answer in {stream.seconds:.2f}s")
+    return stream.text.strip()
+
 def process_command(command):
     command = command.lower()
     if "open notepad" in command:
@@ -147,28 +108,21 @@ def process_command(command):
         webbrowser.open("https://www.linkedin.com")
         return "Opening LinkedIn."
     elif "take a screenshot" in command:
+        import pyautogui
         screenshot = pyautogui.screenshot()
         screenshot.save("screenshot.png")
         return "Screenshot taken and saved as screenshot.png."
     elif "tell me a joke" in command:
-        response = model.generate_content("Tell me a joke.")
-        joke = response.text.strip()
-        speak(joke)
-        return joke
+        return ask_gemini_aloud("Tell me a joke.", "joke")
     elif "give me a quote" in command:
-        response = model.generate_content("Give me a motivational quote.")
-        quote = response.text.strip()
-        speak(quote)
-        return quote
+        return ask_gemini_aloud("Give me a motivational quote.", "quote")
     elif "interesting fact" in command:
-        response = model.generate_content("Tell me an interesting fact.")
-        fact = response.text.strip()
-        speak(fact)
-        return fact
+        return ask_gemini_aloud("Tell me an interesting fact.", "fact")
     elif "send whatsapp message" in command:
         number = st.text_input("Number with country code (e.g., +919812345678):")
         message = st.text_input("Message:")
         if st.button("Send WhatsApp Message"):
+            import pywhatkit
             now = datetime.datetime.now()
             hour = now.hour
             minute = now.minute + 2
@@ -193,6 +147,8 @@ def process_command(command):
         search_term = command.replace("search", "").strip()
         search_url = f"https://www.google.com/search?q={search_term}"
         headers = {"User-Agent": "Mozilla/5.0"}
+        import requests
+        from bs4 import BeautifulSoup
         try:
             response = requests.get(search_url, headers=headers)
             soup = BeautifulSoup(response.text, "html.parser")
@@ -205,6 +161,7 @@ def process_command(command):
             return f"✅ Opened Google for '{search_term}' but failed to fetch summary: {str(e)}"
     elif "download data from" in command:
         url = command.replace("download data from", "").strip()
+        import requests
         try:
             response = requests.get(url)
             filename = "downloaded_page.html"
@@ -232,7 +189,9 @@ menu = [
     "AI Voice Assistant",
     "Remote Linux (Menu)",
     "Remote Linux (Natural Language)",
-    "File System"
+    "File System",
+    "File Jobs",
+    "Gemini Diagnostics"
 ]
 choice = st.sidebar.selectbox("Navigation", menu)
 
@@ -244,7 +203,9 @@ if choice == "Home":
       - **AI Voice Assistant**: Use Gemini-powered voice/text assistant.
       - **Remote Linux (Menu)**: Run common Linux commands on remote server (SSH).
       - **Remote Linux (Natural Language)**: Describe your task, Gemini will convert to Linux command and run it!
-      - **File System**: Manage local files/folders.
+      - **File System**: Manage local files/folders and find duplicate files.
+      - **File Jobs**: Progress of background copy, move and delete jobs; cancel running ones.
+      - **Gemini Diagnostics**: Latency, tokens, cache hits and errors per Gemini call site.
     """)
     st.info("All credentials are securely stored in `my_credentials.py`.")
 
@@ -303,10 +264,17 @@ elif choice == "Remote Linux (Natural Language)":
     st.header("🧠 Remote Linux (Natural Language to Command)")
     prompt = st.text_input("Describe your task (e.g., 'list all files', 'show memory info'):")
     if st.button("Generate & Run"):
-        linux_cmd = nl_to_linux_cmd(prompt)
-        st.info(f"Generated Command: `{linux_cmd}`")
-        output = run_ssh_command(linux_cmd)
-        st.code(output)
+        try:
+            linux_cmd = nl_to_linux_cmd(prompt)
+        except GeminiError as e:
+            st.error(str(e))
+        else:
+            if linux_cmd:
+                st.info(f"Generated Command: `{linux_cmd}`")
+                output = run_ssh_command(linux_cmd)
+                st.code(output)
+            else:
+                st.error(f"No command for that request (NL backend: {NL_BACKEND}).")
 
 # --- File System ---
 elif choice == "File System":
@@ -318,12 +286,22 @@ elif choice == "File System":
 
     # List Files
     st.subheader("List of Files and Folders")
-    df = list_files_df(current_dir)
+    from dir_listing import display_frame, page_slice, sort_listing
+    refresh = st.button("Refresh listing")
+    listing = list_files_df(current_dir, refresh=refresh)
+    df = with_folder_sizes(current_dir, listing)
     search = st.text_input("Search files/folders")
     if search:
-        df = df[df['Name'].str.contains(search, case=False)]
-    st.dataframe(df, use_container_width=True)
-    selected_file = st.selectbox("Select a file/folder to preview", [""] + df['Name'].tolist())
+        df = df[df['Name'].str.contains(search, case=False, regex=False)]
+    col1, col2, col3 = st.columns(3)
+    sort_by = col1.selectbox("Sort by", ["Name", "Size", "Modified"], key="list_sort")
+    descending = col2.checkbox("Descending", key="list_desc")
+    page_size = col3.selectbox("Rows per page", [100, 500, 1000], key="list_page_size")
+    page = st.number_input("Page", min_value=1, value=1, step=1, key="list_page")
+    page_df, pages = page_slice(sort_listing(df, sort_by, descending), page, page_size)
+    st.caption(f"{len(df):,} entries, page {min(page, pages)} of {pages}")
+    st.dataframe(display_frame(page_df), use_container_width=True)
+    selected_file = st.selectbox("Select a file/folder to preview", [""] + page_df['Name'].tolist())
     if selected_file:
         file_path = os.path.join(current_dir, selected_file)
         if os.path.isfile(file_path):
@@ -331,6 +309,9 @@ elif choice == "File System":
         else:
             st.info("Folder selected. Only files can be previewed.")
 
+    st.subheader("Search Whole Tree")
+    render_index_search("tree_search")
+
     # Rename File
     st.subheader("Rename File")
     old_name_val = st.text_input("Old file name:")
@@ -352,6 +333,21 @@ elif choice == "File System":
         else:
             st.error("Please enter a name.")
 
+    # Bulk Copy/Move/Delete
+    st.subheader("Bulk Copy, Move or Delete")
+    bulk_names = st.multiselect("Select files/folders (this page)", page_df['Name'].tolist(), key="bulk_names")
+    col1, col2 = st.columns(2)
+    operation = col1.radio("Operation", ["Copy", "Move", "Delete"], horizontal=True, key="bulk_op")
+    bulk_target = col2.text_input("Destination directory (copy/move):", key="bulk_target")
+    confirmed = operation != "Delete" or st.checkbox("Delete the selected items permanently", key="bulk_confirm")
+    if st.button("Start Job"):
+        if confirmed:
+            st.info(start_file_job(operation, current_dir, bulk_names, bulk_target))
+        else:
+            st.error("Tick the box to confirm the delete.")
+    render_file_jobs(limit=5)
+    st.caption("Jobs keep running when you leave this page; follow them live under 'File Jobs'.")
+
     # Create Directory
     st.subheader("Create Directory")
     folder_name = st.text_input("New directory name to create:")
@@ -364,22 +360,29 @@ elif choice == "File System":
 
     # Upload File
     st.subheader("Upload File")
-    uploaded_file = st.file_uploader("Choose a file to upload")
-    if uploaded_file is not None:
-        file_path = os.path.join(current_dir, uploaded_file.name)
-        with open(file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        st.success(f"File '{uploaded_file.name}' uploaded successfully!")
+    render_upload(current_dir, "upload_file")
 
-    # Download File
-    st.subheader("Download File")
-    files = [f for f in os.listdir(current_dir) if os.path.isfile(os.path.join(current_dir, f))]
-    if files:
-        selected_file = st.selectbox("Select file to download", files)
-        if st.button("Download"):
-            file_path = os.path.join(current_dir, selected_file)
-            with open(file_path, "rb") as f:
-                file_bytes = f.read()
-            st.download_button("Download File", data=file_bytes, file_name=selected_file)
+    # Download File or Folder
+    st.subheader("Download File or Folder")
+    if len(listing):
+        render_download_link(current_dir, listing["Name"].tolist(), "download_file")
     else:
-        st.info("No files available to download.")
+        st.info("Nothing to download in this folder.")
+
+    # Run last: the page redraws these sections until their scans finish.
+    st.subheader("Folder Sizes")
+    render_folder_sizes(current_dir)
+
+    st.subheader("Duplicate Files")
+    render_duplicates(current_dir)
+
+# --- File Jobs ---
+elif choice == "File Jobs":
+    st.header("🗂️ File Jobs")
+    live = st.checkbox("Live update", value=True, key="jobs_live")
+    render_file_jobs(live=live, limit=50)
+
+# --- Gemini Diagnostics ---
+elif choice == "Gemini Diagnostics":
+    st.header("📊 Gemini Diagnostics")
+    render_gemini_diagnostics()
@@ -1,19 +1,32 @@
 import os
-import shutil
-import pandas as pd
 import streamlit as st
-import pywhatkit as kit
 import smtplib
 from email.message import EmailMessage
-from twilio.rest import Client
-import requests
-from bs4 import BeautifulSoup
-import tweepy
-from instagrapi import Client as InstaClient
-import paramiko
-import google.generativeai as genai
-import speech_recognition as sr
+from ssh_fleet import cache_key, load_inventory, map_hosts, run_on_hosts
+from ssh_batch import run_batch
+from linux_menu import LINUX_MENU_50, menu_ttl
+from result_cache import ResultCache
+from ssh_spool import run_compressed
+from gemini_client import GeminiError
+from app_shared import (
+    get_human_readable_size, list_files_df, with_folder_sizes, preview_file, render_index_search,
+    rename_file, delete_path, create_dir, start_file_job, render_file_jobs, render_upload,
+    render_download_link, render_folder_sizes, render_duplicates,
+    get_gemini_client as shared_gemini_client, render_gemini_diagnostics,
+    get_nl_cache, get_intent_index, get_nl_backend as shared_nl_backend, nl_linux_command,
+    get_ssh_pool, run_remote_command, recognize_speech,
+)
+from ssh_stream import stream_command
 import datetime
+import time
+import math
+
+# Heavy packages (pandas/numpy and the modules built on them, paramiko,
+# google.generativeai, twilio, tweepy, instagrapi, pywhatkit, requests/bs4,
+# speech_recognition) are imported inside the helpers or page branches that
+# use them, and clients are built once per process via st.cache_resource, so
+# opening "Home" pays for none of them. `python import_profile.py app2.py`
+# reports what is still imported up front.
 
 from my_secrets import (
     EMAIL, EMAIL_PASSWORD, WHATSAPP_NUMBER, WHATSAPP_TEST_NUMBER,
@@ -22,64 +35,13 @@ from my_secrets import (
     TWITTER_API_KEY, TWITTER_API_SECRET, TWITTER_ACCESS_TOKEN, TWITTER_ACCESS_TOKEN_SECRET,
     GEMINI_API_KEY, SSH_IP, SSH_USER, SSH_PASS
 )
+import my_secrets
 
-# --- File System Helpers ---
-def get_human_readable_size(size):
-    for unit in ['bytes', 'KB', 'MB', 'GB']:
-        if size < 1024.0 or unit == 'GB':
-            break
-        size /= 1024.0
-    return f"{size:.2f} {unit}"
-
-def list_files_df(directory):
-    files = os.listdir(directory)
-    data = []
-    for name in files:
-        path = os.path.join(directory, name)
-        if os.path.isfile(path):
-            size = os.path.getsize(path)
-            size_str = get_human_readable_size(size)
-            data.append([name, "📄 File", size_str])
-        else:
-            data.append([name, "📁 Folder", "-"])
-    df = pd.DataFrame(data, columns=["Name", "Type", "Size"])
-    return df
-
-def rename_file(directory, old_name, new_name):
-    old_path = os.path.join(directory, old_name)
-    new_path = os.path.join(directory, new_name)
-    os.rename(old_path, new_path)
-    return "Renamed Successfully"
-
-def delete_path(directory, name):
-    path = os.path.join(directory, name)
-    if os.path.isfile(path):
-        os.remove(path)
-        return "File deleted successfully"
-    elif os.path.isdir(path):
-        shutil.rmtree(path)
-        return "Directory deleted successfully"
-    else:
-        return "Enter correct path"
-
-def create_dir(directory, folder_name):
-    path = os.path.join(directory, folder_name)
-    os.makedirs(path, exist_ok=True)
-    return "Directory Created successfully"
-
-def preview_file(file_path):
-    try:
-        if file_path.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp')):
-            st.image(file_path)
-        elif file_path.lower().endswith(('.txt', '.csv', '.md', '.py', '.json', '.xml')):
-            with open(file_path, 'r') as f:
-                content = f.read()
-            st.code(content, language="text")
-    except Exception as e:
-        st.error(f"Cannot preview file: {e}")
+SSH_HOSTS = getattr(my_secrets, "SSH_HOSTS", [])
 
 # --- Utility Functions ---
 def send_whatsapp_msg(number, message, hour, minute):
+    import pywhatkit as kit
     kit.sendwhatmsg(number, message, hour, minute, wait_time=10)
 
 def send_email(subject, body, to_email, from_email, password):
@@ -93,6 +55,7 @@ def send_email(subject, body, to_email, from_email, password):
         server.send_message(msg)
 
 def send_whatsapp_twilio(account_sid, auth_token, from_whatsapp, to_whatsapp, message):
+    from twilio.rest import Client
     client = Client(account_sid, auth_token)
     client.messages.create(
         body=message,
@@ -101,6 +64,7 @@ def send_whatsapp_twilio(account_sid, auth_token, from_whatsapp, to_whatsapp, me
     )
 
 def send_sms_twilio(account_sid, auth_token, from_number, to_number, message):
+    from twilio.rest import Client
     client = Client(account_sid, auth_token)
     client.messages.create(
         body=message,
@@ -109,6 +73,7 @@ def send_sms_twilio(account_sid, auth_token, from_number, to_number, message):
     )
 
 def make_call(account_sid, auth_token, from_number, to_number, twiml_url):
+    from twilio.rest import Client
     client = Client(account_sid, auth_token)
     call = client.calls.create(
         to=to_number,
@@ -117,6 +82,8 @@ def make_call(account_sid, auth_token, from_number, to_number, twiml_url):
     )
 
 def search_google(query):
+    import requests
+    from bs4 import BeautifulSoup
     url = f"https://www.google.com/search?q={query}"
     headers = {'User-Agent': 'Mozilla/5.0'}
     response = requests.get(url, headers=headers)
@@ -124,16 +91,20 @@ def search_google(query):
     return soup.title.text
 
 def post_instagram(username, password, image_path, caption):
+    from instagrapi import Client as InstaClient
     cl = InstaClient()
     cl.login(username, password)
     cl.photo_upload(image_path, caption)
 
 def post_tweet(api_key, api_secret, access_token, access_secret, text):
+    import tweepy
     auth = tweepy.OAuth1UserHandler(api_key, api_secret, access_token, access_secret)
     api = tweepy.API(auth)
     api.update_status(status=text)
 
 def download_data(url):
+    import requests
+    from bs4 import BeautifulSoup
     response = requests.get(url)
     soup = BeautifulSoup(response.text, 'html.parser')
     return soup.prettify()
@@ -150,85 +121,429 @@ def spoofed_email(subject, body, from_email, to_email, smtp_server, smtp_port, p
         server.send_message(msg)
 
 # --- Gemini Linux Command ---
-genai.configure(api_key=GEMINI_API_KEY)
-gemini_model = genai.GenerativeModel("gemini-1.5-flash")
-
-def gemini_linux_command(prompt):
-    response = gemini_model.generate_content(
-        f"You are a Linux engineer. Convert the user prompt into a single Linux command. "
-        f"Do not use quotes or bash script, only single command like: date, ls, etc.\n"
-        f"Prompt: {prompt}"
-    )
-    return response.text.strip()
+GEMINI_MODEL = "gemini-1.5-flash"
+
+def get_gemini_client():
+    return shared_gemini_client(GEMINI_API_KEY, GEMINI_MODEL)
+
+def get_nl_backend():
+    return shared_nl_backend("gemini_linux_command", GEMINI_MODEL, get_gemini_client)
+
+def gemini_linux_command(prompt, fuzzy=False, use_index=True):
+    return nl_linux_command(prompt, get_nl_backend(), "gemini_linux_command", fuzzy=fuzzy, use_index=use_index)
 
 def run_ssh_command(command):
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    return run_remote_command(SSH_IP, SSH_USER, SSH_PASS, command)
+
+@st.cache_resource
+def get_result_cache():
+    return ResultCache(max_entries=512)
+
+# --- Fleet Fan-out ---
+SSH_INVENTORY = load_inventory(SSH_HOSTS, SSH_IP, SSH_USER, SSH_PASS)
+
+def select_hosts(key):
+    names = [h["name"] for h in SSH_INVENTORY]
+    selected = st.multiselect("Target hosts", names, default=names[:1], key=key)
+    with st.expander("Fan-out settings"):
+        col1, col2, col3 = st.columns(3)
+        workers = col1.number_input("Max parallel hosts", min_value=1, max_value=128, value=16, key=f"{key}_workers")
+        connect_timeout = col2.number_input("Connect timeout (s)", min_value=1, max_value=120, value=5, key=f"{key}_conn")
+        exec_timeout = col3.number_input("Exec timeout (s)", min_value=1, max_value=3600, value=30, key=f"{key}_exec")
+    hosts = [h for h in SSH_INVENTORY if h["name"] in selected]
+    return hosts, {"max_workers": workers, "connect_timeout": connect_timeout, "exec_timeout": exec_timeout}
+
+def stream_to_page(host, command, settings, ttl=0, refresh=False, max_bytes=1024 * 1024):
+    cache = get_result_cache()
+    key = cache_key(host, command)
+    hit = cache.get(key) if ttl and not refresh else None
+    if hit is not None:
+        cached, age = hit
+        st.code(cached["Output"] if cached["Output"] else cached["Error"])
+        st.caption(f"⚡ Cache hit ({age}s old) | exit status {cached['Exit']}")
+        return cached["Output"]
+    # Clicking Cancel reruns the script; Streamlit stops this run at the next
+    # UI update and stream_command closes the channel on the way out.
+    st.button("⏹ Cancel", key="cancel_stream")
+    out_box = st.empty()
+    err_box = st.empty()
+
+    def on_update(stdout, stderr):
+        out_box.code(stdout.text())
+        if stderr.total_bytes:
+            err_box.error(stderr.text())
+
+    result = stream_command(
+        get_ssh_pool(), host["host"], host["port"], host["user"], host["password"], command,
+        on_update=on_update, max_bytes=max_bytes, exec_timeout=settings["exec_timeout"],
+    )
+    status = "timed out" if result["timed_out"] else f"exit status {result['exit_status']}"
+    caption = (
+        f"{status} | stdout {result['stdout_bytes']:,} bytes | "
+        f"stderr {result['stderr_bytes']:,} bytes | {result['seconds']}s"
+    )
+    dropped = result["stdout"].dropped_bytes + result["stderr"].dropped_bytes
+    if dropped:
+        caption += f" | oldest {dropped:,} bytes dropped (buffer cap {max_bytes:,})"
+    elif result["exit_status"] == 0:
+        cache.put(key, {
+            "Output": result["stdout"].text(), "Error": result["stderr"].text(), "Exit": 0,
+        }, ttl)
+    st.caption(caption + (" | cache miss" if ttl else ""))
+    return result["stdout"].text()
+
+def run_on_selected_hosts(hosts, command, settings, stream=False, ttl=0, refresh=False):
+    # Returns [(host name, stdout)] so callers can post-process the output.
+    if not hosts:
+        st.error("Please select at least one host.")
+        return []
+    if len(hosts) == 1 and stream:
+        try:
+            return [(hosts[0]["name"], stream_to_page(hosts[0], command, settings, ttl=ttl, refresh=refresh))]
+        except Exception as e:
+            st.error(f"SSH Error: {e}")
+        return []
+    cache_opts = {"cache": get_result_cache(), "ttl": ttl, "refresh": refresh}
+    if len(hosts) == 1:
+        result = next(run_on_hosts(get_ssh_pool(), hosts, command, **settings, **cache_opts))
+        st.code(result["Output"] if result["Output"] else result["Error"])
+        if ttl:
+            st.caption(f"Cache {result['Cache']}")
+        return [(result["Host"], result["Output"])]
+    import pandas as pd
+    table = st.empty()
+    rows = []
+    for result in run_on_hosts(get_ssh_pool(), hosts, command, **settings, **cache_opts):
+        rows.append(result)
+        table.dataframe(
+            pd.DataFrame(rows, columns=["Host", "Status", "Exit", "Seconds", "Cache"]),
+            use_container_width=True,
+        )
+    for result in sorted(rows, key=lambda r: r["Host"]):
+        with st.expander(f"{result['Host']} ({result['Status']}, {result['Seconds']}s)"):
+            st.code(result["Output"] if result["Output"] else result["Error"])
+    return [(r["Host"], r["Output"]) for r in rows if r["Output"]]
+
+def render_parsed_output(label, outputs):
+    # Sorting, filtering and grouping run on the stored DataFrame, so changing
+    # them never re-runs the command on the remote host.
+    import pandas as pd
+    from output_parsers import PARSERS
+    frames = []
+    for host_name, text in outputs:
+        try:
+            df = PARSERS[label](text)
+        except Exception as e:
+            st.warning(f"Could not parse output from {host_name}: {e}")
+            continue
+        df.insert(0, "Host", host_name)
+        frames.append(df)
+    if not frames:
+        return
+    df = pd.concat(frames, ignore_index=True)
+    st.subheader("Parsed Output")
+    col1, col2, col3, col4 = st.columns(4)
+    sort_col = col1.selectbox("Sort by", list(df.columns), key="parsed_sort")
+    descending = col2.checkbox("Descending", value=True, key="parsed_desc")
+    text_cols = [c for c in df.columns if df[c].dtype == object]
+    group_col = col3.selectbox("Group by", ["(none)"] + text_cols, key="parsed_group")
+    search = col4.text_input("Filter rows", key="parsed_filter")
+    if search:
+        mask = pd.Series(False, index=df.index)
+        for col in text_cols:
+            mask |= df[col].str.contains(search, case=False, regex=False, na=False)
+        df = df[mask]
+    if group_col != "(none)":
+        df = df.groupby(group_col).sum(numeric_only=True).reset_index()
+        if sort_col not in df.columns:
+            sort_col = group_col
+    st.dataframe(df.sort_values(sort_col, ascending=not descending), use_container_width=True)
+
+def run_batch_on_host(host, labels, settings, refresh=False):
+    # Cached entries are answered locally; only the misses go into the batch.
+    cache = get_result_cache()
+    results = {}
+    pending = []
+    for label in labels:
+        hit = cache.get(cache_key(host, LINUX_MENU_50[label], "batch")) if menu_ttl(label) and not refresh else None
+        if hit is not None:
+            cached, age = hit
+            results[label] = {
+                "Label": label, "Command": LINUX_MENU_50[label], "Exit": cached["Exit"],
+                "Seconds": 0.0, "Output": cached["Output"], "Complete": True,
+                "Cache": f"hit ({age}s old)",
+            }
+        else:
+            pending.append(label)
+    seconds = 0.0
     try:
-        ssh.connect(SSH_IP, 22, SSH_USER, SSH_PASS)
-        stdin, stdout, stderr = ssh.exec_command(command)
-        output = stdout.read().decode()
-        error = stderr.read().decode()
-        ssh.close()
-        return output if output else error
+        if pending:
+            commands = [LINUX_MENU_50[label] for label in pending]
+            batch, seconds = run_batch(
+                get_ssh_pool(), host["host"], host["port"], host["user"], host["password"],
+                commands, exec_timeout=settings["exec_timeout"],
+            )
+            for label, result in zip(pending, batch):
+                result["Label"] = label
+                result["Cache"] = "miss" if menu_ttl(label) else "off"
+                if result["Complete"] and result["Exit"] == 0:
+                    cache.put(cache_key(host, result["Command"], "batch"), {
+                        "Output": result["Output"], "Error": "", "Exit": 0,
+                    }, menu_ttl(label))
+                results[label] = result
+        ordered = [results[label] for label in labels]
+        return {"Host": host["name"], "Results": ordered, "Seconds": seconds, "Pending": len(pending), "Error": ""}
     except Exception as e:
-        return f"SSH Error: {e}"
-
-# --- Linux Menu SSH (50 Commands) ---
-LINUX_MENU_50 = {
-    "Show date": "date",
-    "Show time": "date +%T",
-    "List directory": "ls -l",
-    "Current user": "whoami",
-    "System info": "uname -a",
-    "Running tasks": "top -b -n 1 | head -15",
-    "IP config": "ip a",
-    "Active connections": "ss -tuln",
-    "ARP table": "ip neigh",
-    "All users": "cut -d: -f1 /etc/passwd",
-    "Logged in users": "who",
-    "Environment variables": "printenv",
-    "List services": "systemctl list-units --type=service --state=running",
-    "Running processes": "ps aux --sort=-%mem | head -10",
-    "Installed packages (dpkg)": "dpkg -l | head -20",
-    "Installed packages (rpm)": "rpm -qa | head -20",
-    "Battery status": "acpi -b || echo 'No battery info'",
-    "Disk usage": "df -h",
-    "Startup programs": "ls /etc/init.d/",
-    "BIOS info": "dmidecode -t bios",
-    "CPU info": "lscpu",
-    "Memory info": "free -h",
-    "Motherboard info": "dmidecode -t baseboard",
-    "Network adapters": "lshw -class network",
-    "Uptime": "uptime",
-    "Routing table": "ip route",
-    "Kernel version": "uname -r",
-    "Hostname": "hostname",
-    "Check internet": "ping -c 4 8.8.8.8",
-    "Show open ports": "netstat -tulpn",
-    "Show firewall rules": "iptables -L",
-    "Show SSH config": "cat /etc/ssh/sshd_config",
-    "Show crontab": "crontab -l",
-    "List users with UID 0": "awk -F: '$3 == 0 {print $1}' /etc/passwd",
-    "Show last logins": "last -a | head -10",
-    "Show failed logins": "lastb -a | head -10",
-    "Show system reboot history": "last reboot | head -10",
-    "Show dmesg errors": "dmesg | grep -i error | tail -20",
-    "List open files": "lsof | head -20",
-    "Show processes by user": "ps -u $USER",
-    "Show disk partitions": "lsblk",
-    "Show PCI devices": "lspci",
-    "Show USB devices": "lsusb",
-    "Show hardware info": "lshw | head -20",
-    "Show systemd failed units": "systemctl --failed",
-    "Show SELinux status": "sestatus",
-    "Show journal logs": "journalctl -n 20",
-    "Show top memory processes": "ps aux --sort=-%mem | head -10",
-    "Show top CPU processes": "ps aux --sort=-%cpu | head -10",
-    "Show swap usage": "swapon --show",
-    "Show temp files": "ls /tmp",
-    # Add more as needed (already 50+ with some options)
-}
+        return {"Host": host["name"], "Results": [], "Seconds": None, "Pending": len(pending), "Error": f"SSH Error: {e}"}
+
+def run_batch_on_selected_hosts(hosts, labels, settings, refresh=False):
+    if not hosts or not labels:
+        st.error("Please select at least one host and one command.")
+        return
+    import pandas as pd
+    runner = lambda h: run_batch_on_host(h, labels, settings, refresh)
+    for batch in map_hosts(hosts, runner, settings["max_workers"]):
+        st.subheader(f"{batch['Host']}")
+        if batch["Error"]:
+            st.error(batch["Error"])
+            continue
+        st.caption(
+            f"{batch['Pending']} of {len(labels)} commands sent in one round trip, "
+            f"{batch['Seconds']}s total; the rest came from cache"
+        )
+        st.dataframe(
+            pd.DataFrame(batch["Results"], columns=["Label", "Exit", "Seconds", "Complete", "Cache"]),
+            use_container_width=True,
+        )
+        for result in batch["Results"]:
+            with st.expander(f"{result['Label']} (exit {result['Exit']})"):
+                st.code(result["Output"])
+
+# --- Large Output Mode ---
+@st.cache_resource
+def sweep_old_spools():
+    # Once per process: spools of sessions that ended are removed as they
+    # are garbage-collected; this clears those of earlier processes.
+    from ssh_spool import sweep_spools
+    sweep_spools()
+    return True
+
+def run_spooled(page_key, hosts, command, settings):
+    if len(hosts) != 1:
+        st.error("Large output mode runs against one host at a time.")
+        return
+    host = hosts[0]
+    status = st.empty()
+    last = [0.0]
+
+    def on_progress(spool):
+        now = time.monotonic()
+        if now - last[0] >= 0.5:
+            last[0] = now
+            status.caption(
+                f"Receiving... {spool.line_count:,} lines, "
+                f"{get_human_readable_size(spool.compressed_bytes)} compressed"
+            )
+
+    sweep_old_spools()
+    previous = st.session_state.pop("spool", None)
+    if previous is not None:
+        previous[1].delete()
+    try:
+        spool = run_compressed(
+            get_ssh_pool(), host["host"], host["port"], host["user"], host["password"], command,
+            on_progress=on_progress, exec_timeout=settings["exec_timeout"],
+        )
+    except Exception as e:
+        st.error(f"SSH Error: {e}")
+        return
+    status.empty()
+    st.session_state["spool"] = (page_key, spool)
+
+def render_spool(page_key, page_size=1000):
+    entry = st.session_state.get("spool")
+    if entry is None or entry[0] != page_key:
+        return
+    spool = entry[1]
+    ratio = spool.size / spool.compressed_bytes if spool.compressed_bytes else 0
+    state = "timed out" if spool.timed_out else f"exit status {spool.exit_status}"
+    st.caption(
+        f"{spool.line_count:,} lines | {get_human_readable_size(spool.size)} from "
+        f"{get_human_readable_size(spool.compressed_bytes)} on the wire ({ratio:.1f}x) | "
+        f"{state} | {spool.seconds}s"
+    )
+    search = st.text_input("Search output", key=f"{page_key}_spool_search")
+    if search:
+        hits = spool.search(search)
+        if hits:
+            hit = st.selectbox(
+                f"{len(hits)} matching lines", hits,
+                format_func=lambda n: f"line {n + 1}", key=f"{page_key}_spool_hit",
+            )
+            st.code(spool.lines(max(0, hit - 5), 11), language="text")
+        else:
+            st.info("No matches.")
+    pages = max(1, math.ceil(spool.line_count / page_size))
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=f"{page_key}_spool_page")
+    st.code(spool.lines((page - 1) * page_size, page_size), language="text")
+
+# --- Host Metrics ---
+@st.cache_resource
+def get_sampler_registry():
+    # Samplers keep running across reruns; the page only reads their buffers.
+    from metrics_sampler import SamplerRegistry
+    return SamplerRegistry()
+
+def format_rate(value):
+    return "-" if math.isnan(value) else f"{get_human_readable_size(value)}/s"
+
+def render_metrics(placeholder, sampler):
+    import pandas as pd
+    from metrics_sampler import METRICS
+    timestamps, values = sampler.series.snapshot()
+    df = pd.DataFrame(values.T, columns=METRICS, index=pd.to_datetime(timestamps, unit="s"))
+    with placeholder.container():
+        if sampler.error:
+            st.warning(f"Sampler: {sampler.error}")
+        if df.empty:
+            st.info("Waiting for samples...")
+            return
+        latest = df.iloc[-1]
+        cols = st.columns(4)
+        cols[0].metric("CPU", f"{latest['cpu_percent']:.1f}%")
+        cols[1].metric("Memory", f"{latest['mem_used_percent']:.1f}%")
+        cols[2].metric("Load (1m)", f"{latest['load1']:.2f}")
+        cols[3].metric("Net RX", format_rate(latest["net_rx_bps"]))
+        st.write("CPU / Memory (%)")
+        st.line_chart(df[["cpu_percent", "mem_used_percent"]])
+        st.write("Load average")
+        st.line_chart(df[["load1", "load5", "load15"]])
+        st.write("Disk I/O (bytes/s)")
+        st.line_chart(df[["disk_read_bps", "disk_write_bps"]])
+        st.write("Network (bytes/s)")
+        st.line_chart(df[["net_rx_bps", "net_tx_bps"]])
+
+# --- Remote File Management (SFTP) ---
+def transfer_progress(bar, interval=0.2):
+    last = [0.0]
+
+    def update(done, total, rate):
+        now = time.monotonic()
+        if now - last[0] < interval and done < total:
+            return
+        last[0] = now
+        fraction = min(done / total, 1.0) if total else 1.0
+        bar.progress(fraction, text=(
+            f"{get_human_readable_size(done)} / {get_human_readable_size(total)} "
+            f"at {get_human_readable_size(rate)}/s"
+        ))
+    return update
+
+def remote_file_manager():
+    from remote_files import (
+        list_remote_files_df, rename_remote_file, delete_remote_path, create_remote_dir,
+        read_remote_head, download_remote_file, upload_remote_file,
+    )
+    names = [h["name"] for h in SSH_INVENTORY]
+    name = st.selectbox("Remote host", names, key="sftp_host")
+    host = next(h for h in SSH_INVENTORY if h["name"] == name)
+    login = (host["host"], host["port"], host["user"], host["password"])
+    try:
+        sftp = get_ssh_pool().sftp(*login)
+        remote_dir = st.text_input("Remote directory path:", value=sftp.normalize("."), key="sftp_dir")
+        df = list_remote_files_df(sftp, remote_dir)
+    except Exception as e:
+        st.error(f"SFTP Error: {e}")
+        return
+
+    st.subheader("List of Files and Folders")
+    search = st.text_input("Search files/folders", key="sftp_search")
+    if search:
+        df = df[df['Name'].str.contains(search, case=False)]
+    st.dataframe(df, use_container_width=True)
+    selected = st.selectbox("Select a file to preview", [""] + df[df["Type"] == "📄 File"]["Name"].tolist(), key="sftp_preview")
+    if selected:
+        try:
+            st.code(read_remote_head(sftp, f"{remote_dir.rstrip('/')}/{selected}").decode(errors="replace"), language="text")
+        except Exception as e:
+            st.error(f"Cannot preview file: {e}")
+
+    st.subheader("Rename File")
+    old_name = st.text_input("Old file name:", key="sftp_rename_old")
+    new_name = st.text_input("New file name:", key="sftp_rename_new")
+    if st.button("Rename", key="sftp_rename"):
+        if old_name and new_name:
+            st.success(rename_remote_file(sftp, remote_dir, old_name, new_name))
+        else:
+            st.error("Please enter both old and new names.")
+
+    st.subheader("Delete File or Directory")
+    name = st.text_input("File or directory name to delete:", key="sftp_delete_name")
+    if st.button("Delete", key="sftp_delete"):
+        if name:
+            st.success(delete_remote_path(sftp, remote_dir, name))
+        else:
+            st.error("Please enter a name.")
+
+    st.subheader("Create Directory")
+    folder_name = st.text_input("New directory name to create:", key="sftp_create_dir")
+    if st.button("Create", key="sftp_create"):
+        if folder_name:
+            st.success(create_remote_dir(sftp, remote_dir, folder_name))
+        else:
+            st.error("Please enter a directory name.")
+
+    # Transfers run on their own SFTP session so the pipelined requests do
+    # not queue behind listing/preview calls on the shared one.
+    st.subheader("Upload File")
+    uploaded_file = st.file_uploader("Choose a file to upload", key="sftp_upload_file")
+    if uploaded_file is not None and st.button("Upload to Remote", key="sftp_upload"):
+        bar = st.progress(0.0)
+        transfer = get_ssh_pool().open_sftp(*login)
+        try:
+            upload_remote_file(
+                transfer, uploaded_file, f"{remote_dir.rstrip('/')}/{uploaded_file.name}",
+                total=uploaded_file.size, progress=transfer_progress(bar),
+            )
+            st.success(f"File '{uploaded_file.name}' uploaded successfully!")
+        except Exception as e:
+            st.error(f"Upload failed: {e}")
+        finally:
+            transfer.close()
+
+    st.subheader("Transfer Between Remote and Local Disk")
+    files = df[df["Type"] == "📄 File"]["Name"].tolist()
+    col1, col2 = st.columns(2)
+    with col1:
+        remote_file = st.selectbox("Remote file", [""] + files, key="sftp_get_file")
+        local_dir = st.text_input("Save into local directory:", value=os.getcwd(), key="sftp_get_dir")
+        if st.button("Download to Local", key="sftp_get") and remote_file:
+            bar = st.progress(0.0)
+            transfer = get_ssh_pool().open_sftp(*login)
+            try:
+                with open(os.path.join(local_dir, remote_file), "wb") as f:
+                    download_remote_file(transfer, f"{remote_dir.rstrip('/')}/{remote_file}", f, progress=transfer_progress(bar))
+                st.success(f"Saved to {os.path.join(local_dir, remote_file)}")
+            except Exception as e:
+                st.error(f"Download failed: {e}")
+            finally:
+                transfer.close()
+    with col2:
+        local_file = st.text_input("Local file path:", key="sftp_put_path")
+        if st.button("Upload to Remote Directory", key="sftp_put") and local_file:
+            bar = st.progress(0.0)
+            transfer = get_ssh_pool().open_sftp(*login)
+            try:
+                with open(local_file, "rb") as f:
+                    upload_remote_file(
+                        transfer, f, f"{remote_dir.rstrip('/')}/{os.path.basename(local_file)}",
+                        total=os.path.getsize(local_file), progress=transfer_progress(bar),
+                    )
+                st.success(f"Uploaded {local_file}")
+            except Exception as e:
+                st.error(f"Upload failed: {e}")
+            finally:
+                transfer.close()
 
 # --- Voice Task Menu ---
 def voice_task(command):
@@ -245,17 +560,6 @@ def voice_task(command):
     else:
         return "Sorry, this basic voice task is not recognized."
 
-def recognize_speech():
-    recognizer = sr.Recognizer()
-    with sr.Microphone() as source:
-        st.info("🎙 Listening... (Check terminal for output)")
-        try:
-            audio = recognizer.listen(source, timeout=5)
-            command = recognizer.recognize_google(audio)
-            return command
-        except Exception as e:
-            return f"Error: {e}"
-
 # --- Streamlit UI ---
 st.set_page_config(page_title="Vyuha: Multitasking Menu-Based System", layout="wide")
 st.title("🛡️ Vyuha: Multitasking Menu-Based System")
@@ -266,6 +570,9 @@ menu = [
     "File Management",
     "Linux Gemini (Natural Language)",
     "Linux Menu SSH (50 Commands)",
+    "Host Metrics",
+    "File Jobs",
+    "Gemini Diagnostics",
     "Voice Task Menu"
 ]
 choice = st.sidebar.selectbox("Navigation", menu)
@@ -274,9 +581,12 @@ if choice == "Home":
     st.header("Welcome to Vyuha!")
     st.write("""
     - **All-in-One Utility**: WhatsApp, Email, SMS, Call, Google Search, Twitter, Instagram, Web Scraping, etc.
-    - **File Management**: Upload, download, rename, delete, preview files.
+    - **File Management**: Upload, download, rename, delete, preview files; find duplicates.
     - **Linux Gemini (Natural Language)**: Describe your task, Gemini generates Linux command, runs on remote.
     - **Linux Menu SSH (50 Commands)**: Menu-based Linux commands on remote system.
+    - **Host Metrics**: Live CPU, memory, load, disk and network charts sampled from /proc.
+    - **File Jobs**: Progress of background copy, move and delete jobs; cancel running ones.
+    - **Gemini Diagnostics**: Latency, tokens, cache hits and errors per Gemini call site.
     - **Voice Task Menu**: Voice-based local tasks (open notepad, VS Code, etc.).
     """)
 
@@ -413,17 +723,31 @@ elif choice == "All-in-One Utility":
 
 elif choice == "File Management":
     st.header("📁 File System Management")
+    target = st.radio("Target", ["Local", "Remote (SFTP)"], horizontal=True, key="file_target")
+    if target == "Remote (SFTP)":
+        remote_file_manager()
+        st.stop()
     default_dir = os.getcwd()
     dir_input = st.text_input("Enter directory path:", value=default_dir)
     current_dir = dir_input if os.path.exists(dir_input) else default_dir
 
     st.subheader("List of Files and Folders")
-    df = list_files_df(current_dir)
+    from dir_listing import display_frame, page_slice, sort_listing
+    refresh = st.button("Refresh listing")
+    listing = list_files_df(current_dir, refresh=refresh)
+    df = with_folder_sizes(current_dir, listing)
     search = st.text_input("Search files/folders", key="file_search")
     if search:
-        df = df[df['Name'].str.contains(search, case=False)]
-    st.dataframe(df, use_container_width=True)
-    selected_file = st.selectbox("Select a file/folder to preview", [""] + df['Name'].tolist(), key="preview_file")
+        df = df[df['Name'].str.contains(search, case=False, regex=False)]
+    col1, col2, col3 = st.columns(3)
+    sort_by = col1.selectbox("Sort by", ["Name", "Size", "Modified"], key="list_sort")
+    descending = col2.checkbox("Descending", key="list_desc")
+    page_size = col3.selectbox("Rows per page", [100, 500, 1000], key="list_page_size")
+    page = st.number_input("Page", min_value=1, value=1, step=1, key="list_page")
+    page_df, pages = page_slice(sort_listing(df, sort_by, descending), page, page_size)
+    st.caption(f"{len(df):,} entries, page {min(page, pages)} of {pages}")
+    st.dataframe(display_frame(page_df), use_container_width=True)
+    selected_file = st.selectbox("Select a file/folder to preview", [""] + page_df['Name'].tolist(), key="preview_file")
     if selected_file:
         file_path = os.path.join(current_dir, selected_file)
         if os.path.isfile(file_path):
@@ -431,6 +755,9 @@ elif choice == "File Management":
         else:
             st.info("Folder selected. Only files can be previewed.")
 
+    st.subheader("Search Whole Tree")
+    render_index_search("tree_search")
+
     st.subheader("Rename File")
     old_name = st.text_input("Old file name:", key="rename_old")
     new_name = st.text_input("New file name:", key="rename_new")
@@ -450,6 +777,20 @@ elif choice == "File Management":
         else:
             st.error("Please enter a name.")
 
+    st.subheader("Bulk Copy, Move or Delete")
+    bulk_names = st.multiselect("Select files/folders (this page)", page_df['Name'].tolist(), key="bulk_names")
+    col1, col2 = st.columns(2)
+    operation = col1.radio("Operation", ["Copy", "Move", "Delete"], horizontal=True, key="bulk_op")
+    bulk_target = col2.text_input("Destination directory (copy/move):", key="bulk_target")
+    confirmed = operation != "Delete" or st.checkbox("Delete the selected items permanently", key="bulk_confirm")
+    if st.button("Start Job"):
+        if confirmed:
+            st.info(start_file_job(operation, current_dir, bulk_names, bulk_target))
+        else:
+            st.error("Tick the box to confirm the delete.")
+    render_file_jobs(limit=5)
+    st.caption("Jobs keep running when you leave this page; follow them live under 'File Jobs'.")
+
     st.subheader("Create Directory")
     folder_name = st.text_input("New directory name to create:", key="create_dir")
     if st.button("Create"):
@@ -460,40 +801,127 @@ elif choice == "File Management":
             st.error("Please enter a directory name.")
 
     st.subheader("Upload File")
-    uploaded_file = st.file_uploader("Choose a file to upload", key="upload_file")
-    if uploaded_file is not None:
-        file_path = os.path.join(current_dir, uploaded_file.name)
-        with open(file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        st.success(f"File '{uploaded_file.name}' uploaded successfully!")
-
-    st.subheader("Download File")
-    files = [f for f in os.listdir(current_dir) if os.path.isfile(os.path.join(current_dir, f))]
-    if files:
-        selected_file = st.selectbox("Select file to download", files, key="download_file")
-        if st.button("Download"):
-            file_path = os.path.join(current_dir, selected_file)
-            with open(file_path, "rb") as f:
-                file_bytes = f.read()
-            st.download_button("Download File", data=file_bytes, file_name=selected_file)
+    render_upload(current_dir, "upload_file")
+
+    st.subheader("Download File or Folder")
+    if len(listing):
+        render_download_link(current_dir, listing["Name"].tolist(), "download_file")
     else:
-        st.info("No files available to download.")
+        st.info("Nothing to download in this folder.")
+
+    # Run last: the page redraws these sections until their scans finish.
+    st.subheader("Folder Sizes")
+    render_folder_sizes(current_dir)
+
+    st.subheader("Duplicate Files")
+    render_duplicates(current_dir)
 
 elif choice == "Linux Gemini (Natural Language)":
     st.header("🧠 Linux Gemini (Natural Language to Command)")
     prompt = st.text_input("Describe your task (e.g., 'list all files', 'show memory info'):")
+    hosts, fleet_settings = select_hosts("nl_hosts")
+    stream = st.checkbox("Stream output live", value=True, key="nl_stream")
+    large = st.checkbox("Large output mode (compressed, paged)", key="nl_large")
+    fuzzy = st.checkbox("Reuse cached commands for reworded prompts (fuzzy match)", key="nl_fuzzy")
+    use_index = st.checkbox("Answer common requests from the local menu index", value=True, key="nl_index")
     if st.button("Generate & Run"):
-        linux_cmd = gemini_linux_command(prompt)
-        st.info(f"Generated Command: `{linux_cmd}`")
-        output = run_ssh_command(linux_cmd)
-        st.code(output)
+        try:
+            linux_cmd, source = gemini_linux_command(prompt, fuzzy=fuzzy, use_index=use_index)
+        except GeminiError as e:
+            st.error(str(e))
+        else:
+            if not linux_cmd:
+                st.error(f"No command for that request (NL backend: {source}).")
+            else:
+                st.info(f"Generated Command: `{linux_cmd}` (via {source})")
+                if large:
+                    run_spooled("nl", hosts, linux_cmd, fleet_settings)
+                else:
+                    run_on_selected_hosts(hosts, linux_cmd, fleet_settings, stream=stream)
+    if large:
+        render_spool("nl")
+    nl_stats = get_nl_cache().stats()
+    st.caption(
+        f"Command cache: {nl_stats['entries']} prompts, {nl_stats['exact_hits']} exact + "
+        f"{nl_stats['fuzzy_hits']} fuzzy hits, {nl_stats['misses']} misses "
+        f"({nl_stats['hit_rate']:.0%} hit rate)"
+    )
+    if prompt:
+        import pandas as pd
+        with st.expander("Closest menu entries"):
+            st.dataframe(pd.DataFrame(
+                get_intent_index().search(prompt), columns=["Menu entry", "Command", "Score"],
+            ))
 
 elif choice == "Linux Menu SSH (50 Commands)":
     st.header("🖥️ Remote Linux Command Executor (50 Commands)")
-    cmd = st.selectbox("Select Linux Command", list(LINUX_MENU_50.keys()))
-    if st.button("Run on Remote"):
-        output = run_ssh_command(LINUX_MENU_50[cmd])
-        st.code(output)
+    mode = st.radio("Mode", ["Single command", "Batch (multi-select)"], horizontal=True)
+    if mode == "Single command":
+        cmd = st.selectbox("Select Linux Command", list(LINUX_MENU_50.keys()))
+    else:
+        labels = st.multiselect("Select Linux Commands", list(LINUX_MENU_50.keys()))
+    hosts, fleet_settings = select_hosts("menu_hosts")
+    refresh = st.checkbox("Force refresh (bypass cache)", key="menu_refresh")
+    if mode == "Single command":
+        stream = st.checkbox("Stream output live", value=True, key="menu_stream")
+        large = st.checkbox("Large output mode (compressed, paged)", key="menu_large")
+        if st.button("Run on Remote"):
+            if large:
+                run_spooled("menu", hosts, LINUX_MENU_50[cmd], fleet_settings)
+            else:
+                outputs = run_on_selected_hosts(
+                    hosts, LINUX_MENU_50[cmd], fleet_settings,
+                    stream=stream, ttl=menu_ttl(cmd), refresh=refresh,
+                )
+                st.session_state["menu_last_output"] = (cmd, outputs)
+        if large:
+            render_spool("menu")
+        last = st.session_state.get("menu_last_output")
+        from output_parsers import PARSERS
+        if not large and last and last[0] == cmd and cmd in PARSERS:
+            render_parsed_output(*last)
+    elif st.button("Run Batch on Remote"):
+        run_batch_on_selected_hosts(hosts, labels, fleet_settings, refresh=refresh)
+    cache_stats = get_result_cache().stats()
+    st.caption(
+        f"Result cache: {cache_stats['entries']} entries, {cache_stats['hits']} hits, "
+        f"{cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%} hit rate)"
+    )
+
+elif choice == "Host Metrics":
+    st.header("📈 Host Metrics (Live /proc Sampler)")
+    names = [h["name"] for h in SSH_INVENTORY]
+    name = st.selectbox("Host", names, key="metrics_host")
+    host = next(h for h in SSH_INVENTORY if h["name"] == name)
+    col1, col2 = st.columns(2)
+    interval = col1.number_input("Sample interval (s)", min_value=0.5, max_value=60.0, value=2.0, step=0.5)
+    size = col2.number_input("Samples kept", min_value=10, max_value=10000, value=300)
+    registry = get_sampler_registry()
+    col1, col2 = st.columns(2)
+    if col1.button("Start Sampling"):
+        registry.start(get_ssh_pool(), host, interval, int(size))
+    if col2.button("Stop Sampling"):
+        registry.stop(name)
+    sampler = registry.get(name)
+    if sampler is None:
+        st.info("Sampler not running for this host. Click 'Start Sampling'.")
+    else:
+        live = st.checkbox("Live update", value=True, key="metrics_live")
+        placeholder = st.empty()
+        while True:
+            render_metrics(placeholder, sampler)
+            if not live or not sampler.running:
+                break
+            time.sleep(sampler.interval)
+
+elif choice == "File Jobs":
+    st.header("🗂️ File Jobs")
+    live = st.checkbox("Live update", value=True, key="jobs_live")
+    render_file_jobs(live=live, limit=50)
+
+elif choice == "Gemini Diagnostics":
+    st.header("📊 Gemini Diagnostics")
+    render_gemini_diagnostics()
 
 elif choice == "Voice Task Menu":
     st.header("🎙️ Voice Task Menu (Local Machine)")
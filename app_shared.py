@@ -0,0 +1,564 @@
+import os
+import time
+import streamlit as st
+from nl_cache import NLCommandCache
+from gemini_client import GeminiClient
+from gemini_metrics import GeminiMetrics, start_metrics_server
+
+# --- Shared App Helpers ---
+# Page helpers used by both app1.py and app2.py: the File Manager, the Gemini
+# client and NL-to-command wiring, the SSH pool and speech input. Settings
+# that differ per app (credentials, Gemini model, metrics site) are passed in.
+# Heavy packages are still imported inside the helpers that use them.
+
+# --- File System Helpers ---
+def get_human_readable_size(size):
+    for unit in ['bytes', 'KB', 'MB', 'GB']:
+        if size < 1024.0 or unit == 'GB':
+            break
+        size /= 1024.0
+    return f"{size:.2f} {unit}"
+
+@st.cache_resource
+def get_dir_listing():
+    from dir_listing import DirectoryListing
+    return DirectoryListing()
+
+def list_files_df(directory, refresh=False):
+    # Name, Type, Size (bytes, NaN for folders) and Modified, from one scandir
+    # pass; reused until the directory changes. dir_listing.display_frame
+    # formats the rows that are shown.
+    return get_dir_listing().get(directory, refresh=refresh)
+
+# Recursive index of FILE_INDEX_ROOT for whole-tree search; built in the
+# background on first use and kept current from filesystem events.
+FILE_INDEX_ROOT = os.environ.get("FILE_INDEX_ROOT", os.path.expanduser("~"))
+
+@st.cache_resource
+def get_file_index():
+    from file_index import FileIndex
+    db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "file_index.sqlite3")
+    return FileIndex(db_path, FILE_INDEX_ROOT).start()
+
+def render_index_search(key):
+    import pandas as pd
+    from dir_listing import display_frame
+    index = get_file_index()
+    status = index.status()
+    note = f" — {status['error']}" if status["error"] else ""
+    st.caption(
+        f"{status['files']:,} files in {status['dirs']:,} folders under {status['root']} "
+        f"({status['state']}, {status['mode']}){note}"
+    )
+    col1, col2, col3, col4 = st.columns(4)
+    text = col1.text_input("Name contains (or glob: *.log)", key=f"{key}_text", help="Case-insensitive: *.PDF also finds report.pdf.")
+    ext = col2.text_input("Extension", key=f"{key}_ext")
+    min_mb = col3.number_input("Min size (MB)", min_value=0.0, value=0.0, key=f"{key}_min")
+    days = col4.number_input("Modified within (days, 0 = any)", min_value=0, value=0, key=f"{key}_days")
+    if not (text or ext or min_mb or days):
+        return
+    rows = index.search(
+        text=text or None, ext=ext or None,
+        min_size=int(min_mb * 1024 * 1024) if min_mb else None,
+        newer_than=time.time() - days * 86400 if days else None,
+    )
+    df = pd.DataFrame({
+        "Name": [r["path"] for r in rows],
+        "Type": ["📁 Folder" if r["is_dir"] else "📄 File" for r in rows],
+        "Size": [float("nan") if r["is_dir"] else r["size"] for r in rows],
+        "Modified": pd.to_datetime([r["mtime"] for r in rows], unit="s"),
+    })
+    st.caption(f"{len(rows)} matches" + (" (first 500)" if len(rows) == 500 else ""))
+    st.dataframe(display_frame(df), use_container_width=True)
+
+@st.cache_resource
+def get_file_server():
+    # Downloads stream from disk through a small HTTP server on its own port
+    # (st.download_button would hold the whole file in memory per user).
+    # FILE_SERVER_URL is the address browsers use to reach it. The same
+    # server takes the resumable uploads.
+    from file_server import FileServer
+    port = int(os.environ.get("FILE_SERVER_PORT", "8765"))
+    return FileServer(
+        port=port, public_url=os.environ.get("FILE_SERVER_URL"), upload_store=get_upload_store(),
+    ).start()
+
+@st.cache_resource
+def get_upload_store():
+    # Partial uploads and the content-addressed copies live here; keep it on
+    # the same filesystem as the upload targets so duplicates can be hard links.
+    from upload_store import UploadStore
+    default = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".upload_store")
+    store = UploadStore(os.environ.get("UPLOAD_STORE_DIR", default))
+    store.cleanup()
+    return store
+
+def render_upload(current_dir, key):
+    import streamlit.components.v1 as components
+    from file_server import uploader_html
+    overwrite = st.checkbox("Overwrite existing files (otherwise saved as 'name (1)')", key=f"{key}_overwrite")
+    mode = st.radio("Uploader", ["Resumable (large files)", "Streamlit"], horizontal=True, key=f"{key}_mode")
+    if mode == "Streamlit":
+        uploaded_file = st.file_uploader("Choose a file to upload", key=key)
+        if uploaded_file is not None and st.button("Save Upload", key=f"{key}_save"):
+            result = get_upload_store().ingest(
+                uploaded_file, current_dir, uploaded_file.name, uploaded_file.size, overwrite=overwrite,
+            )
+            note = " (already stored, linked)" if result["deduplicated"] else ""
+            st.success(f"File '{os.path.basename(result['path'])}' uploaded successfully!{note}")
+    else:
+        components.html(uploader_html(get_file_server().upload_link(current_dir, overwrite)), height=220, scrolling=True)
+    stats = get_upload_store().stats()
+    st.caption(
+        f"{stats['uploads']} uploads, {get_human_readable_size(stats['bytes'])} at "
+        f"{get_human_readable_size(stats['throughput'])}/s | dedup: {stats['dedup_uploads']} files, "
+        f"{get_human_readable_size(stats['dedup_bytes'])} ({stats['dedup_ratio']:.0%} of bytes) | "
+        f"store: {stats['objects']} objects, {get_human_readable_size(stats['stored_bytes'])}"
+    )
+
+def render_download_link(current_dir, names, key):
+    from file_server import ARCHIVE_FORMATS
+    selected = st.selectbox("Select file or folder to download", names, key=key)
+    path = os.path.join(current_dir, selected)
+    if os.path.isdir(path):
+        archive = st.radio("Folder as", list(ARCHIVE_FORMATS), horizontal=True, key=f"{key}_format")
+        url = get_file_server().link(path, archive)
+        label = f"{selected}{ARCHIVE_FORMATS[archive][1]}"
+    else:
+        url = get_file_server().link(path)
+        label = selected
+    st.markdown(f"[⬇️ Download {label}]({url})")
+    st.caption("Streamed from disk; an interrupted file download can be resumed by the browser.")
+
+@st.cache_resource
+def get_size_scans():
+    from dir_sizes import SizeScanRegistry
+    return SizeScanRegistry()
+
+def with_folder_sizes(directory, listing):
+    # Folder sizes from the latest scan of `directory`, partial while it runs.
+    from dir_sizes import fill_folder_sizes
+    scan = get_size_scans().get(directory)
+    return listing if scan is None else fill_folder_sizes(listing, scan)
+
+def _set_size_drill(path):
+    st.session_state["size_drill"] = path
+
+def render_folder_sizes(current_dir):
+    import pandas as pd
+    from dir_listing import display_frame, format_sizes
+    from dir_sizes import largest_children
+    registry = get_size_scans()
+    col1, col2, col3 = st.columns(3)
+    if col1.button("Compute folder sizes"):
+        registry.start(current_dir)
+    if col2.button("Full rescan", help="List every folder again instead of reusing sizes of unchanged folders."):
+        registry.start(current_dir, full=True)
+    scan = registry.get(current_dir)
+    if scan is None:
+        st.caption("Folder sizes have not been computed for this directory.")
+        return
+    if scan.running and col3.button("Cancel size scan"):
+        scan.cancel()
+    # Fill in while the scan runs; the finished view below replaces it.
+    placeholder = st.empty()
+    while scan.running:
+        results = scan.results()
+        done = sum(1 for _, _, finished in results.values() if finished)
+        rows = sorted(results.items(), key=lambda kv: -kv[1][0])
+        with placeholder.container():
+            st.caption(f"Scanning: {done} of {len(results)} folders finished, {scan.dirs_listed + scan.dirs_reused:,} directories visited")
+            st.dataframe(pd.DataFrame({
+                "Folder": [name for name, _ in rows],
+                "Size": format_sizes([r[0] for _, r in rows]),
+                "Files": [r[1] for _, r in rows],
+                "Done": ["✔" if r[2] else "…" for _, r in rows],
+            }), use_container_width=True)
+        time.sleep(0.5)
+    placeholder.empty()
+    state = "cancelled" if scan.cancelled else "done"
+    st.caption(
+        f"Scan {state} in {scan.seconds}s: {scan.dirs_listed:,} directories listed, "
+        f"{scan.dirs_reused:,} unchanged since the last scan, {scan.errors} unreadable"
+    )
+    if scan.cancelled:
+        return
+    if scan.oldest_reused is not None:
+        age = max(1, round((time.time() - scan.oldest_reused) / 60))
+        st.caption(
+            f"Sizes of unchanged folders were reused from a scan up to {age} min ago; files that grew "
+            "in place since (e.g. logs) may show their old size. Use Full rescan for exact figures."
+        )
+    # Largest-children drill-down, starting at the current directory.
+    drill = st.session_state.get("size_drill", current_dir)
+    if not (drill == current_dir or drill.startswith(current_dir.rstrip(os.sep) + os.sep)):
+        drill = current_dir
+    children = largest_children(registry.cache, drill)
+    st.write(f"Largest items in `{drill}`")
+    st.dataframe(display_frame(children), use_container_width=True)
+    col1, col2 = st.columns([3, 1])
+    folders = children.loc[children["Type"] == "📁 Folder", "Name"].tolist()
+    pick = col1.selectbox("Open folder", [""] + folders, key=f"size_drill_pick_{drill}")
+    if pick:
+        col1.button("Open", on_click=_set_size_drill, args=(os.path.join(drill, pick),))
+    if drill != current_dir:
+        col2.button("⬆ Up", on_click=_set_size_drill, args=(os.path.dirname(drill),))
+
+@st.cache_resource
+def get_file_jobs():
+    # Bulk delete/copy/move on background threads, shared by every session;
+    # a job keeps running when its page is left.
+    from file_jobs import JobManager
+    return JobManager()
+
+def start_file_job(operation, directory, names, target_dir=""):
+    if not names:
+        return "Select at least one file or folder."
+    kind = operation.lower()
+    if kind == "delete":
+        pairs = [(os.path.join(directory, name), None) for name in names]
+    elif not os.path.isdir(target_dir):
+        return f"Destination is not a directory: {target_dir}"
+    else:
+        pairs = [(os.path.join(directory, name), os.path.join(target_dir, name)) for name in names]
+    job = get_file_jobs().submit(kind, pairs)
+    return f"Job #{job.id} started: {job.label}"
+
+def render_file_jobs(live=False, limit=10):
+    manager = get_file_jobs()
+    jobs = manager.jobs()[:limit]
+    if not jobs:
+        st.caption("No file jobs yet.")
+        return
+    for job in jobs:
+        if job.running:
+            st.button(f"Cancel job #{job.id}", key=f"cancel_job_{job.id}", on_click=manager.cancel, args=(job.id,))
+    placeholder = st.empty()
+    while True:
+        with placeholder.container():
+            for job in jobs:
+                p = job.progress()
+                st.progress(min(p["fraction"], 1.0))
+                st.caption(
+                    f"#{p['id']} {p['job']} — {p['state']}: {p['files_done']:,} of {p['files_total']:,} files, "
+                    f"{get_human_readable_size(p['bytes_done'])} of {get_human_readable_size(p['bytes_total'])} | "
+                    f"{p['files_per_s']:,.0f} files/s, {get_human_readable_size(p['bytes_per_s'])}/s, {p['seconds']}s"
+                )
+        if not live or not any(job.running for job in jobs):
+            break
+        time.sleep(0.5)
+    for job in jobs:
+        if job.errors:
+            with st.expander(f"Job #{job.id}: {len(job.errors)} errors"):
+                st.code("\n".join(job.errors))
+
+def rename_file(directory, old_name, new_name):
+    import errno
+    old_path = os.path.join(directory, old_name)
+    new_path = os.path.join(directory, new_name)
+    try:
+        os.rename(old_path, new_path)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        # Target on another filesystem: copy + delete in the background.
+        job = get_file_jobs().submit("move", [(old_path, new_path)])
+        return f"Different filesystem: move job #{job.id} started"
+    return "Renamed Successfully"
+
+def delete_path(directory, name):
+    path = os.path.join(directory, name)
+    if os.path.isfile(path) or os.path.islink(path):
+        os.remove(path)
+        return "File deleted successfully"
+    elif os.path.isdir(path):
+        # A large tree takes minutes; delete it in the background.
+        job = get_file_jobs().submit("delete", [(path, None)])
+        return f"Directory delete job #{job.id} started"
+    else:
+        return "Enter correct path"
+
+def create_dir(directory, folder_name):
+    path = os.path.join(directory, folder_name)
+    os.makedirs(path, exist_ok=True)
+    return "Directory Created successfully"
+
+@st.cache_resource
+def get_duplicate_scans():
+    from dup_finder import DuplicateScanRegistry
+    return DuplicateScanRegistry()
+
+def delete_duplicates(scan, selections):
+    # selections: [(group paths, paths to delete)]. Each copy goes through
+    # delete_path; a file that changed since it was hashed is left alone, and
+    # a group is skipped unless a copy being kept is still unchanged, so the
+    # content always survives somewhere.
+    deleted, skipped = [], 0
+    for paths, chosen in selections:
+        kept = [p for p in paths if p not in chosen]
+        if not any(scan.unchanged(p) for p in kept):
+            skipped += len(chosen)
+            continue
+        for path in chosen:
+            if scan.unchanged(path):
+                delete_path(os.path.dirname(path), os.path.basename(path))
+                deleted.append(path)
+            else:
+                skipped += 1
+    scan.discard(deleted)
+    return len(deleted), skipped
+
+def _delete_duplicates_clicked(scan, selections):
+    if not st.session_state.get("dup_confirm"):
+        st.session_state["dup_result"] = "Tick the box to confirm the delete."
+        return
+    deleted, skipped = delete_duplicates(scan, selections)
+    note = f", {skipped} skipped (changed since the scan, or no unchanged copy left to keep)" if skipped else ""
+    st.session_state["dup_result"] = f"Deleted {deleted} duplicate files{note}."
+
+def render_duplicates(current_dir, page_size=20):
+    registry = get_duplicate_scans()
+    index = get_file_index()
+    col1, col2, col3 = st.columns(3)
+    min_kb = col1.number_input("Ignore files smaller than (KB)", min_value=0, value=1, key="dup_min_kb")
+    directory = os.path.abspath(current_dir)
+    indexed = index.last_scan is not None and (directory + os.sep).startswith(index.root.rstrip(os.sep) + os.sep)
+    use_index = indexed and col2.checkbox("File list from the whole-tree index", value=True, key="dup_use_index")
+    if col3.button("Find duplicates"):
+        min_size = int(min_kb * 1024)
+        files = index.iter_files(directory, min_size) if use_index else None
+        registry.start(directory, min_size, files)
+    scan = registry.get(directory)
+    if scan is None:
+        st.caption("No duplicate scan for this directory yet.")
+        return
+    if scan.running:
+        st.button("Cancel duplicate scan", on_click=scan.cancel)
+    placeholder = st.empty()
+    while True:
+        p = scan.progress()
+        placeholder.caption(
+            f"{p['stage']}: {p['files']:,} files ({get_human_readable_size(p['bytes'])}) listed, "
+            f"{p['size_candidates']:,} share a size, {p['edge_hashed']:,} edge-hashed, "
+            f"{p['full_hashed']:,} of {p['full_candidates']:,} fully hashed "
+            f"({get_human_readable_size(p['bytes_hashed'])}), {p['hardlinks']:,} extra hard links, "
+            f"{p['errors']} unreadable, {p['seconds']}s"
+        )
+        if not scan.running:
+            break
+        time.sleep(0.5)
+    if scan.stage != "done":
+        return
+    if "dup_result" in st.session_state:
+        st.info(st.session_state.pop("dup_result"))
+    st.write(f"**{p['groups']:,} duplicate groups, {get_human_readable_size(p['reclaimable'])} reclaimable**")
+    if not p["groups"]:
+        return
+    pages = (p["groups"] - 1) // page_size + 1
+    page = st.number_input(f"Group page (of {pages})", min_value=1, max_value=pages, value=1, key="dup_page")
+    selections = []
+    for group in scan.groups(limit=page_size, offset=(page - 1) * page_size):
+        label = (f"{group['count']} × {get_human_readable_size(group['size'])} — "
+                 f"{get_human_readable_size(group['reclaimable'])} reclaimable")
+        with st.expander(label):
+            # All but the first copy are preselected.
+            chosen = st.multiselect("Delete", group["paths"], default=group["paths"][1:],
+                                    key=f"dup_{group['size']}_{group['digest']}")
+            if len(chosen) == len(group["paths"]):
+                st.warning("Keep at least one copy; nothing in this group will be deleted.")
+            elif chosen:
+                selections.append((group["paths"], chosen))
+    selected = sum(len(chosen) for _, chosen in selections)
+    st.checkbox(f"Delete the {selected} selected files on this page permanently", key="dup_confirm")
+    st.button("Delete Selected Duplicates", on_click=_delete_duplicates_clicked, args=(scan, selections))
+
+def preview_file(file_path):
+    try:
+        if file_path.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp')):
+            st.image(file_path)
+        elif file_path.lower().endswith(('.txt', '.csv', '.md', '.py', '.json', '.xml', '.log')):
+            preview_text_file(file_path)
+    except Exception as e:
+        st.error(f"Cannot preview file: {e}")
+
+def get_mapped_file(file_path):
+    # One mapping per session, kept across reruns so its lazy line index is
+    # built once; refreshed so a growing file shows its new lines.
+    from file_preview import MappedFile
+    entry = st.session_state.get("mapped_file")
+    if entry is not None and entry[0] == file_path:
+        entry[1].refresh()
+        return entry[1]
+    if entry is not None:
+        entry[1].close()
+    mapped = MappedFile(file_path)
+    st.session_state["mapped_file"] = (file_path, mapped)
+    return mapped
+
+def preview_text_file(file_path):
+    # Head, tail, line ranges, search and follow over a memory-mapped file;
+    # only the lines shown are read and decoded.
+    mapped = get_mapped_file(file_path)
+    col1, col2 = st.columns([3, 1])
+    mode = col1.radio("Show", ["Head", "Tail", "Line range", "Search", "Follow"], horizontal=True, key="preview_mode")
+    count = col2.number_input("Lines", min_value=1, max_value=5000, value=200, key="preview_lines")
+    st.caption(f"{get_human_readable_size(mapped.size)}")
+    if mode == "Head":
+        st.code(mapped.head(count), language="text")
+    elif mode == "Tail":
+        st.code(mapped.tail(count), language="text")
+    elif mode == "Line range":
+        first = st.number_input(f"First line (of {mapped.line_count():,})", min_value=1, value=1, key="preview_first")
+        st.code(mapped.lines(first - 1, count), language="text")
+    elif mode == "Search":
+        col1, col2, col3 = st.columns([3, 1, 1])
+        term = col1.text_input("Search for", key="preview_term")
+        regex = col2.checkbox("Regex", key="preview_regex")
+        case = col3.checkbox("Match case", key="preview_case")
+        if term:
+            hits = mapped.search(term, regex=regex, ignore_case=not case)
+            if hits:
+                line = st.selectbox(
+                    f"{len(hits)} matching lines" + (" (first 200)" if len(hits) == 200 else ""),
+                    [n for n, _ in hits], format_func=lambda n: f"{n + 1}: {dict(hits)[n][:120]}", key="preview_hit",
+                )
+                st.caption(f"Line {line + 1}")
+                st.code(mapped.lines(max(0, line - 5), 11), language="text")
+            else:
+                st.info("No matches.")
+    elif _follow_tail is not None:
+        _follow_tail(file_path, count)
+    else:
+        st.code(mapped.tail(count), language="text")
+        st.caption("Live follow needs Streamlit 1.33 or newer; rerun the page to refresh.")
+
+# Like `tail -f`, but as a fragment that reruns on its own every
+# FOLLOW_INTERVAL seconds: the rest of the page renders normally instead of
+# waiting behind a redraw loop that never returns.
+FOLLOW_INTERVAL = 1.0
+
+def _tail_view(file_path, count):
+    st.code(get_mapped_file(file_path).tail(count), language="text")
+
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+_follow_tail = _fragment(run_every=FOLLOW_INTERVAL)(_tail_view) if _fragment else None
+
+
+# --- Gemini Setup ---
+@st.cache_resource
+def get_gemini_metrics():
+    # Per-process call accounting; also served on GEMINI_METRICS_PORT for
+    # Prometheus when that variable is set.
+    metrics = GeminiMetrics()
+    port = os.environ.get("GEMINI_METRICS_PORT")
+    if port:
+        start_metrics_server(metrics, int(port))
+    return metrics
+
+@st.cache_resource
+def get_gemini_client(api_key, model_name):
+    # One client per process: identical prompts from concurrent sessions are
+    # merged and every page shares the same concurrency and rate budget.
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    return GeminiClient(genai.GenerativeModel(model_name), metrics=get_gemini_metrics())
+
+# --- Gemini Diagnostics ---
+def render_gemini_diagnostics():
+    import pandas as pd
+    metrics = get_gemini_metrics()
+    if st.button("Reset counters"):
+        metrics.reset()
+    rows = metrics.rows()
+    if rows:
+        st.dataframe(pd.DataFrame(rows), use_container_width=True)
+    else:
+        st.info("No Gemini calls recorded in this process yet.")
+    text = metrics.to_prometheus()
+    port = os.environ.get("GEMINI_METRICS_PORT")
+    st.caption(
+        f"Prometheus scrape endpoint: http://<this host>:{port}/metrics" if port
+        else "Set GEMINI_METRICS_PORT to serve these figures on /metrics for Prometheus."
+    )
+    st.download_button("Download metrics (Prometheus text)", text, file_name="gemini_metrics.prom", mime="text/plain")
+    with st.expander("Prometheus text"):
+        st.code(text)
+
+# --- Natural Language to Linux Command ---
+@st.cache_resource
+def get_nl_cache():
+    return NLCommandCache(os.path.join(os.path.dirname(os.path.abspath(__file__)), "nl_cache.sqlite3"))
+
+@st.cache_resource
+def get_intent_index():
+    from intent_index import IntentIndex
+    from linux_menu import LINUX_MENU_50, MENU_SYNONYMS
+    return IntentIndex(LINUX_MENU_50, MENU_SYNONYMS)
+
+# NL_BACKEND picks the command generator: "gemini" (default), "template"
+# (offline rules + menu index), or a chain such as "template+gemini" or
+# "template+llama" (LLAMA_MODEL_PATH points at a local GGUF model).
+NL_BACKEND = os.environ.get("NL_BACKEND", "gemini")
+
+@st.cache_resource
+def get_nl_backend(site, model_name, _gemini_client):
+    # _gemini_client is a factory, only called if the backend needs Gemini;
+    # the leading underscore keeps it out of the cache key.
+    from nl_backends import build_backend
+    return build_backend(
+        NL_BACKEND, gemini_client=_gemini_client, gemini_model=model_name,
+        site=site, intent_index=get_intent_index(),
+    )
+
+def nl_linux_command(prompt, backend, site, fuzzy=False, use_index=False):
+    # Returns (command, source) where source says whether the local intent
+    # index, the cache or the NL backend answered; command is None when the
+    # backend has no answer. Backend errors (GeminiError) are left to the page.
+    if use_index:
+        hit = get_intent_index().match(prompt)
+        if hit:
+            label, command, score = hit
+            get_gemini_metrics().record_lookup(site, "index")
+            return command, f"local index: {label}, score {score:.2f}"
+    cache = get_nl_cache()
+    if backend.cache_key:
+        command, match = cache.lookup(prompt, backend.cache_key, fuzzy=fuzzy)
+        if command:
+            get_gemini_metrics().record_lookup(site, match)
+            return command, f"cache ({match})"
+    command, source = backend.translate(prompt)
+    if not command:
+        return None, backend.name
+    if source == "template":
+        get_gemini_metrics().record_lookup(site, source)
+    elif backend.cache_key:
+        cache.put(prompt, backend.cache_key, command)
+    return command, source
+
+# --- SSH Command Execution ---
+@st.cache_resource
+def get_ssh_pool():
+    # Shared across reruns and sessions so authenticated transports are reused.
+    from ssh_pool import SSHPool
+    return SSHPool()
+
+def run_remote_command(host, user, password, command, port=22):
+    try:
+        output, error, _ = get_ssh_pool().run(host, port, user, password, command)
+        return output if output else error
+    except Exception as e:
+        return f"SSH Error: {e}"
+
+# --- Voice Recognition (Local use) ---
+def recognize_speech():
+    import speech_recognition as sr
+    recognizer = sr.Recognizer()
+    with sr.Microphone() as source:
+        st.info("🎙 Listening... (Check terminal for output)")
+        try:
+            audio = recognizer.listen(source, timeout=5)
+            command = recognizer.recognize_google(audio)
+            print(f"🗣 You said: {command}")
+            return command
+        except Exception as e:
+            return f"Error: {e}"
@@ -0,0 +1,342 @@
+import argparse
+import json
+import logging
+import platform
+import socket
+import statistics
+import struct
+import subprocess
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import paramiko
+
+from ssh_pool import SSHPool
+from ssh_batch import run_batch
+from ssh_stream import stream_command
+from ssh_spool import run_compressed
+
+# --- SSH Execution Benchmarks ---
+# Runs against an in-process paramiko server on localhost, so connect, exec,
+# concurrency and large-output behaviour can be tracked without a real host.
+#
+#   python bench_ssh.py --output bench_ssh.json
+#   python bench_ssh.py --quick
+
+USER = "bench"
+PASSWORD = "bench"
+
+# --- Command Backends ---
+class ShellBackend:
+    # Runs the command with the local sh, stdin/stdout/stderr wired to the channel.
+    def start(self, command):
+        return subprocess.Popen(
+            ["sh", "-c", command],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+
+class SyntheticBackend:
+    # Fixed latency and output size, independent of the command text.
+    def __init__(self, latency=0.0, output_bytes=64):
+        self.latency = latency
+        self.output_bytes = output_bytes
+
+    def start(self, command):
+        script = f"sleep {self.latency}; head -c {self.output_bytes} /dev/zero | tr '\\0' 'x'"
+        return subprocess.Popen(
+            ["sh", "-c", script],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+
+# --- In-process SSH Server ---
+class _ServerTransport(paramiko.Transport):
+    # paramiko sends the exec-request reply only after check_channel_exec_request
+    # returns, so a fast command could close its channel first and the client
+    # would see "Channel closed". Record when each reply has gone out so the
+    # worker can hold the exit status and close until then.
+    def __init__(self, sock):
+        super().__init__(sock)
+        self.replied = {}
+        self._replied_lock = threading.Lock()
+
+    def reply_event(self, remote_chanid):
+        with self._replied_lock:
+            return self.replied.setdefault(remote_chanid, threading.Event())
+
+    def _send_user_message(self, data):
+        super()._send_user_message(data)
+        raw = data.asbytes()
+        if raw[:1] == bytes([paramiko.common.MSG_CHANNEL_SUCCESS]):
+            self.reply_event(struct.unpack(">I", raw[1:5])[0]).set()
+
+class _StubServer(paramiko.ServerInterface):
+    def __init__(self, backend):
+        self.backend = backend
+
+    def check_auth_password(self, username, password):
+        if username == USER and password == PASSWORD:
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_exec_request(self, channel, command):
+        threading.Thread(
+            target=self._run, args=(channel, command.decode()), daemon=True,
+        ).start()
+        return True
+
+    def _run(self, channel, command):
+        proc = self.backend.start(command)
+
+        def pump_stdin():
+            try:
+                while True:
+                    data = channel.recv(32768)
+                    if not data:
+                        break
+                    proc.stdin.write(data)
+                    proc.stdin.flush()
+            except (OSError, ValueError):
+                pass
+            finally:
+                try:
+                    proc.stdin.close()
+                except OSError:
+                    pass
+
+        def pump(src, send):
+            for data in iter(lambda: src.read1(32768), b""):
+                send(data)
+
+        threads = [
+            threading.Thread(target=pump_stdin, daemon=True),
+            threading.Thread(target=pump, args=(proc.stdout, channel.sendall), daemon=True),
+            threading.Thread(target=pump, args=(proc.stderr, channel.sendall_stderr), daemon=True),
+        ]
+        for t in threads:
+            t.start()
+        threads[1].join()
+        threads[2].join()
+        channel.get_transport().reply_event(channel.remote_chanid).wait(5)
+        channel.send_exit_status(proc.wait())
+        channel.close()
+
+class LocalSSHServer:
+    def __init__(self, backend=None):
+        self.backend = backend or ShellBackend()
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(128)
+        self.port = self.sock.getsockname()[1]
+        self._transports = []
+        self._stop = False
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def _accept_loop(self):
+        while not self._stop:
+            try:
+                client, _ = self.sock.accept()
+            except OSError:
+                break
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            transport = _ServerTransport(client)
+            transport.add_server_key(self.host_key)
+            try:
+                transport.start_server(server=_StubServer(self.backend))
+            except paramiko.SSHException:
+                continue
+            self._transports.append(transport)
+
+    def close(self):
+        self._stop = True
+        self.sock.close()
+        for transport in self._transports:
+            transport.close()
+
+# --- Measurements ---
+def summarize(samples):
+    samples = sorted(samples)
+    if not samples:
+        return {}
+    return {
+        "n": len(samples),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 2),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 2),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 2),
+        "max_ms": round(samples[-1] * 1000, 2),
+    }
+
+def run_fresh_connection(port, command):
+    # The original run_ssh_command: connect, exec, read, close on every call.
+    ssh = paramiko.SSHClient()
+    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    ssh.connect("127.0.0.1", port, USER, PASSWORD, look_for_keys=False, allow_agent=False)
+    try:
+        stdin, stdout, stderr = ssh.exec_command(command)
+        output = stdout.read().decode()
+        stderr.read()
+        return output
+    finally:
+        ssh.close()
+
+def bench_connect(port, n):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        ssh = paramiko.SSHClient()
+        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        ssh.connect("127.0.0.1", port, USER, PASSWORD, look_for_keys=False, allow_agent=False)
+        samples.append(time.perf_counter() - start)
+        ssh.close()
+    return summarize(samples)
+
+def bench_exec(port, pool, n, command="echo hello"):
+    fresh, pooled = [], []
+    for _ in range(n):
+        start = time.perf_counter()
+        run_fresh_connection(port, command)
+        fresh.append(time.perf_counter() - start)
+    pool.run("127.0.0.1", port, USER, PASSWORD, command)
+    for _ in range(n):
+        start = time.perf_counter()
+        pool.run("127.0.0.1", port, USER, PASSWORD, command)
+        pooled.append(time.perf_counter() - start)
+    return {"fresh_connection": summarize(fresh), "pooled": summarize(pooled)}
+
+def check_auth(port, pool, command="echo hello"):
+    # A wrong password must fail even while a transport for the same host and
+    # user is pooled; the pool is shared by every session of the app.
+    pool.run("127.0.0.1", port, USER, PASSWORD, command)
+    try:
+        pool.run("127.0.0.1", port, USER, PASSWORD + "-wrong", command)
+    except paramiko.AuthenticationException:
+        return {"wrong_password_rejected": True}
+    return {"wrong_password_rejected": False}
+
+def bench_throughput(port, pool, sessions, commands_per_session, command="echo hello"):
+    def fresh_worker(_):
+        for _ in range(commands_per_session):
+            run_fresh_connection(port, command)
+
+    def pooled_worker(_):
+        for _ in range(commands_per_session):
+            pool.run("127.0.0.1", port, USER, PASSWORD, command)
+
+    results = {}
+    total = sessions * commands_per_session
+    for name, worker in [("fresh_connection", fresh_worker), ("pooled", pooled_worker)]:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=sessions) as executor:
+            list(executor.map(worker, range(sessions)))
+        elapsed = time.perf_counter() - start
+        results[name] = {
+            "sessions": sessions,
+            "commands": total,
+            "seconds": round(elapsed, 3),
+            "commands_per_second": round(total / elapsed, 1),
+        }
+    return results
+
+def bench_batch(port, pool, n_commands, repeats):
+    commands = [f"echo command-{i}" for i in range(n_commands)]
+    sequential, batched = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for command in commands:
+            pool.run("127.0.0.1", port, USER, PASSWORD, command)
+        sequential.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        run_batch(pool, "127.0.0.1", port, USER, PASSWORD, commands)
+        batched.append(time.perf_counter() - start)
+    return {
+        "commands": n_commands,
+        "pooled_sequential": summarize(sequential),
+        "pooled_batched": summarize(batched),
+    }
+
+def bench_large_output(port, pool, megabytes):
+    command = f"head -c {megabytes * 1024 * 1024} /dev/zero | tr '\\0' 'a' | fold -w 100"
+    results = {}
+
+    def measure(name, fn):
+        tracemalloc.start()
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = {"seconds": round(elapsed, 3), "peak_python_mb": round(peak / 2 ** 20, 2)}
+
+    measure("pooled_buffered", lambda: pool.run("127.0.0.1", port, USER, PASSWORD, command))
+    measure("pooled_streamed_1mb_ring", lambda: stream_command(
+        pool, "127.0.0.1", port, USER, PASSWORD, command, max_bytes=1024 * 1024,
+    ))
+
+    def spooled():
+        spool = run_compressed(pool, "127.0.0.1", port, USER, PASSWORD, command)
+        results.setdefault("spool", {})["compressed_bytes"] = spool.compressed_bytes
+        spool.delete()
+    measure("pooled_compressed_spool", spooled)
+    results["output_mb"] = megabytes
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SSH command execution against a local server.")
+    parser.add_argument("--output", help="write the JSON report to this file (default: stdout)")
+    parser.add_argument("--quick", action="store_true", help="small iteration counts for a smoke run")
+    parser.add_argument("--backend", choices=["shell", "synthetic"], default="shell")
+    parser.add_argument("--latency", type=float, default=0.0, help="synthetic backend per-command latency (s)")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--large-mb", type=int, default=32)
+    args = parser.parse_args()
+
+    # Clients hanging up on the stub server is expected; keep the report readable.
+    logging.getLogger("paramiko").setLevel(logging.CRITICAL)
+
+    n = 5 if args.quick else 30
+    per_session = 3 if args.quick else 10
+    large_mb = min(args.large_mb, 4) if args.quick else args.large_mb
+    backend = ShellBackend() if args.backend == "shell" else SyntheticBackend(args.latency)
+
+    server = LocalSSHServer(backend)
+    pool = SSHPool()
+    try:
+        report = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "paramiko": paramiko.__version__,
+            "backend": args.backend,
+            "connect": bench_connect(server.port, n),
+            "auth": check_auth(server.port, pool),
+            "exec": bench_exec(server.port, pool, n),
+            "throughput": bench_throughput(server.port, pool, args.sessions, per_session),
+        }
+        if args.backend == "shell":
+            report["batch"] = bench_batch(server.port, pool, 15, max(3, n // 5))
+            report["large_output"] = bench_large_output(server.port, pool, large_mb)
+    finally:
+        pool.close_all()
+        server.close()
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if not report["auth"]["wrong_password_rejected"]:
+        raise SystemExit("a pooled transport was reused for a wrong password")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import collections
+import os
+import threading
+import time
+
+# --- Directory Listing ---
+# One os.scandir pass per directory: DirEntry knows file vs folder from the
+# directory read itself and caches its stat(), so each entry costs one stat
+# instead of isfile + getsize + listdir bookkeeping. Sizes and mtimes stay
+# numeric (sortable); human-readable text is produced for the rows actually
+# shown, in one vectorized pass. Listings are cached per directory and
+# reused while the directory's own mtime is unchanged.
+
+SIZE_UNITS = ("bytes", "KB", "MB", "GB", "TB")
+
+def scan_directory(path):
+    names, folders, sizes, mtimes = [], [], [], []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir()
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    # Dangling symlink: describe the link itself.
+                    st = entry.stat(follow_symlinks=False)
+            except OSError:
+                # Removed between the directory read and the stat.
+                continue
+            names.append(entry.name)
+            folders.append(is_dir)
+            sizes.append(-1 if is_dir else st.st_size)
+            mtimes.append(st.st_mtime_ns)
+    return names, folders, sizes, mtimes
+
+def listing_frame(path):
+    import numpy as np
+    import pandas as pd
+    names, folders, sizes, mtimes = scan_directory(path)
+    folders = np.array(folders, dtype=bool)
+    size = pd.Series(np.array(sizes, dtype="float64"))
+    size[folders] = np.nan
+    return pd.DataFrame({
+        "Name": names,
+        "Type": np.where(folders, "📁 Folder", "📄 File"),
+        "Size": size,
+        "Modified": pd.to_datetime(np.array(mtimes, dtype="int64"), unit="ns"),
+    })
+
+def format_sizes(sizes):
+    # Same text as get_human_readable_size, for a whole column at once.
+    import numpy as np
+    values = np.asarray(sizes, dtype="float64")
+    missing = np.isnan(values)
+    safe = np.where(missing | (values < 1), 1, values)
+    unit = np.clip(np.floor(np.log(safe) / np.log(1024)), 0, len(SIZE_UNITS) - 1).astype(int)
+    scaled = np.where(missing, 0, values) / np.power(1024.0, unit)
+    text = np.char.add(np.char.add(np.char.mod("%.2f", scaled), " "), np.array(SIZE_UNITS)[unit])
+    return np.where(missing, "-", text)
+
+def display_frame(df):
+    # Human-readable copy of a (page of a) listing for st.dataframe.
+    out = df.copy()
+    out["Size"] = format_sizes(df["Size"].to_numpy())
+    out["Modified"] = df["Modified"].dt.strftime("%Y-%m-%d %H:%M")
+    return out
+
+class DirectoryListing:
+    # A directory's mtime changes when entries are added, removed or renamed,
+    # not when an existing file is rewritten, so cached sizes of modified
+    # files can lag; max_age bounds that. A listing taken within
+    # `settle_seconds` of the directory's last change is not trusted, since
+    # coarse filesystem timestamps could hide a second change in the same tick.
+
+    def __init__(self, max_dirs=32, max_age=60.0, settle_seconds=2.0):
+        self.max_dirs = max_dirs
+        self.max_age = max_age
+        self.settle_ns = int(settle_seconds * 1e9)
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, refresh=False):
+        path = os.path.abspath(path)
+        mtime_ns = os.stat(path).st_mtime_ns
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(path)
+            if (cached and not refresh and cached[0] == mtime_ns
+                    and now - cached[1] < self.max_age):
+                self._cache.move_to_end(path)
+                self.hits += 1
+                return cached[2]
+            self.misses += 1
+        started_ns = time.time_ns()
+        df = listing_frame(path)
+        with self._lock:
+            if started_ns - mtime_ns > self.settle_ns:
+                self._cache[path] = (mtime_ns, now, df)
+                self._cache.move_to_end(path)
+                while len(self._cache) > self.max_dirs:
+                    self._cache.popitem(last=False)
+            else:
+                self._cache.pop(path, None)
+        return df
+
+    def invalidate(self, path=None):
+        with self._lock:
+            if path is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(os.path.abspath(path), None)
+
+def sort_listing(df, by="Name", descending=False, folders_first=True):
+    # Numeric sort on Size/Modified; folders (Size NaN) stay grouped.
+    keys, ascending = [by], [not descending]
+    if by == "Name":
+        df = df.assign(_key=df["Name"].str.lower())
+        keys = ["_key"]
+    if folders_first:
+        keys.insert(0, "Type")
+        ascending.insert(0, True)
+    df = df.sort_values(keys, ascending=ascending, kind="stable", na_position="last")
+    return df.drop(columns="_key", errors="ignore")
+
+def page_slice(df, page, page_size):
+    pages = max(1, -(-len(df) // page_size))
+    page = min(max(1, page), pages)
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size], pages
@@ -0,0 +1,243 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Folder Sizes ---
+# A scan walks one directory's subtrees on a thread pool, one os.scandir per
+# directory, and keeps a running byte/file count per top-level child so the
+# listing can fill folder sizes in as each subtree finishes. Per-directory
+# results (own bytes, own files, subdirectories) are cached keyed by
+# (device, inode, mtime): an unchanged directory is not listed again on the
+# next scan, only stat()ed so the walk can continue below it. Sizes are
+# apparent sizes (st_size), the same figure the listing shows for files.
+# A file that grows in place (a log being appended to) does not change its
+# directory's mtime, so cached entries are only reused for `max_age` seconds
+# after they were listed, and a full rescan lists every directory again.
+
+MAX_AGE = 15 * 60
+
+class _Dir:
+    __slots__ = ("key", "listed", "own_bytes", "own_files", "subdirs", "total_bytes", "total_files")
+
+    def __init__(self, key, own_bytes, own_files, subdirs):
+        self.key = key
+        self.listed = time.time()
+        self.own_bytes = own_bytes
+        self.own_files = own_files
+        self.subdirs = subdirs
+        self.total_bytes = None
+        self.total_files = None
+
+class DirSizeCache:
+    def __init__(self):
+        self._dirs = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        with self._lock:
+            return self._dirs.get(path)
+
+    def put(self, path, entry):
+        with self._lock:
+            self._dirs[path] = entry
+
+    def total(self, path):
+        entry = self.get(path)
+        return None if entry is None or entry.total_bytes is None else (entry.total_bytes, entry.total_files)
+
+class SizeScan:
+    def __init__(self, root, cache, workers=8, one_filesystem=True, max_age=MAX_AGE, full=False):
+        # full=True lists every directory again, ignoring the cache.
+        self.root = os.path.abspath(root)
+        self.cache = cache
+        self.workers = workers
+        self.one_filesystem = one_filesystem
+        self.max_age = max_age
+        self.full = full
+        self.dirs_listed = 0
+        self.dirs_reused = 0
+        # When the oldest reused entry was listed: sizes below it may be
+        # that stale.
+        self.oldest_reused = None
+        self.errors = 0
+        self.started = None
+        self.seconds = None
+        self._bytes = {}
+        self._files = {}
+        self._pending = {}
+        self._seen = []
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self._cancel = threading.Event()
+        self._device = None
+        self._pool = None
+
+    @property
+    def running(self):
+        return self.started is not None and not self._finished.is_set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def start(self):
+        self.started = time.monotonic()
+        threading.Thread(target=self._run, name=f"dir-sizes:{self.root}", daemon=True).start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self, timeout=None):
+        return self._finished.wait(timeout)
+
+    def results(self):
+        # {child name: (bytes so far, files so far, finished)} for each
+        # top-level folder.
+        with self._lock:
+            return {
+                name: (self._bytes[name], self._files[name], self._pending[name] == 0)
+                for name in self._pending
+            }
+
+    def _run(self):
+        try:
+            self._device = os.stat(self.root).st_dev
+            with os.scandir(self.root) as it:
+                tops = [e.name for e in it if e.is_dir(follow_symlinks=False)]
+            with ThreadPoolExecutor(self.workers, thread_name_prefix="dir-sizes") as pool:
+                self._pool = pool
+                with self._lock:
+                    for name in tops:
+                        self._bytes[name] = 0
+                        self._files[name] = 0
+                        self._pending[name] = 1
+                for name in tops:
+                    pool.submit(self._scan, os.path.join(self.root, name), name)
+                # Workers keep submitting subdirectories; wait until every
+                # subtree has reported back.
+                while not self._all_done():
+                    time.sleep(0.05)
+            if not self.cancelled:
+                self._fill_totals()
+        except OSError:
+            self.errors += 1
+        finally:
+            self.seconds = round(time.monotonic() - self.started, 2)
+            self._finished.set()
+
+    def _all_done(self):
+        with self._lock:
+            return all(n == 0 for n in self._pending.values())
+
+    def _scan(self, path, top):
+        subdirs, own_bytes, own_files = [], 0, 0
+        if not self.cancelled:
+            try:
+                st = os.stat(path, follow_symlinks=False)
+                if self.one_filesystem and st.st_dev != self._device:
+                    raise PermissionError("other filesystem")
+                key = (st.st_dev, st.st_ino, st.st_mtime_ns)
+                entry = None if self.full else self.cache.get(path)
+                reused = (entry is not None and entry.key == key
+                          and (self.max_age is None or time.time() - entry.listed < self.max_age))
+                if not reused:
+                    entry = self._list(path, key)
+                    self.cache.put(path, entry)
+                subdirs, own_bytes, own_files = entry.subdirs, entry.own_bytes, entry.own_files
+                with self._lock:
+                    self._seen.append(path)
+                    if reused:
+                        self.dirs_reused += 1
+                        if self.oldest_reused is None or entry.listed < self.oldest_reused:
+                            self.oldest_reused = entry.listed
+                    else:
+                        self.dirs_listed += 1
+            except OSError:
+                with self._lock:
+                    self.errors += 1
+        with self._lock:
+            self._bytes[top] += own_bytes
+            self._files[top] += own_files
+            self._pending[top] += len(subdirs) - 1
+        for name in subdirs:
+            self._pool.submit(self._scan, os.path.join(path, name), top)
+
+    def _list(self, path, key):
+        # Entries that vanish mid-listing are skipped.
+        subdirs, own_bytes, own_files = [], 0, 0
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                    else:
+                        own_bytes += entry.stat(follow_symlinks=False).st_size
+                        own_files += 1
+                except OSError:
+                    continue
+        return _Dir(key, own_bytes, own_files, tuple(subdirs))
+
+    def _fill_totals(self):
+        # Bottom-up totals for every directory this scan reached, so the
+        # drill-down can show any level without another walk. Deepest first
+        # means every child is summed before its parent.
+        for path in sorted(self._seen, key=lambda p: p.count(os.sep), reverse=True):
+            entry = self.cache.get(path)
+            total_bytes, total_files = entry.own_bytes, entry.own_files
+            for name in entry.subdirs:
+                child = self.cache.get(os.path.join(path, name))
+                if child is not None and child.total_bytes is not None:
+                    total_bytes += child.total_bytes
+                    total_files += child.total_files
+            entry.total_bytes, entry.total_files = total_bytes, total_files
+
+class SizeScanRegistry:
+    # One scan per directory at a time, shared by every session.
+    def __init__(self, workers=8, max_age=MAX_AGE):
+        self.workers = workers
+        self.max_age = max_age
+        self.cache = DirSizeCache()
+        self._scans = {}
+        self._lock = threading.Lock()
+
+    def start(self, root, full=False):
+        root = os.path.abspath(root)
+        with self._lock:
+            scan = self._scans.get(root)
+            if scan is not None and scan.running:
+                return scan
+            scan = SizeScan(root, self.cache, self.workers, max_age=self.max_age, full=full).start()
+            self._scans[root] = scan
+            return scan
+
+    def get(self, root):
+        with self._lock:
+            return self._scans.get(os.path.abspath(root))
+
+def largest_children(cache, path, limit=200):
+    # Folders (cached totals from the last scan) and files of `path`,
+    # largest first, with each one's share of the folder total.
+    from dir_listing import listing_frame
+    df = listing_frame(path)
+    folders = (df["Type"] == "📁 Folder").to_numpy()
+    totals = [cache.total(os.path.join(path, name)) for name in df.loc[folders, "Name"]]
+    df["Files"] = 1.0
+    df.loc[folders, "Size"] = [t[0] if t else float("nan") for t in totals]
+    df.loc[folders, "Files"] = [t[1] if t else float("nan") for t in totals]
+    total = df["Size"].sum()
+    df["Share"] = (df["Size"] / total * 100).round(1) if total else 0.0
+    return df.sort_values("Size", ascending=False, na_position="last").head(limit)
+
+def fill_folder_sizes(df, scan):
+    # Copy of a listing with folder sizes from a (possibly running) scan;
+    # folders still being counted show what has been counted so far.
+    results = scan.results()
+    if not results:
+        return df
+    folders = df["Type"] == "📁 Folder"
+    sizes = df.loc[folders, "Name"].map(lambda name: results.get(name, (float("nan"),))[0])
+    df = df.copy()
+    df.loc[folders, "Size"] = sizes.astype("float64")
+    return df
@@ -0,0 +1,388 @@
+import contextlib
+import hashlib
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+# --- Duplicate Finder ---
+# Three stages, each one narrowing the candidates for the next:
+#   1. size: every file's (size, path) goes into a scratch SQLite table, so a
+#      tree of millions of files is grouped on disk rather than in memory;
+#      only sizes shared by two or more files go on.
+#   2. edges: a hash of the first and last EDGE_BYTES of each candidate, on a
+#      thread pool (this stage is seek-bound). Files no bigger than both
+#      edges are hashed whole here and skip stage 3.
+#   3. full: a streaming SHA-256 of the files still colliding, spread across
+#      a process pool.
+# Hard links to one inode are counted once: deleting one frees nothing.
+# Results stay in the scratch database; groups() pages through them.
+
+EDGE_BYTES = 4096
+HASH_CHUNK = 1024 * 1024
+BATCH = 4096
+
+def walk_files(root, min_size=1):
+    # (path, size) for regular files under root; symlinks are not followed.
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        size = entry.stat(follow_symlinks=False).st_size
+                        if size >= min_size:
+                            yield entry.path, size
+                except OSError:
+                    continue
+
+def edge_hash(path, size, edge=EDGE_BYTES):
+    # Hash of the first and last `edge` bytes; the whole file when it is
+    # small enough that the edges cover it. Returns (digest, is_full).
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        if size <= 2 * edge:
+            h.update(f.read())
+            return h.hexdigest(), True
+        h.update(f.read(edge))
+        f.seek(size - edge)
+        h.update(f.read(edge))
+    return h.hexdigest(), False
+
+def full_hash(path):
+    # Runs in a worker process; returns (path, digest or None).
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_CHUNK), b""):
+                h.update(block)
+    except OSError:
+        return path, None
+    return path, h.hexdigest()
+
+class DuplicateScan:
+    def __init__(self, root, min_size=1, workers=None, files=None, scratch_dir=None):
+        # `files` is an optional iterable of (path, size), e.g. from the file
+        # index; by default the tree is walked.
+        self.root = os.path.abspath(root)
+        self.min_size = max(1, min_size)
+        self.workers = workers or os.cpu_count() or 4
+        self._files = files
+        fd, self.db_path = tempfile.mkstemp(prefix="duplicates-", suffix=".sqlite3", dir=scratch_dir)
+        os.close(fd)
+        self.stage = "queued"
+        self.files_seen = 0
+        self.bytes_seen = 0
+        self.size_candidates = 0
+        self.edge_hashed = 0
+        self.full_candidates = 0
+        self.full_hashed = 0
+        self.bytes_hashed = 0
+        self.hardlinks = 0
+        self.errors = 0
+        self.groups_found = 0
+        self.reclaimable = 0
+        self.started = None
+        self.seconds = None
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE files (size INTEGER NOT NULL, path TEXT NOT NULL)")
+            db.execute("CREATE TABLE partial (size INTEGER NOT NULL, edge TEXT NOT NULL, path TEXT NOT NULL, mtime_ns INTEGER NOT NULL)")
+            db.execute("CREATE TABLE full (size INTEGER NOT NULL, digest TEXT NOT NULL, path TEXT NOT NULL, mtime_ns INTEGER NOT NULL)")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    @property
+    def running(self):
+        return self.started is not None and not self._finished.is_set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def start(self):
+        self.started = time.monotonic()
+        threading.Thread(target=self._run, name=f"duplicates:{self.root}", daemon=True).start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self, timeout=None):
+        return self._finished.wait(timeout)
+
+    def close(self):
+        self.cancel()
+        self.wait()
+        for suffix in ("", "-wal", "-shm"):
+            with contextlib.suppress(OSError):
+                os.remove(self.db_path + suffix)
+
+    def progress(self):
+        return {
+            "stage": self.stage, "files": self.files_seen, "bytes": self.bytes_seen,
+            "size_candidates": self.size_candidates, "edge_hashed": self.edge_hashed,
+            "full_candidates": self.full_candidates, "full_hashed": self.full_hashed,
+            "bytes_hashed": self.bytes_hashed, "hardlinks": self.hardlinks, "errors": self.errors,
+            "groups": self.groups_found, "reclaimable": self.reclaimable,
+            "seconds": self.seconds if self.seconds is not None
+            else round(time.monotonic() - self.started, 1) if self.started else 0.0,
+        }
+
+    def _run(self):
+        try:
+            self.stage = "listing"
+            self._collect()
+            self.stage = "edge hashing"
+            self._edges()
+            self.stage = "full hashing"
+            self._full()
+            self._summarize()
+            self.stage = "cancelled" if self.cancelled else "done"
+        except Exception as e:
+            self.stage = f"failed: {e}"
+        finally:
+            self.seconds = round(time.monotonic() - self.started, 2)
+            self._finished.set()
+
+    # --- Stage 1: sizes ---
+    def _collect(self):
+        files = self._files if self._files is not None else walk_files(self.root, self.min_size)
+        with self._connect() as db:
+            batch = []
+            for path, size in files:
+                if size < self.min_size:
+                    continue
+                batch.append((size, path))
+                self.files_seen += 1
+                self.bytes_seen += size
+                if len(batch) >= BATCH:
+                    if self.cancelled:
+                        return
+                    db.executemany("INSERT INTO files VALUES (?, ?)", batch)
+                    batch = []
+            db.executemany("INSERT INTO files VALUES (?, ?)", batch)
+            db.execute("CREATE INDEX files_size ON files (size)")
+            self.size_candidates = db.execute(
+                "SELECT COALESCE(SUM(n), 0) FROM (SELECT COUNT(*) AS n FROM files GROUP BY size HAVING n > 1)"
+            ).fetchone()[0]
+
+    def _groups_of(self, db, sql, keys):
+        # Rows come sorted by the group columns; yields one list per group.
+        group, current = [], None
+        for row in db.execute(sql):
+            key = row[:keys]
+            if key != current and group:
+                yield group
+                group = []
+            current = key
+            group.append(row)
+        if group:
+            yield group
+
+    # --- Stage 2: first/last bytes ---
+    def _edges(self):
+        sql = (
+            "SELECT size, path FROM files WHERE size IN"
+            " (SELECT size FROM files GROUP BY size HAVING COUNT(*) > 1) ORDER BY size DESC"
+        )
+        with self._connect() as reader, self._connect() as db, \
+                ThreadPoolExecutor(self.workers * 2, thread_name_prefix="dup-edges") as pool:
+            batch = []
+            for group in self._groups_of(reader, sql, 1):
+                batch.append(group)
+                if sum(len(g) for g in batch) >= BATCH:
+                    if self.cancelled:
+                        return
+                    self._edge_batch(db, pool, batch)
+                    batch = []
+            self._edge_batch(db, pool, batch)
+            db.execute("CREATE INDEX partial_key ON partial (size, edge)")
+            self.full_candidates = db.execute(
+                "SELECT COALESCE(SUM(n), 0) FROM (SELECT COUNT(*) AS n FROM partial GROUP BY size, edge HAVING n > 1)"
+            ).fetchone()[0]
+
+    def _edge_batch(self, db, pool, batch):
+        rows = [row for group in batch for row in group]
+        by_edge = {}
+        for hashed in pool.map(self._edge_file, rows):
+            if hashed is not None:
+                by_edge.setdefault(hashed[:2], []).append(hashed)
+        partial, full = [], []
+        for hits in by_edge.values():
+            # Extra hard links to one inode are dropped here.
+            inodes, keep = set(), []
+            for size, edge, path, mtime_ns, is_full, inode in hits:
+                if inode in inodes:
+                    with self._lock:
+                        self.hardlinks += 1
+                    continue
+                inodes.add(inode)
+                keep.append(((size, edge, path, mtime_ns), is_full))
+            if len(keep) > 1:
+                for row, is_full in keep:
+                    (full if is_full else partial).append(row)
+        db.executemany("INSERT INTO partial VALUES (?, ?, ?, ?)", partial)
+        db.executemany("INSERT INTO full VALUES (?, ?, ?, ?)", full)
+
+    def _edge_file(self, row):
+        # Files that changed size since they were listed are skipped.
+        size, path = row
+        try:
+            st = os.stat(path, follow_symlinks=False)
+            if st.st_size != size:
+                return None
+            digest, is_full = edge_hash(path, size)
+            return size, digest, path, st.st_mtime_ns, is_full, (st.st_dev, st.st_ino)
+        except OSError:
+            with self._lock:
+                self.errors += 1
+            return None
+        finally:
+            with self._lock:
+                self.edge_hashed += 1
+
+    # --- Stage 3: whole files ---
+    def _full(self):
+        with self._connect() as db:
+            mark = db.execute("SELECT COALESCE(MAX(rowid), 0) FROM full").fetchone()[0]
+        # spawn: the app process runs many threads, which fork() does not mix with.
+        try:
+            with ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                self._full_with(pool)
+        except BrokenProcessPool:
+            # Workers could not start (e.g. spawn cannot re-import the main
+            # module). hashlib releases the GIL, so threads still hash in
+            # parallel; this stage starts over on them.
+            with self._connect() as db:
+                db.execute("DELETE FROM full WHERE rowid > ?", (mark,))
+            with self._lock:
+                self.full_hashed = self.bytes_hashed = 0
+            with ThreadPoolExecutor(self.workers, thread_name_prefix="dup-full") as pool:
+                self._full_with(pool)
+
+    def _full_with(self, pool):
+        sql = (
+            "SELECT p.size, p.edge, p.path, p.mtime_ns FROM partial p JOIN"
+            " (SELECT size, edge FROM partial GROUP BY size, edge HAVING COUNT(*) > 1) c"
+            " ON p.size = c.size AND p.edge = c.edge ORDER BY p.size DESC, p.edge"
+        )
+        with self._connect() as reader, self._connect() as db:
+            for group in self._groups_of(reader, sql, 2):
+                if self.cancelled:
+                    return
+                self._full_group(db, pool, group)
+
+    def _full_group(self, db, pool, group):
+        # Hashes one (size, edge) group across the pool; a group of big
+        # files keeps every worker busy on its own.
+        meta = {path: (size, mtime_ns) for size, _, path, mtime_ns in group}
+        pending, rows = set(), []
+        paths = iter(meta)
+        for path in paths:
+            pending.add(pool.submit(full_hash, path))
+            if len(pending) >= self.workers * 2:
+                break
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, digest = future.result()
+                size, mtime_ns = meta[path]
+                with self._lock:
+                    self.full_hashed += 1
+                    if digest is None:
+                        self.errors += 1
+                    else:
+                        self.bytes_hashed += size
+                if digest is not None:
+                    rows.append((size, digest, path, mtime_ns))
+                nxt = next(paths, None)
+                if nxt is not None and not self.cancelled:
+                    pending.add(pool.submit(full_hash, nxt))
+        db.executemany("INSERT INTO full VALUES (?, ?, ?, ?)", rows)
+
+    # --- Results ---
+    def _summarize(self):
+        with self._connect() as db:
+            db.execute("CREATE INDEX IF NOT EXISTS full_key ON full (size, digest)")
+            groups, reclaimable = db.execute(
+                "SELECT COUNT(*), COALESCE(SUM((n - 1) * size), 0) FROM"
+                " (SELECT size, COUNT(*) AS n FROM full GROUP BY size, digest HAVING n > 1)"
+            ).fetchone()
+        self.groups_found, self.reclaimable = groups, reclaimable
+
+    def groups(self, limit=50, offset=0):
+        # [{"size", "digest", "count", "reclaimable", "paths"}], most
+        # reclaimable bytes first.
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT size, digest, COUNT(*) AS n, (COUNT(*) - 1) * size AS reclaim FROM full"
+                " GROUP BY size, digest HAVING n > 1 ORDER BY reclaim DESC, size DESC LIMIT ? OFFSET ?",
+                (limit, offset),
+            ).fetchall()
+            return [
+                {"size": size, "digest": digest, "count": n, "reclaimable": reclaim,
+                 "paths": [p for (p,) in db.execute(
+                     "SELECT path FROM full WHERE size = ? AND digest = ? ORDER BY path", (size, digest))]}
+                for size, digest, n, reclaim in rows
+            ]
+
+    def unchanged(self, path):
+        # True while the file still has the size and mtime it was hashed with.
+        with self._connect() as db:
+            row = db.execute("SELECT size, mtime_ns FROM full WHERE path = ?", (path,)).fetchone()
+        try:
+            st = os.stat(path, follow_symlinks=False)
+        except OSError:
+            return False
+        return row is not None and row == (st.st_size, st.st_mtime_ns)
+
+    def discard(self, paths):
+        # Forget deleted files so the groups and totals stay accurate.
+        with self._connect() as db:
+            db.executemany("DELETE FROM full WHERE path = ?", [(p,) for p in paths])
+        self._summarize()
+
+class DuplicateScanRegistry:
+    # Latest scan per directory, shared by every session; a new scan of the
+    # same directory replaces (and cleans up) the old one.
+    def __init__(self, workers=None):
+        self.workers = workers
+        self._scans = {}
+        self._lock = threading.Lock()
+
+    def start(self, root, min_size=1, files=None):
+        root = os.path.abspath(root)
+        with self._lock:
+            old = self._scans.get(root)
+            if old is not None and old.running:
+                return old
+            scan = DuplicateScan(root, min_size, self.workers, files).start()
+            self._scans[root] = scan
+        if old is not None:
+            old.close()
+        return scan
+
+    def get(self, root):
+        with self._lock:
+            return self._scans.get(os.path.abspath(root))
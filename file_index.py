@@ -0,0 +1,468 @@
+import contextlib
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import sqlite3
+import struct
+import threading
+import time
+
+# --- Recursive File Index ---
+# A background thread walks `root` once into SQLite (path, name, extension,
+# size, mtime) with an FTS5 trigram index over names, so substring and glob
+# searches use the index instead of scanning rows. After the walk the index
+# follows inotify events (Linux, via ctypes); where inotify is unavailable or
+# runs out of watches it falls back to polling directory mtimes. A periodic
+# full rescan catches anything both miss, e.g. files rewritten in place while
+# polling. Queries run on their own connections (WAL), so searches never wait
+# for the indexer.
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+              | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT = struct.Struct("iIII")
+
+class Inotify:
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add = libc.inotify_add_watch
+        self._add.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm = libc.inotify_rm_watch
+        self._rm.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.paths = {}
+
+    def add_watch(self, path):
+        wd = self._add(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        self.paths[wd] = path
+        return wd
+
+    def forget(self, prefix):
+        # Drop watches for a directory tree that was deleted or moved away.
+        for wd, path in list(self.paths.items()):
+            if path == prefix or path.startswith(prefix + os.sep):
+                self._rm(self.fd, wd)
+                self.paths.pop(wd, None)
+
+    def read(self, timeout):
+        # Yields (directory, name, mask); name is "" for events on the
+        # watched directory itself.
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return
+        try:
+            data = os.read(self.fd, 256 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            directory = self.paths.get(wd)
+            if mask & IN_IGNORED:
+                self.paths.pop(wd, None)
+            if directory is not None or mask & IN_Q_OVERFLOW:
+                yield directory, name, mask
+
+    def close(self):
+        os.close(self.fd)
+
+def _prefix_range(path):
+    # Every path strictly below `path`: ("path/", "path0"), since "0" sorts
+    # right after "/". Uses the primary-key index instead of LIKE.
+    return path + "/", path + "0"
+
+def _glob_to_like(pattern):
+    # GLOB is case-sensitive, LIKE is not (for ASCII), so globs run as LIKE:
+    # * -> %, ? -> _. A [...] class becomes _ here and is checked separately.
+    # Returns (like, escaped): the trigram index only serves a LIKE without
+    # ESCAPE, so that form is used unless the name itself has % or _.
+    out, i = [], 0
+    escaped = any(c in pattern for c in "%_")
+    while i < len(pattern):
+        c = pattern[i]
+        end = pattern.find("]", i + 2) if c == "[" else -1
+        if c == "*":
+            out.append("%")
+        elif c == "?":
+            out.append("_")
+        elif end != -1:
+            out.append("_")
+            i = end
+        elif escaped and c in "%_\\":
+            out.append("\\" + c)
+        else:
+            out.append(c)
+        i += 1
+    return "".join(out), escaped
+
+class FileIndex:
+    def __init__(self, db_path, root, poll_interval=30.0, full_rescan=6 * 60 * 60,
+                 batch_size=5000, use_inotify=True):
+        self.db_path = db_path
+        self.root = os.path.abspath(root)
+        self.poll_interval = poll_interval
+        self.full_rescan = full_rescan
+        self.batch_size = batch_size
+        self.use_inotify = use_inotify
+        self.mode = "starting"
+        self.state = "idle"
+        self.error = None
+        self.events = 0
+        self.last_scan = None
+        self.scan_seconds = None
+        self._stop = threading.Event()
+        self._rescan = threading.Event()
+        self._thread = None
+        self._notifier = None
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                " id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, name TEXT NOT NULL,"
+                " ext TEXT NOT NULL, size INTEGER NOT NULL, mtime REAL NOT NULL,"
+                " is_dir INTEGER NOT NULL, scan INTEGER NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS files_size ON files (size)")
+            db.execute("CREATE INDEX IF NOT EXISTS files_mtime ON files (mtime)")
+            db.execute("CREATE INDEX IF NOT EXISTS files_ext ON files (ext)")
+            db.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS names USING fts5("
+                " name, content='files', content_rowid='id', tokenize='trigram')"
+            )
+            db.execute(
+                "CREATE TRIGGER IF NOT EXISTS files_ai AFTER INSERT ON files BEGIN"
+                " INSERT INTO names (rowid, name) VALUES (new.id, new.name); END"
+            )
+            db.execute(
+                "CREATE TRIGGER IF NOT EXISTS files_ad AFTER DELETE ON files BEGIN"
+                " INSERT INTO names (names, rowid, name) VALUES ('delete', old.id, old.name); END"
+            )
+            db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = db.execute("SELECT value FROM meta WHERE key = 'root'").fetchone()
+            if row is None or row[0] != self.root:
+                db.execute("DELETE FROM files")
+                db.execute("INSERT OR REPLACE INTO meta VALUES ('root', ?)", (self.root,))
+
+    @contextlib.contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    # --- Indexer thread ---
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="file-index", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def rescan(self):
+        self._rescan.set()
+
+    def _run(self):
+        if self.use_inotify:
+            try:
+                self._notifier = Inotify()
+            except (OSError, AttributeError) as e:
+                self.error = f"inotify unavailable ({e}); polling"
+        self.mode = "inotify" if self._notifier else "polling"
+        db = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            while not self._stop.is_set():
+                self._rescan.clear()
+                self._full_scan(db)
+                next_full = time.monotonic() + self.full_rescan
+                while not self._stop.is_set() and not self._rescan.is_set() and time.monotonic() < next_full:
+                    if self._notifier:
+                        self._apply_events(db)
+                    else:
+                        self._stop.wait(self.poll_interval)
+                        self._poll(db)
+        except Exception as e:
+            self.state = "failed"
+            self.error = f"{type(e).__name__}: {e}"
+        finally:
+            db.close()
+            if self._notifier:
+                self._notifier.close()
+                self._notifier = None
+
+    def _drop_inotify(self, reason):
+        self.error = reason
+        self._notifier.close()
+        self._notifier = None
+        self.mode = "polling"
+
+    def _entry_row(self, path, st, is_dir, scan):
+        name = os.path.basename(path)
+        ext = "" if is_dir else os.path.splitext(name)[1].lower().lstrip(".")
+        return (path, name, ext, 0 if is_dir else st.st_size, st.st_mtime, int(is_dir), scan)
+
+    def _upsert(self, db, rows):
+        # The name is derived from the path, so an existing row only needs its
+        # stat fields updated and the FTS index is left alone.
+        db.executemany(
+            "INSERT INTO files (path, name, ext, size, mtime, is_dir, scan) VALUES (?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (path) DO UPDATE SET size = excluded.size, mtime = excluded.mtime,"
+            " is_dir = excluded.is_dir, scan = excluded.scan", rows,
+        )
+
+    def _walk(self, db, top, scan):
+        # Iterative scandir walk that writes in batches and watches each
+        # directory while inotify is in use.
+        stack, batch = [top], []
+        while stack and not self._stop.is_set():
+            directory = stack.pop()
+            if self._notifier:
+                try:
+                    self._notifier.add_watch(directory)
+                except OSError as e:
+                    if e.errno == errno.ENOSPC:
+                        self._drop_inotify("inotify watch limit reached (fs.inotify.max_user_watches); polling")
+            try:
+                it = os.scandir(directory)
+            except OSError:
+                continue
+            with it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        st = entry.stat(follow_symlinks=False)
+                        entry.path.encode("utf-8")
+                    except (OSError, UnicodeEncodeError):
+                        continue
+                    batch.append(self._entry_row(entry.path, st, is_dir, scan))
+                    if is_dir:
+                        stack.append(entry.path)
+            if len(batch) >= self.batch_size:
+                with db:
+                    self._upsert(db, batch)
+                batch = []
+        if batch:
+            with db:
+                self._upsert(db, batch)
+
+    def _full_scan(self, db):
+        self.state = "scanning"
+        started = time.monotonic()
+        scan = int(time.time() * 1000)
+        if self._notifier:
+            self._notifier.forget(self.root)
+        self._walk(db, self.root, scan)
+        if self._stop.is_set():
+            return
+        # Anything the walk did not touch is gone.
+        with db:
+            db.execute("DELETE FROM files WHERE scan < ?", (scan,))
+        self.scan_seconds = time.monotonic() - started
+        self.last_scan = time.time()
+        self.state = "watching" if self._notifier else "polling"
+
+    def _remove_tree(self, db, path):
+        low, high = _prefix_range(path)
+        db.execute("DELETE FROM files WHERE path = ? OR (path >= ? AND path < ?)", (path, low, high))
+
+    def _refresh_path(self, db, path):
+        # Re-read one path after an event; a directory is walked again.
+        try:
+            st = os.lstat(path)
+            path.encode("utf-8")
+        except (OSError, UnicodeEncodeError):
+            self._remove_tree(db, path)
+            return
+        is_dir = os.path.isdir(path) and not os.path.islink(path)
+        self._upsert(db, [self._entry_row(path, st, is_dir, int(time.time() * 1000))])
+        if is_dir:
+            self._walk(db, path, int(time.time() * 1000))
+
+    def _apply_events(self, db):
+        # A queue overflow means events were lost: rescan everything.
+        notifier = self._notifier
+        touched, removed = {}, set()
+        for directory, name, mask in notifier.read(1.0):
+            self.events += 1
+            if mask & IN_Q_OVERFLOW:
+                self._rescan.set()
+                return
+            path = os.path.join(directory, name) if name else directory
+            if mask & (IN_DELETE | IN_MOVED_FROM | IN_DELETE_SELF | IN_MOVE_SELF):
+                removed.add(path)
+                touched.pop(path, None)
+                if mask & IN_ISDIR or not name:
+                    notifier.forget(path)
+            else:
+                touched[path] = mask
+                removed.discard(path)
+        with db:
+            for path in removed:
+                self._remove_tree(db, path)
+            for path in touched:
+                self._refresh_path(db, path)
+
+    def _poll(self, db):
+        # Directory mtimes change when entries are added, removed or renamed;
+        # only directories whose mtime moved are re-listed.
+        self.state = "polling"
+        dirs = db.execute("SELECT path, mtime FROM files WHERE is_dir = 1").fetchall()
+        dirs.append((self.root, None))
+        for path, mtime in dirs:
+            if self._stop.is_set():
+                return
+            try:
+                current = os.lstat(path).st_mtime
+            except OSError:
+                with db:
+                    self._remove_tree(db, path)
+                continue
+            if mtime is not None and current == mtime:
+                continue
+            self._relist(db, path)
+
+    def _relist(self, db, directory):
+        low, high = _prefix_range(directory)
+        known = {
+            row[0] for row in db.execute(
+                "SELECT path FROM files WHERE path >= ? AND path < ? AND instr(substr(path, ?), '/') = 0",
+                (low, high, len(low) + 1),
+            )
+        }
+        try:
+            with os.scandir(directory) as it:
+                present = {entry.path for entry in it}
+        except OSError:
+            present = set()
+        with db:
+            for path in known - present:
+                self._remove_tree(db, path)
+            for path in present - known:
+                self._refresh_path(db, path)
+            if directory != self.root:
+                self._refresh_path_only(db, directory)
+
+    def _refresh_path_only(self, db, path):
+        try:
+            st = os.lstat(path)
+        except OSError:
+            return
+        db.execute("UPDATE files SET mtime = ? WHERE path = ?", (st.st_mtime, path))
+
+    # --- Queries ---
+    def search(self, text=None, ext=None, min_size=None, max_size=None,
+               newer_than=None, older_than=None, under=None, include_dirs=True, limit=500):
+        # `text` is a substring of the name, or a glob when it contains *, ?
+        # or [; both ignore case (ASCII letters), so "*.PDF" finds "a.pdf".
+        # Sizes are bytes; newer/older_than are epochs.
+        where, params = [], []
+        if text:
+            if any(c in text for c in "*?["):
+                like, escaped = _glob_to_like(text)
+                where.append("id IN (SELECT rowid FROM names WHERE name LIKE ?"
+                             + (" ESCAPE '\\')" if escaped else ")"))
+                params.append(like)
+                if "[" in text:
+                    where.append("lower(name) GLOB ?")
+                    params.append(text.lower())
+            elif len(text) >= 3:
+                where.append("id IN (SELECT rowid FROM names WHERE names MATCH ?)")
+                params.append('"' + text.replace('"', '""') + '"')
+            else:
+                # Shorter than one trigram: plain scan.
+                where.append("name LIKE ? ESCAPE '\\'")
+                params.append("%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        if ext:
+            where.append("ext = ?")
+            params.append(ext.lower().lstrip("."))
+        if min_size is not None:
+            where.append("size >= ?")
+            params.append(min_size)
+        if max_size is not None:
+            where.append("size <= ?")
+            params.append(max_size)
+        if newer_than is not None:
+            where.append("mtime >= ?")
+            params.append(newer_than)
+        if older_than is not None:
+            where.append("mtime < ?")
+            params.append(older_than)
+        if under:
+            low, high = _prefix_range(os.path.abspath(under).rstrip("/"))
+            where.append("path >= ? AND path < ?")
+            params.extend([low, high])
+        if not include_dirs:
+            where.append("is_dir = 0")
+        sql = "SELECT path, name, size, mtime, is_dir FROM files"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY path LIMIT ?"
+        params.append(limit)
+        with self._connect() as db:
+            rows = db.execute(sql, params).fetchall()
+        return [
+            {"path": path, "name": name, "size": size, "mtime": mtime, "is_dir": bool(is_dir)}
+            for path, name, size, mtime, is_dir in rows
+        ]
+
+    def iter_files(self, under=None, min_size=0, batch=10000):
+        # (path, size) for every indexed file below `under`, streamed a batch
+        # at a time so millions of rows never sit in memory at once.
+        where, params = ["is_dir = 0", "size >= ?"], [min_size]
+        if under:
+            low, high = _prefix_range(os.path.abspath(under).rstrip("/"))
+            where.append("path >= ? AND path < ?")
+            params.extend([low, high])
+        with self._connect() as db:
+            cursor = db.execute("SELECT path, size FROM files WHERE " + " AND ".join(where), params)
+            while True:
+                rows = cursor.fetchmany(batch)
+                if not rows:
+                    return
+                yield from rows
+
+    def status(self):
+        with self._connect() as db:
+            files, dirs, total = db.execute(
+                "SELECT COUNT(*) - COALESCE(SUM(is_dir), 0), COALESCE(SUM(is_dir), 0), COALESCE(SUM(size), 0) FROM files"
+            ).fetchone()
+        return {
+            "root": self.root,
+            "state": self.state,
+            "mode": self.mode,
+            "files": files,
+            "dirs": dirs,
+            "bytes": total,
+            "events": self.events,
+            "last_scan": self.last_scan,
+            "scan_seconds": self.scan_seconds,
+            "error": self.error,
+        }
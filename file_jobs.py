@@ -0,0 +1,342 @@
+import collections
+import contextlib
+import errno
+import itertools
+import os
+import shutil
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Background File Jobs ---
+# Delete, copy and move run on their own thread with a worker pool for the
+# per-file work (unlink, chunked copy). Each job counts files and bytes as it
+# goes, is cancellable between files and between copy chunks, and lives in a
+# process-wide manager, so it keeps running when the page that started it is
+# left. A move tries rename() first and falls back to copy + delete when the
+# destination is on another filesystem (EXDEV); the source is only removed
+# once everything copied cleanly.
+
+COPY_CHUNK = 4 * 1024 * 1024
+MAX_ERRORS = 50
+
+class JobCancelled(Exception):
+    pass
+
+class FileJob:
+    _ids = itertools.count(1)
+
+    def __init__(self, kind, pairs, workers=8):
+        # pairs: [(source, target)]; target is None for delete.
+        self.id = next(self._ids)
+        self.kind = kind
+        self.pairs = [(os.path.abspath(s), os.path.abspath(t) if t else None) for s, t in pairs]
+        self.workers = workers
+        self.state = "queued"
+        self.files_total = 0
+        self.bytes_total = 0
+        self.files_done = 0
+        self.bytes_done = 0
+        self.errors = []
+        # Every failure, including those past MAX_ERRORS that are not listed.
+        self.failures = 0
+        self.current = ""
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        # Bounds queued per-file tasks so a huge tree is never queued at once.
+        self._slots = threading.BoundedSemaphore(workers * 4)
+
+    @property
+    def label(self):
+        first = os.path.basename(self.pairs[0][0]) if self.pairs else ""
+        more = f" +{len(self.pairs) - 1}" if len(self.pairs) > 1 else ""
+        target = f" → {os.path.dirname(self.pairs[0][1])}" if self.pairs and self.pairs[0][1] else ""
+        return f"{self.kind} {first}{more}{target}"
+
+    @property
+    def running(self):
+        return self.state in ("queued", "counting", "running")
+
+    def cancel(self):
+        self._cancel.set()
+
+    def progress(self):
+        elapsed = ((self.finished or time.time()) - self.started) if self.started else 0.0
+        with self._lock:
+            return {
+                "id": self.id, "job": self.label, "state": self.state,
+                "files_done": self.files_done, "files_total": self.files_total,
+                "bytes_done": self.bytes_done, "bytes_total": self.bytes_total,
+                "fraction": (self.bytes_done / self.bytes_total if self.bytes_total
+                             else self.files_done / self.files_total if self.files_total else 0.0),
+                "files_per_s": self.files_done / elapsed if elapsed else 0.0,
+                "bytes_per_s": self.bytes_done / elapsed if elapsed else 0.0,
+                "seconds": round(elapsed, 1), "current": self.current, "errors": list(self.errors),
+            }
+
+    def _error(self, path, e):
+        with self._lock:
+            self.failures += 1
+            if len(self.errors) < MAX_ERRORS:
+                self.errors.append(f"{path}: {e}")
+
+    def _advance(self, files=0, nbytes=0):
+        with self._lock:
+            self.files_done += files
+            self.bytes_done += nbytes
+
+    def _check(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    # --- Running ---
+    def run(self):
+        self.started = time.time()
+        try:
+            self.state = "counting"
+            self._count()
+            self.state = "running"
+            with ThreadPoolExecutor(self.workers, thread_name_prefix=f"file-job-{self.id}") as pool:
+                self._pool = pool
+                for source, target in self.pairs:
+                    self._check()
+                    self.current = source
+                    if self.kind == "delete":
+                        self._delete(source)
+                    elif self.kind == "copy":
+                        self._copy(source, target)
+                    elif self.kind == "move":
+                        self._move(source, target)
+                    else:
+                        raise ValueError(f"Unknown job kind: {self.kind}")
+            self._check()
+            self.state = "failed" if self.failures else "done"
+        except JobCancelled:
+            self.state = "cancelled"
+        except Exception as e:
+            self._error(self.current, e)
+            self.state = "failed"
+        finally:
+            self.current = ""
+            self.finished = time.time()
+
+    def _count(self):
+        # Totals for the progress bar. A move within one filesystem is a
+        # rename per item, so it counts items rather than walking them.
+        for source, target in self.pairs:
+            self._check()
+            if self.kind == "move" and target and _same_device(source, target):
+                self.files_total += 1
+                continue
+            for _, size in _walk_files(source):
+                self.files_total += 1
+                self.bytes_total += size
+                if self.files_total % 10000 == 0:
+                    self._check()
+
+    def _submit(self, fn, *args):
+        self._slots.acquire()
+        future = self._pool.submit(fn, *args)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _drain(self, futures):
+        for future in futures:
+            future.result()
+        futures.clear()
+
+    # --- Delete ---
+    def _delete(self, path):
+        if not os.path.lexists(path):
+            self._error(path, "does not exist")
+            return
+        if not os.path.isdir(path) or os.path.islink(path):
+            self._unlink(path)
+            return
+        futures, dirs = [], []
+        for dirpath, dirnames, filenames in os.walk(path, onerror=lambda e: self._error(e.filename, e)):
+            dirs.append(dirpath)
+            # Symlinked folders are unlinked, not followed.
+            for name in [d for d in dirnames if os.path.islink(os.path.join(dirpath, d))]:
+                filenames.append(name)
+                dirnames.remove(name)
+            for name in filenames:
+                self._check()
+                futures.append(self._submit(self._unlink, os.path.join(dirpath, name)))
+            if len(futures) > 10000:
+                self._drain(futures)
+        self._drain(futures)
+        self._check()
+        # Deepest first, so each folder is empty when its turn comes.
+        for dirpath in reversed(dirs):
+            try:
+                os.rmdir(dirpath)
+            except OSError as e:
+                self._error(dirpath, e)
+
+    def _unlink(self, path):
+        if self._cancel.is_set():
+            return
+        try:
+            size = os.lstat(path).st_size
+            os.unlink(path)
+            self._advance(1, size)
+        except OSError as e:
+            self._error(path, e)
+
+    # --- Copy ---
+    def _copy(self, source, target):
+        if os.path.lexists(target):
+            self._error(target, "already exists")
+            return
+        if target.startswith(source.rstrip(os.sep) + os.sep):
+            self._error(target, "cannot copy a folder into itself")
+            return
+        if not os.path.isdir(source) or os.path.islink(source):
+            self._copy_file(source, target)
+            return
+        futures = []
+        for dirpath, dirnames, filenames in os.walk(source, onerror=lambda e: self._error(e.filename, e)):
+            rel = os.path.relpath(dirpath, source)
+            dest_dir = os.path.normpath(os.path.join(target, rel))
+            os.makedirs(dest_dir, exist_ok=True)
+            for name in [d for d in dirnames if os.path.islink(os.path.join(dirpath, d))]:
+                filenames.append(name)
+                dirnames.remove(name)
+            for name in filenames:
+                self._check()
+                futures.append(self._submit(self._copy_file, os.path.join(dirpath, name), os.path.join(dest_dir, name)))
+            if len(futures) > 10000:
+                self._drain(futures)
+        self._drain(futures)
+        for dirpath, _, _ in os.walk(source):
+            # Directory times last, after the files inside stopped changing them.
+            try:
+                shutil.copystat(dirpath, os.path.join(target, os.path.relpath(dirpath, source)))
+            except OSError:
+                pass
+
+    def _copy_file(self, source, target):
+        if self._cancel.is_set():
+            return
+        try:
+            st = os.lstat(source)
+            if stat.S_ISLNK(st.st_mode):
+                os.symlink(os.readlink(source), target)
+                self._advance(1, st.st_size)
+                return
+            copied = 0
+            try:
+                with open(source, "rb") as src, open(target, "wb") as dst:
+                    while True:
+                        if self._cancel.is_set():
+                            raise JobCancelled()
+                        block = src.read(COPY_CHUNK)
+                        if not block:
+                            break
+                        dst.write(block)
+                        copied += len(block)
+                        self._advance(0, len(block))
+            except BaseException:
+                # Never leave a truncated copy behind.
+                self._advance(0, -copied)
+                with contextlib.suppress(OSError):
+                    os.remove(target)
+                raise
+            shutil.copystat(source, target)
+            self._advance(1)
+        except JobCancelled:
+            pass
+        except OSError as e:
+            self._error(source, e)
+
+    # --- Move ---
+    def _move(self, source, target):
+        if os.path.lexists(target):
+            self._error(target, "already exists")
+            return
+        try:
+            os.rename(source, target)
+            self._advance(1)
+            return
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                self._error(source, e)
+                return
+        failures = self.failures
+        self._copy(source, target)
+        self._check()
+        if self.failures == failures:
+            done, copied = self.files_done, self.bytes_done
+            self._delete(source)
+            # The delete pass re-counts the same files; progress is per file moved.
+            with self._lock:
+                self.files_done, self.bytes_done = done, copied
+        else:
+            self._error(source, "copy incomplete; source kept")
+
+def _same_device(source, target):
+    try:
+        return os.lstat(source).st_dev == os.stat(os.path.dirname(target)).st_dev
+    except OSError:
+        return False
+
+def _walk_files(path):
+    # (path, size) for every non-directory entry; symlinks are not followed.
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return
+    if not stat.S_ISDIR(st.st_mode):
+        yield path, st.st_size
+        return
+    stack = [path]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        yield entry.path, entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+
+class JobManager:
+    # Process-wide: jobs outlive the session and page that started them.
+    def __init__(self, workers=8, keep=50):
+        self.workers = workers
+        self._jobs = collections.OrderedDict()
+        self._keep = keep
+        self._lock = threading.Lock()
+
+    def submit(self, kind, pairs):
+        job = FileJob(kind, pairs, self.workers)
+        with self._lock:
+            self._jobs[job.id] = job
+            finished = [j for j in self._jobs.values() if not j.running]
+            for old in finished[:max(0, len(self._jobs) - self._keep)]:
+                self._jobs.pop(old.id, None)
+        threading.Thread(target=job.run, name=f"file-job-{job.id}", daemon=True).start()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
@@ -0,0 +1,168 @@
+import bisect
+import mmap
+import os
+import re
+from array import array
+
+# --- Memory-mapped File Preview ---
+# Serves slices of arbitrarily large text files without reading them whole.
+# The file is mapped read-only and the OS pages in only what is touched. The
+# line index is sparse and lazy: one cumulative newline count per block,
+# extended only as far as the requested line, so finding line N costs a
+# counted scan up to N once and a short in-block scan after that. Tails are
+# found by scanning backwards from the end. Search runs the regex engine
+# directly over the mapped bytes; nothing is decoded except the lines shown.
+
+class MappedFile:
+    def __init__(self, path, block_size=1024 * 1024, max_bytes=2 * 1024 * 1024):
+        self.path = path
+        self.block_size = block_size
+        # Cap on bytes returned per call, so one giant line cannot flood the page.
+        self.max_bytes = max_bytes
+        self._file = open(path, "rb")
+        self._map = None
+        self.size = 0
+        # newlines[i] = number of b"\n" in [0, i * block_size)
+        self._newlines = array("Q", [0])
+        self._remap()
+
+    def _remap(self):
+        if self._map is not None:
+            self._map.close()
+        self.size = os.fstat(self._file.fileno()).st_size
+        # mmap refuses empty files; an empty bytes object behaves the same here.
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+
+    def refresh(self):
+        # For follow mode. Returns True when the file grew. A file that
+        # shrank was truncated or rotated, so the index starts over.
+        st = os.stat(self.path)
+        rotated = st.st_ino != os.fstat(self._file.fileno()).st_ino
+        if st.st_size == self.size and not rotated:
+            return False
+        if rotated or st.st_size < self.size:
+            self._file.close()
+            self._file = open(self.path, "rb")
+            self._newlines = array("Q", [0])
+        # Otherwise only whole blocks are indexed, so the counts stay valid.
+        self._remap()
+        return True
+
+    def close(self):
+        if self._map:
+            self._map.close()
+        self._file.close()
+
+    # --- Line index ---
+    def _indexed_blocks(self):
+        return len(self._newlines) - 1
+
+    def _extend_index(self, until_newlines=None, until_offset=None):
+        # Count whole blocks until the index covers the wanted newline number
+        # or byte offset (or the file's last whole block).
+        full_blocks = self.size // self.block_size
+        while self._indexed_blocks() < full_blocks:
+            if until_newlines is not None and self._newlines[-1] >= until_newlines:
+                return
+            if until_offset is not None and self._indexed_blocks() * self.block_size > until_offset:
+                return
+            start = self._indexed_blocks() * self.block_size
+            self._newlines.append(self._newlines[-1] + self._map[start:start + self.block_size].count(b"\n"))
+
+    def line_offset(self, line):
+        # Byte offset where 0-based `line` starts, or self.size past the end.
+        if line <= 0:
+            return 0
+        self._extend_index(until_newlines=line)
+        # Block holding newline number `line` (1-based): last block whose
+        # starting count is below it.
+        block = bisect.bisect_left(self._newlines, line) - 1
+        pos = block * self.block_size
+        remaining = line - self._newlines[block]
+        while remaining:
+            pos = self._map.find(b"\n", pos)
+            if pos == -1:
+                return self.size
+            pos += 1
+            remaining -= 1
+        return pos
+
+    def line_of(self, offset):
+        # 0-based line number containing byte `offset`.
+        self._extend_index(until_offset=offset)
+        block = min(offset // self.block_size, self._indexed_blocks())
+        start = block * self.block_size
+        return self._newlines[block] + self._map[start:offset].count(b"\n")
+
+    def line_count(self):
+        # Needs a count over the whole file, once; later calls are cheap.
+        if not self.size:
+            return 0
+        last = self.line_of(self.size)
+        return last + (0 if self._map[self.size - 1:self.size] == b"\n" else 1)
+
+    # --- Slices ---
+    def _decode(self, begin, end):
+        end = min(end, begin + self.max_bytes)
+        return self._map[begin:end].decode(errors="replace")
+
+    def lines(self, start, count):
+        begin = self.line_offset(start)
+        end = self.line_offset(start + count)
+        return self._decode(begin, end)
+
+    def head(self, count):
+        return self.lines(0, count)
+
+    def tail(self, count):
+        # Walk back over `count` newlines from the end; no index needed.
+        end = self.size
+        pos = end - 1 if self._map[end - 1:end] == b"\n" else end
+        for _ in range(count):
+            pos = self._map.rfind(b"\n", 0, pos)
+            if pos == -1:
+                break
+        begin = pos + 1
+        if end - begin > self.max_bytes:
+            begin = end - self.max_bytes
+        return self._map[begin:end].decode(errors="replace")
+
+    def _literal_matches(self, needle, ignore_case, chunk=4 * 1024 * 1024):
+        # Block-wise find; bytes.lower() on a block is far faster than a
+        # case-insensitive regex over the whole map. Blocks overlap by
+        # len(needle) - 1 so matches across a boundary are not missed.
+        if ignore_case:
+            needle = needle.lower()
+        start = 0
+        while start < self.size:
+            block = self._map[start:start + chunk + len(needle) - 1]
+            if ignore_case:
+                block = block.lower()
+            pos = block.find(needle)
+            while pos != -1 and pos < chunk:
+                yield start + pos, start + pos + len(needle)
+                pos = block.find(needle, pos + 1)
+            start += chunk
+
+    def search(self, term, regex=False, ignore_case=True, max_hits=200):
+        # Returns [(line_number, line_text)] for up to max_hits matching lines.
+        if not term or not self.size:
+            return []
+        if regex:
+            matcher = re.compile(term.encode(), re.M | (re.I if ignore_case else 0))
+            matches = (m.span() for m in matcher.finditer(self._map))
+        else:
+            matches = self._literal_matches(term.encode(), ignore_case)
+        hits, last_line = [], None
+        for start, end in matches:
+            line = self.line_of(start)
+            if line == last_line:
+                continue
+            last_line = line
+            begin = self._map.rfind(b"\n", 0, start) + 1
+            stop = self._map.find(b"\n", end)
+            stop = self.size if stop == -1 else stop
+            hits.append((line, self._map[begin:min(stop, begin + 1000)].decode(errors="replace")))
+            if len(hits) >= max_hits:
+                break
+        return hits
@@ -0,0 +1,427 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import re
+import secrets
+import tarfile
+import threading
+import time
+import zipfile
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+from upload_store import UploadError
+
+# --- Streaming Download Server ---
+# st.download_button needs the whole payload in memory, per user. Downloads
+# go through a small HTTP server on its own port instead. Files are sent
+# straight from disk with socket.sendfile and honour Range / If-Range, so an
+# interrupted transfer resumes where it stopped. Folders are streamed as a
+# zip or tar built on the fly with chunked transfer encoding. Either way a
+# transfer holds only a fixed-size buffer. The app hands out links carrying
+# an HMAC-signed, expiring token for one path; nothing else is served.
+# With an UploadStore attached, the same server takes resumable chunked
+# uploads into one folder per token (see upload_link).
+
+ARCHIVE_FORMATS = {
+    "zip": ("application/zip", ".zip"),
+    "tar": ("application/x-tar", ".tar"),
+    "tar.gz": ("application/gzip", ".tar.gz"),
+}
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+def _unb64(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+class _ChunkedWriter:
+    # File-like sink for zipfile/tarfile that frames each write as an HTTP
+    # chunk. Deliberately not seekable: zipfile then writes data descriptors.
+    def __init__(self, wfile, stats):
+        self.wfile = wfile
+        self.stats = stats
+
+    def write(self, data):
+        if data:
+            self.wfile.write(b"%x\r\n" % len(data))
+            self.wfile.write(data)
+            self.wfile.write(b"\r\n")
+            self.stats.add(len(data))
+        return len(data)
+
+    def flush(self):
+        self.wfile.flush()
+
+    def close(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+class _Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.bytes_sent = 0
+
+    def add(self, n):
+        with self._lock:
+            self.bytes_sent += n
+
+    def begin(self):
+        with self._lock:
+            self.active += 1
+
+    def end(self, ok):
+        with self._lock:
+            self.active -= 1
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+class FileServer:
+    def __init__(self, host="0.0.0.0", port=8765, public_url=None, ttl=6 * 60 * 60,
+                 chunk_size=1024 * 1024, secret=None, upload_store=None, max_chunk=64 * 1024 * 1024):
+        self.host = host
+        self.port = port
+        self.public_url = (public_url or f"http://localhost:{port}").rstrip("/")
+        self.ttl = ttl
+        self.chunk_size = chunk_size
+        self.secret = secret or secrets.token_bytes(32)
+        self.stats = _Stats()
+        self.upload_store = upload_store
+        self.max_chunk = max_chunk
+        self._server = None
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server._handle(self, send_body=True)
+
+            def do_HEAD(self):
+                server._handle(self, send_body=False)
+
+            def do_POST(self):
+                server._handle_upload(self)
+
+            def do_PUT(self):
+                server._handle_upload(self)
+
+            def do_OPTIONS(self):
+                # CORS preflight from the uploader embedded in the app page.
+                self.send_response(204)
+                server._cors(self)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="file-server", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    # --- Links ---
+    def link(self, path, archive=None):
+        # URL for one file, or for a folder packed as `archive` (zip, tar,
+        # tar.gz); valid for `ttl` seconds.
+        path = os.path.abspath(path)
+        if archive is not None and archive not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unknown archive format: {archive}")
+        name = os.path.basename(path.rstrip(os.sep)) or "root"
+        if archive:
+            name += ARCHIVE_FORMATS[archive][1]
+        return f"{self.public_url}/d/{self._token(p=path, a=archive)}/{quote(name)}"
+
+    def upload_link(self, target_dir, overwrite=False):
+        # Base URL for uploads into `target_dir`:
+        #   POST {url}/begin?name=&size=&key=  -> {"id", "offset"}
+        #   PUT  {url}/{id}?offset=N  (body: next chunk) -> {"offset"[, "done"]}
+        #   GET  {url}/{id}  -> {"offset"}
+        if self.upload_store is None:
+            raise RuntimeError("This file server has no upload store.")
+        return f"{self.public_url}/u/{self._token(p=os.path.abspath(target_dir), o=bool(overwrite))}"
+
+    def _token(self, **fields):
+        fields["e"] = int(time.time() + self.ttl)
+        payload = _b64(json.dumps(fields).encode())
+        return f"{payload}.{self._sign(payload)}"
+
+    def _sign(self, payload):
+        return _b64(hmac.new(self.secret, payload.encode(), hashlib.sha256).digest()[:18])
+
+    def _resolve(self, url_path, kind):
+        # Returns (token fields, remaining path parts) or None.
+        parts = urlsplit(url_path).path.split("/")
+        if len(parts) < 3 or parts[1] != kind or "." not in parts[2]:
+            return None
+        payload, sig = parts[2].rsplit(".", 1)
+        if not hmac.compare_digest(sig, self._sign(payload)):
+            return None
+        token = json.loads(_unb64(payload))
+        if token["e"] < time.time():
+            return None
+        return token, parts[3:]
+
+    # --- Requests ---
+    def _handle(self, req, send_body):
+        if req.path.startswith("/u/"):
+            self._handle_upload(req)
+            return
+        resolved = self._resolve(req.path, "d")
+        if resolved is None:
+            req.send_error(404)
+            return
+        path, archive = resolved[0]["p"], resolved[0]["a"]
+        if archive:
+            if not os.path.isdir(path):
+                req.send_error(404)
+                return
+            self._send_archive(req, path, archive, send_body)
+        else:
+            if not os.path.isfile(path):
+                req.send_error(404)
+                return
+            self._send_file(req, path, send_body)
+
+    def _send_file(self, req, path, send_body):
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            size = st.st_size
+            etag = f'"{st.st_mtime_ns:x}-{size:x}"'
+            start, end = 0, size - 1
+            status = 200
+            header = req.headers.get("Range")
+            if_range = req.headers.get("If-Range")
+            # A resume against a file that changed since gets the whole file.
+            if header and (if_range is None or if_range == etag):
+                match = _RANGE.match(header.strip())
+                if match and (match.group(1) or match.group(2)):
+                    first, last = match.groups()
+                    if first:
+                        start = int(first)
+                        end = min(int(last), size - 1) if last else size - 1
+                    else:
+                        start = max(0, size - int(last))
+                    if start >= size or start > end:
+                        req.send_response(416)
+                        req.send_header("Content-Range", f"bytes */{size}")
+                        req.send_header("Content-Length", "0")
+                        req.end_headers()
+                        return
+                    status = 206
+            length = max(0, end - start + 1)
+            req.send_response(status)
+            req.send_header("Content-Type", "application/octet-stream")
+            req.send_header("Content-Length", str(length))
+            req.send_header("Accept-Ranges", "bytes")
+            req.send_header("ETag", etag)
+            req.send_header("Last-Modified", formatdate(st.st_mtime, usegmt=True))
+            req.send_header("Content-Disposition", _disposition(os.path.basename(path)))
+            if status == 206:
+                req.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            req.end_headers()
+            if not send_body or not length:
+                return
+            req.wfile.flush()
+            self.stats.begin()
+            ok = False
+            try:
+                # Kernel-side copy; falls back to read/send where unsupported.
+                sent = req.connection.sendfile(f, offset=start, count=length)
+                self.stats.add(sent)
+                ok = sent == length
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                self.stats.end(ok)
+
+    def _send_archive(self, req, path, archive, send_body):
+        mime, suffix = ARCHIVE_FORMATS[archive]
+        name = os.path.basename(path.rstrip(os.sep)) or "root"
+        # The archive is generated as it is sent, so its length is unknown
+        # and ranges cannot be honoured; files are the resumable path.
+        req.send_response(200)
+        req.send_header("Content-Type", mime)
+        req.send_header("Transfer-Encoding", "chunked")
+        req.send_header("Accept-Ranges", "none")
+        req.send_header("Content-Disposition", _disposition(name + suffix))
+        req.end_headers()
+        if not send_body:
+            # HEAD: no body at all, not even the chunked terminator.
+            return
+        sink = _ChunkedWriter(req.wfile, self.stats)
+        self.stats.begin()
+        ok = False
+        try:
+            if archive == "zip":
+                # Stored, not deflated: most large payloads are already
+                # compressed and this keeps the server at disk speed.
+                with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED, allowZip64=True) as zf:
+                    for full, arcname in _walk_files(path, name):
+                        try:
+                            zf.write(full, arcname)
+                        except OSError:
+                            continue
+            else:
+                mode = "w|gz" if archive == "tar.gz" else "w|"
+                with tarfile.open(fileobj=sink, mode=mode, bufsize=self.chunk_size) as tf:
+                    for full, arcname in _walk_files(path, name):
+                        try:
+                            tf.add(full, arcname, recursive=False)
+                        except OSError:
+                            continue
+            sink.close()
+            ok = True
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.stats.end(ok)
+
+    # --- Uploads ---
+    def _cors(self, req):
+        req.send_header("Access-Control-Allow-Origin", "*")
+        req.send_header("Access-Control-Allow-Methods", "GET, POST, PUT, OPTIONS")
+        req.send_header("Access-Control-Allow-Headers", "Content-Type")
+
+    def _reply(self, req, status, body):
+        data = json.dumps(body).encode()
+        req.send_response(status)
+        self._cors(req)
+        req.send_header("Content-Type", "application/json")
+        req.send_header("Content-Length", str(len(data)))
+        req.end_headers()
+        req.wfile.write(data)
+
+    def _handle_upload(self, req):
+        resolved = self._resolve(req.path, "u") if self.upload_store else None
+        if resolved is None:
+            req.send_error(404)
+            return
+        token, rest = resolved
+        query = {k: v[0] for k, v in parse_qs(urlsplit(req.path).query).items()}
+        length = int(req.headers.get("Content-Length") or 0)
+        store = self.upload_store
+        try:
+            if req.command == "POST" and rest == ["begin"]:
+                upload_id, offset = store.begin(
+                    token["p"], query["name"], int(query["size"]), query.get("key", ""), overwrite=token["o"],
+                )
+                self._reply(req, 200, {"id": upload_id, "offset": offset})
+            elif req.command == "PUT" and len(rest) == 1:
+                if length > self.max_chunk:
+                    raise UploadError(f"Chunk larger than {self.max_chunk} bytes.")
+                offset = store.write_stream(rest[0], int(query["offset"]), req.rfile, length)
+                if offset != int(query["offset"]) + length:
+                    # Out of sequence: the body was not (fully) read, so this
+                    # connection cannot be reused. The client resumes at `offset`.
+                    req.close_connection = True
+                    self._reply(req, 409, {"offset": offset})
+                    return
+                body = {"offset": offset}
+                if store.is_complete(rest[0]):
+                    body["done"] = store.finish(rest[0])
+                self._reply(req, 200, body)
+            elif req.command in ("GET", "HEAD") and len(rest) == 1:
+                offset = store.offset(rest[0])
+                self._reply(req, 200 if offset is not None else 404, {"offset": offset})
+            else:
+                req.send_error(404)
+        except (UploadError, KeyError, ValueError) as e:
+            req.close_connection = True
+            self._reply(req, 400, {"error": str(e)})
+
+def _walk_files(root, top):
+    # Regular files, in a stable order, without following symlinked folders.
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        rel = os.path.relpath(dirpath, root)
+        for name in sorted(filenames):
+            full = os.path.join(dirpath, name)
+            if os.path.isfile(full) and not os.path.islink(full):
+                yield full, os.path.normpath(os.path.join(top, rel, name))
+
+def _disposition(filename):
+    ascii_name = filename.encode("ascii", "replace").decode().replace('"', "_")
+    return f"attachment; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(filename)}"
+
+# --- Browser Uploader ---
+# Embedded with st.components.v1.html. Sends each selected file in chunks to
+# an upload_link URL, resumes from the server's offset after an error or a
+# page reload (same file name, size and mtime), and reports throughput.
+UPLOADER_HTML = """
+<div style="font-family: sans-serif; font-size: 14px">
+  <input type="file" id="files" multiple>
+  <button id="go">Upload</button>
+  <div id="log" style="margin-top: 8px; white-space: pre-line"></div>
+</div>
+<script>
+const BASE = __BASE__;
+const CHUNK = __CHUNK__;
+const log = document.getElementById("log");
+
+function mb(n) { return (n / 1048576).toFixed(1) + " MB"; }
+
+async function call(method, url, body) {
+  const res = await fetch(url, {method: method, body: body});
+  const data = await res.json();
+  if (res.status === 400) throw new Error(data.error);
+  return data;
+}
+
+async function upload(file, line) {
+  const key = [file.name, file.size, file.lastModified].join(":");
+  const q = "name=" + encodeURIComponent(file.name) + "&size=" + file.size + "&key=" + encodeURIComponent(key);
+  let {id, offset} = await call("POST", BASE + "/begin?" + q);
+  const resumedAt = offset, t0 = performance.now();
+  for (let attempt = 0; ; ) {
+    try {
+      const data = await call("PUT", BASE + "/" + id + "?offset=" + offset, file.slice(offset, offset + CHUNK));
+      offset = data.offset;
+      attempt = 0;
+      const secs = (performance.now() - t0) / 1000;
+      line.textContent = file.name + ": " + mb(offset) + " / " + mb(file.size) +
+        " (" + mb((offset - resumedAt) / Math.max(secs, 0.001)) + "/s)";
+      if (data.done) {
+        line.textContent = file.name + ": done, " + mb(file.size) + " in " + secs.toFixed(1) + " s" +
+          (resumedAt ? " (resumed at " + mb(resumedAt) + ")" : "") +
+          (data.done.deduplicated ? ", already stored (linked, no new disk space)" : "");
+        return;
+      }
+    } catch (err) {
+      if (++attempt > 6) throw err;
+      line.textContent = file.name + ": retrying after error (" + err.message + ")";
+      await new Promise(r => setTimeout(r, 500 * 2 ** attempt));
+      offset = (await call("POST", BASE + "/begin?" + q)).offset;
+    }
+  }
+}
+
+document.getElementById("go").onclick = async () => {
+  for (const file of document.getElementById("files").files) {
+    const line = document.createElement("div");
+    log.appendChild(line);
+    try { await upload(file, line); } catch (err) { line.textContent = file.name + ": failed (" + err.message + ")"; }
+  }
+};
+</script>
+"""
+
+def uploader_html(upload_url, chunk_size=8 * 1024 * 1024):
+    return UPLOADER_HTML.replace("__BASE__", json.dumps(upload_url)).replace("__CHUNK__", str(chunk_size))
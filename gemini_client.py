@@ -0,0 +1,445 @@
+import argparse
+import asyncio
+import collections
+import json
+import queue
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from gemini_metrics import GeminiMetrics, usage_counts
+
+# --- Shared Gemini Client ---
+# One asyncio loop on a background thread serves every Gemini call in the
+# process. Identical in-flight prompts share one request, a semaphore and a
+# token bucket cap concurrency and request rate, transient errors (quota,
+# 5xx, timeouts) retry with jittered exponential backoff, and a slow request
+# can be hedged with a duplicate once it runs past the observed p95 latency.
+#
+# Streaming requests (GeminiStream) share the same concurrency and rate budget
+# and retry only until the first chunk has arrived.
+#
+#   python gemini_client.py            # demo against the fake model
+#   python gemini_client.py --stream   # time-to-first-token vs total latency
+
+RETRYABLE_CODES = {429, 500, 502, 503, 504}
+RETRYABLE_NAMES = {"ResourceExhausted", "TooManyRequests", "ServiceUnavailable",
+                   "InternalServerError", "DeadlineExceeded"}
+
+class GeminiError(RuntimeError):
+    pass
+
+def _retryable(exc):
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    code = getattr(exc, "code", None)
+    code = getattr(code, "value", code)
+    return code in RETRYABLE_CODES or type(exc).__name__ in RETRYABLE_NAMES
+
+def _describe(exc):
+    code = getattr(exc, "code", None)
+    if getattr(code, "value", code) == 429 or type(exc).__name__ == "ResourceExhausted":
+        return "Gemini quota exceeded, try again in a minute."
+    if isinstance(exc, asyncio.TimeoutError):
+        return "Gemini did not answer in time."
+    return f"Gemini request failed: {exc}"
+
+_DONE = object()
+
+class GeminiStream:
+    # Iterate for text chunks as they arrive. Stopping iteration early (or a
+    # Streamlit rerun interrupting it) cancels the request. ttft and seconds
+    # are filled in as the response progresses.
+    def __init__(self, client, prompt, site):
+        self.prompt = prompt
+        self.text = ""
+        self.ttft = None
+        self.seconds = None
+        self.cancelled = False
+        self._queue = queue.Queue()
+        self._future = asyncio.run_coroutine_threadsafe(client._stream(prompt, self, site), client.loop)
+
+    def _push(self, text):
+        self._queue.put(text)
+
+    def __iter__(self):
+        finished = False
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _DONE:
+                    break
+                self.text += item
+                yield item
+            finished = True
+        finally:
+            if not finished:
+                self.cancel()
+        self._future.result()
+
+    def cancel(self):
+        self.cancelled = True
+        self._future.cancel()
+
+class GeminiClient:
+    def __init__(self, model, max_concurrency=4, requests_per_minute=60, burst=5,
+                 retries=3, base_delay=0.5, max_delay=8.0, timeout=30.0,
+                 hedge=False, hedge_budget=0.1, hedge_min_samples=20, latency_window=200,
+                 metrics=None):
+        self.model = model
+        self.metrics = metrics or GeminiMetrics()
+        self.max_concurrency = max_concurrency
+        self.rate = requests_per_minute / 60.0
+        self.burst = burst
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_budget = hedge_budget
+        self.hedge_min_samples = hedge_min_samples
+        self.latencies = collections.deque(maxlen=latency_window)
+        self.stream_timings = collections.deque(maxlen=latency_window)
+        self.counters = collections.Counter()
+        self._inflight = {}
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="gemini-client", daemon=True)
+        self._thread.start()
+        self._semaphore = self._on_loop(self._make_semaphore())
+
+    def _on_loop(self, coro, timeout=None):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    async def _make_semaphore(self):
+        return asyncio.Semaphore(self.max_concurrency)
+
+    # --- Sync entry point (Streamlit scripts) ---
+    # `site` names the calling feature in the metrics ("google_search", ...).
+    def generate(self, prompt, site="default"):
+        # Blocks the calling thread only; the loop keeps serving other callers.
+        return self._on_loop(self.agenerate(prompt, site))
+
+    def stream(self, prompt, site="default"):
+        return GeminiStream(self, prompt, site)
+
+    # --- Async entry point ---
+    async def agenerate(self, prompt, site="default"):
+        task = self._inflight.get(prompt)
+        if task is None:
+            task = self.loop.create_task(self._generate(prompt, site))
+            self._inflight[prompt] = task
+            task.add_done_callback(lambda _: self._inflight.pop(prompt, None))
+            self.counters["requests"] += 1
+        else:
+            self.counters["coalesced"] += 1
+            self.metrics.record_lookup(site, "coalesced")
+        # shield: one caller giving up must not cancel the shared request.
+        return await asyncio.shield(task)
+
+    async def _generate(self, prompt, site):
+        start = time.monotonic()
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self._attempt(prompt)
+            except Exception as e:
+                self.counters[f"error:{type(e).__name__}"] += 1
+                self.metrics.record_error(site, type(e).__name__)
+                if attempt == self.retries or not _retryable(e):
+                    self.counters["failures"] += 1
+                    self.metrics.record_request(site, time.monotonic() - start, outcome="error")
+                    raise GeminiError(_describe(e)) from e
+                self.counters["retries"] += 1
+                # Full jitter keeps a burst of failed callers from retrying in lockstep.
+                await asyncio.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+            else:
+                text = response.text.strip()
+                prompt_tokens, response_tokens, estimated = usage_counts(response, prompt, text)
+                self.metrics.record_request(
+                    site, time.monotonic() - start, prompt_tokens, response_tokens, estimated,
+                )
+                return text
+
+    async def _attempt(self, prompt):
+        started = asyncio.Event()
+        primary = self.loop.create_task(self._call(prompt, started))
+        delay = self._hedge_delay()
+        if delay is None:
+            return await primary
+        # Time the hedge from when the request went out, not from when it
+        # started queueing for the semaphore or the rate budget.
+        waiter = self.loop.create_task(started.wait())
+        await asyncio.wait({primary, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        waiter.cancel()
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+        self.counters["hedges"] += 1
+        backup = self.loop.create_task(self._call(prompt))
+        pending = {primary, backup}
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    if task is backup:
+                        self.counters["hedge_wins"] += 1
+                    return task.result()
+                error = task.exception()
+        raise error
+
+    def _hedge_delay(self):
+        # Hedges are capped at `hedge_budget` of requests so a slow backend
+        # is not hit with double the load.
+        if not self.hedge or len(self.latencies) < self.hedge_min_samples:
+            return None
+        if self.counters["hedges"] >= self.hedge_budget * self.counters["requests"]:
+            return None
+        return self.percentile(95)
+
+    async def _call(self, prompt, started=None):
+        async with self._semaphore:
+            await self._take_token()
+            if started is not None:
+                started.set()
+            start = time.monotonic()
+            response = await asyncio.wait_for(self._send(prompt), self.timeout)
+            self.latencies.append(time.monotonic() - start)
+            return response
+
+    async def _send(self, prompt):
+        if hasattr(self.model, "generate_content_async"):
+            return await self.model.generate_content_async(prompt)
+        return await self.loop.run_in_executor(None, self.model.generate_content, prompt)
+
+    async def _stream(self, prompt, stream, site):
+        self.counters["streams"] += 1
+        start = time.monotonic()
+        outcome = "cancelled"
+        last_chunk = None
+        parts = []
+        try:
+            for attempt in range(self.retries + 1):
+                try:
+                    async with self._semaphore:
+                        await self._take_token()
+                        async for chunk in self._stream_chunks(prompt):
+                            if stream.ttft is None:
+                                stream.ttft = time.monotonic() - start
+                            last_chunk = chunk
+                            parts.append(chunk.text)
+                            stream._push(chunk.text)
+                    outcome = "ok"
+                    return
+                except Exception as e:
+                    self.counters[f"error:{type(e).__name__}"] += 1
+                    self.metrics.record_error(site, type(e).__name__)
+                    # Text already shown cannot be taken back, so only retry
+                    # while nothing has been streamed yet.
+                    if stream.ttft is not None or attempt == self.retries or not _retryable(e):
+                        self.counters["failures"] += 1
+                        outcome = "error"
+                        raise GeminiError(_describe(e)) from e
+                    self.counters["retries"] += 1
+                    await asyncio.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+        finally:
+            stream.seconds = time.monotonic() - start
+            if stream.ttft is not None and not stream.cancelled:
+                self.stream_timings.append((stream.ttft, stream.seconds))
+            # The final chunk carries usage totals for the whole response.
+            prompt_tokens, response_tokens, estimated = usage_counts(last_chunk, prompt, "".join(parts))
+            self.metrics.record_request(
+                site, stream.seconds, prompt_tokens, response_tokens, estimated,
+                outcome=outcome, ttft=stream.ttft,
+            )
+            stream._push(_DONE)
+
+    async def _stream_chunks(self, prompt):
+        # Each chunk gets the full timeout; a stalled stream fails like a
+        # stalled request.
+        if hasattr(self.model, "generate_content_async"):
+            response = await asyncio.wait_for(self.model.generate_content_async(prompt, stream=True), self.timeout)
+            chunks = response.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), self.timeout)
+                except StopAsyncIteration:
+                    return
+                yield chunk
+        else:
+            response = await self.loop.run_in_executor(None, lambda: self.model.generate_content(prompt, stream=True))
+            chunks = iter(response)
+            while True:
+                chunk = await self.loop.run_in_executor(None, next, chunks, None)
+                if chunk is None:
+                    return
+                yield chunk
+
+    async def _take_token(self):
+        # Token bucket: `burst` requests at once, then `rate` per second.
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+            self._refilled = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            self.counters["throttled"] += 1
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def percentile(self, q):
+        if not self.latencies:
+            return None
+        samples = sorted(self.latencies)
+        return samples[min(len(samples) - 1, int(len(samples) * q / 100))]
+
+    def stats(self):
+        p50, p95 = self.percentile(50), self.percentile(95)
+        report = {
+            **self.counters,
+            "in_flight": len(self._inflight),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+        if self.stream_timings:
+            ttfts = sorted(t for t, _ in self.stream_timings)
+            totals = sorted(total for _, total in self.stream_timings)
+            report["stream_ttft_p50_ms"] = round(ttfts[len(ttfts) // 2] * 1000, 1)
+            report["stream_total_p50_ms"] = round(totals[len(totals) // 2] * 1000, 1)
+        return report
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+
+# --- Fake Model ---
+# Stands in for genai.GenerativeModel when developing or benchmarking the
+# client offline: configurable latency, occasional stragglers and quota errors.
+class FakeQuotaError(Exception):
+    code = 429
+
+class _FakeUsage:
+    def __init__(self, prompt_token_count, candidates_token_count):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+
+class _FakeResponse:
+    def __init__(self, text, usage=None):
+        self.text = text
+        self.usage_metadata = usage
+
+class _FakeStream:
+    def __init__(self, prompt, words, delay):
+        self.prompt = prompt
+        self.words = words
+        self.delay = delay
+
+    async def __aiter__(self):
+        # Like the real API, only the final chunk reports usage totals.
+        for i in range(0, len(self.words), 4):
+            await asyncio.sleep(self.delay)
+            last = i + 4 >= len(self.words)
+            usage = _FakeUsage(len(self.prompt.split()), len(self.words)) if last else None
+            yield _FakeResponse(" ".join(self.words[i:i + 4]) + " ", usage)
+
+class FakeModel:
+    def __init__(self, latency=0.2, jitter=0.05, straggler_rate=0.0, straggler_latency=2.0, error_rate=0.0,
+                 answer_words=60, chunk_delay=0.05):
+        self.latency = latency
+        self.jitter = jitter
+        self.straggler_rate = straggler_rate
+        self.straggler_latency = straggler_latency
+        self.error_rate = error_rate
+        self.answer_words = answer_words
+        self.chunk_delay = chunk_delay
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, stream=False):
+        self.calls += 1
+        delay = self.latency + random.uniform(0, self.jitter)
+        if random.random() < self.straggler_rate:
+            delay = self.straggler_latency
+        await asyncio.sleep(delay)
+        if random.random() < self.error_rate:
+            raise FakeQuotaError("429 Resource has been exhausted")
+        if stream:
+            words = [f"word{i}." if i % 12 == 11 else f"word{i}" for i in range(self.answer_words)]
+            return _FakeStream(prompt, words, self.chunk_delay)
+        # A buffered answer arrives only once the whole text is generated.
+        await asyncio.sleep(self.chunk_delay * self.answer_words / 4)
+        return _FakeResponse(f"fake answer to: {prompt}", _FakeUsage(len(prompt.split()), self.answer_words))
+
+    def generate_content(self, prompt):
+        return asyncio.run(self.generate_content_async(prompt))
+
+def main():
+    parser = argparse.ArgumentParser(description="Exercise GeminiClient against the fake model.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--distinct", type=int, default=40, help="distinct prompts among the requests")
+    parser.add_argument("--callers", type=int, default=16, help="concurrent calling threads")
+    parser.add_argument("--rpm", type=int, default=6000)
+    parser.add_argument("--hedge", action="store_true")
+    parser.add_argument("--straggler-rate", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--stream", action="store_true", help="compare streamed and buffered latency")
+    args = parser.parse_args()
+    if args.stream:
+        return compare_streaming()
+
+    model = FakeModel(straggler_rate=args.straggler_rate, error_rate=args.error_rate)
+    client = GeminiClient(model, max_concurrency=8, requests_per_minute=args.rpm, burst=20,
+                          base_delay=0.05, hedge=args.hedge)
+    prompts = [f"prompt {random.randrange(args.distinct)}" for _ in range(args.requests)]
+    failures = 0
+
+    def call(prompt):
+        nonlocal failures
+        try:
+            client.generate(prompt)
+        except GeminiError:
+            failures += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.callers) as executor:
+        list(executor.map(call, prompts))
+    report = {
+        "seconds": round(time.perf_counter() - start, 3),
+        "requests": args.requests,
+        "model_calls": model.calls,
+        "caller_failures": failures,
+        "client": client.stats(),
+        "metrics": client.metrics.rows(),
+    }
+    client.close()
+    print(json.dumps(report, indent=2))
+
+def compare_streaming(n=10):
+    client = GeminiClient(FakeModel(), requests_per_minute=6000, burst=20)
+    buffered, first, total = [], [], []
+    for i in range(n):
+        start = time.perf_counter()
+        client.generate(f"buffered {i}")
+        buffered.append(time.perf_counter() - start)
+        stream = client.stream(f"streamed {i}")
+        for _ in stream:
+            pass
+        first.append(stream.ttft)
+        total.append(stream.seconds)
+    client.close()
+
+    def ms(samples):
+        return round(statistics.median(samples) * 1000, 1)
+
+    print(json.dumps({
+        "buffered_first_text_ms": ms(buffered),
+        "streamed_first_text_ms": ms(first),
+        "streamed_total_ms": ms(total),
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
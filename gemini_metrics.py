@@ -0,0 +1,184 @@
+import bisect
+import collections
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- Gemini Call Accounting ---
+# Per call site: request outcomes, latency and time-to-first-token histograms,
+# prompt/response token counts, cache and local-index hits, and error classes.
+# GeminiClient records requests; the apps record their cache lookups. Figures
+# are shown on the diagnostics pages and exported in Prometheus text format.
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def estimate_tokens(text):
+    # Rough fallback (~4 characters per token) for responses that carry no
+    # usage metadata, e.g. models without it or a stream cut short.
+    return (len(text) + 3) // 4
+
+def usage_counts(response, prompt, text):
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", None)
+    response_tokens = getattr(usage, "candidates_token_count", None)
+    if prompt_tokens is None or response_tokens is None:
+        return estimate_tokens(prompt), estimate_tokens(text), True
+    return prompt_tokens, response_tokens, False
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation.
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+class _Site:
+    def __init__(self):
+        self.latency = Histogram()
+        self.ttft = Histogram()
+        self.outcomes = collections.Counter()
+        self.errors = collections.Counter()
+        self.lookups = collections.Counter()
+        self.prompt_tokens = 0
+        self.response_tokens = 0
+        self.estimated_tokens = 0
+
+class GeminiMetrics:
+    def __init__(self):
+        self._sites = collections.defaultdict(_Site)
+        self._lock = threading.Lock()
+
+    def record_request(self, site, seconds, prompt_tokens=0, response_tokens=0,
+                       estimated=False, outcome="ok", ttft=None):
+        with self._lock:
+            s = self._sites[site]
+            s.outcomes[outcome] += 1
+            s.latency.observe(seconds)
+            if ttft is not None:
+                s.ttft.observe(ttft)
+            s.prompt_tokens += prompt_tokens
+            s.response_tokens += response_tokens
+            if estimated:
+                s.estimated_tokens += prompt_tokens + response_tokens
+
+    def record_error(self, site, error_class):
+        # One per failed attempt, including ones that were retried.
+        with self._lock:
+            self._sites[site].errors[error_class] += 1
+
+    def record_lookup(self, site, result):
+        # An answer served without a Gemini request of its own: "index",
+        # "exact", "fuzzy" (NL cache) or "coalesced" (shared in-flight request).
+        with self._lock:
+            self._sites[site].lookups[result] += 1
+
+    def rows(self):
+        # One dict per call site for the diagnostics table, slowest first.
+        rows = []
+        with self._lock:
+            for site, s in self._sites.items():
+                calls = s.latency.count
+                hits = sum(s.lookups.values())
+                rows.append({
+                    "Call site": site,
+                    "Requests": calls,
+                    "Errors": s.outcomes["error"],
+                    "p50 (s)": s.latency.quantile(0.5),
+                    "p95 (s)": s.latency.quantile(0.95),
+                    "Mean (s)": round(s.latency.sum / calls, 3) if calls else None,
+                    "TTFT p50 (s)": s.ttft.quantile(0.5),
+                    "Prompt tokens": s.prompt_tokens,
+                    "Response tokens": s.response_tokens,
+                    "Tokens / request": round((s.prompt_tokens + s.response_tokens) / calls, 1) if calls else None,
+                    "Answered locally": hits,
+                    "Hit rate": round(hits / (hits + calls), 3) if hits + calls else None,
+                    "Error classes": ", ".join(f"{k}×{v}" for k, v in s.errors.most_common()),
+                })
+        return sorted(rows, key=lambda r: -(r["Mean (s)"] or 0))
+
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            sites = sorted(self._sites.items())
+
+            def family(name, kind, help_text):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+            family("gemini_requests_total", "counter", "Gemini requests by call site and outcome.")
+            for site, s in sites:
+                for outcome, n in sorted(s.outcomes.items()):
+                    lines.append(f'gemini_requests_total{{site="{site}",outcome="{outcome}"}} {n}')
+            family("gemini_errors_total", "counter", "Failed Gemini attempts by call site and error class.")
+            for site, s in sites:
+                for error, n in sorted(s.errors.items()):
+                    lines.append(f'gemini_errors_total{{site="{site}",error="{error}"}} {n}')
+            family("gemini_lookups_total", "counter", "Answers served without a Gemini request of their own, by source.")
+            for site, s in sites:
+                for result, n in sorted(s.lookups.items()):
+                    lines.append(f'gemini_lookups_total{{site="{site}",result="{result}"}} {n}')
+            family("gemini_tokens_total", "counter", "Prompt and response tokens by call site.")
+            for site, s in sites:
+                lines.append(f'gemini_tokens_total{{site="{site}",kind="prompt"}} {s.prompt_tokens}')
+                lines.append(f'gemini_tokens_total{{site="{site}",kind="response"}} {s.response_tokens}')
+            family("gemini_estimated_tokens_total", "counter", "Tokens estimated from text length (no usage metadata).")
+            for site, s in sites:
+                lines.append(f'gemini_estimated_tokens_total{{site="{site}"}} {s.estimated_tokens}')
+            for name, attr, help_text in [
+                ("gemini_request_seconds", "latency", "Gemini request latency by call site."),
+                ("gemini_first_token_seconds", "ttft", "Time to first streamed token by call site."),
+            ]:
+                family(name, "histogram", help_text)
+                for site, s in sites:
+                    hist = getattr(s, attr)
+                    cumulative = 0
+                    for bound, n in zip(hist.buckets + (float("inf"),), hist.counts):
+                        cumulative += n
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f'{name}_bucket{{site="{site}",le="{le}"}} {cumulative}')
+                    lines.append(f'{name}_sum{{site="{site}"}} {hist.sum:.6f}')
+                    lines.append(f'{name}_count{{site="{site}"}} {hist.count}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._sites.clear()
+
+# --- Prometheus Endpoint ---
+# Streamlit cannot serve extra routes, so scraping goes to a small HTTP server
+# on its own port (GET /metrics).
+def start_metrics_server(metrics, port, host="0.0.0.0"):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="gemini-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,130 @@
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+# --- Import-time Profile ---
+# Lists the imports an app script runs at module level (what every Streamlit
+# process start and cold page load pays for), imports them in a fresh
+# interpreter under `python -X importtime`, and reports the cumulative cost
+# per top-level import plus the slowest modules overall.
+#
+#   python import_profile.py app.py app1.py app2.py
+#   python import_profile.py app2.py --output profile.json
+#   python import_profile.py app2.py --baseline profile.json --budget-ms 800
+
+def module_level_imports(path):
+    # Only statements directly in the module body run on every cold start;
+    # imports inside functions and page branches are deferred.
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.append(node.module)
+    return list(dict.fromkeys(names))
+
+def profile_imports(names, cwd):
+    # An import statement, not importlib.import_module: importtime only times
+    # the outermost module when it goes through the regular import path.
+    script = (
+        "import sys\n"
+        f"for name in {names!r}:\n"
+        "    try:\n"
+        "        exec(f'import {name}')\n"
+        "    except Exception as e:\n"
+        "        print(f'IMPORT-FAILED {name}: {type(e).__name__}: {e}', file=sys.stderr)\n"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=cwd, capture_output=True, text=True,
+    )
+    rows, failed = [], {}
+    for line in proc.stderr.splitlines():
+        if line.startswith("IMPORT-FAILED "):
+            name, _, error = line[len("IMPORT-FAILED "):].partition(": ")
+            failed[name] = error
+            continue
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        depth = (len(module) - len(module.lstrip())) // 2
+        rows.append({
+            "module": module.strip(),
+            "depth": depth,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    return rows, failed
+
+def build_report(path, top):
+    names = module_level_imports(path)
+    rows, failed = profile_imports(names, os.path.dirname(os.path.abspath(path)))
+    # importtime lists each module once, at the point it was first imported,
+    # so the depth-0 rows partition the total.
+    roots = [r for r in rows if r["depth"] == 0]
+    by_root = {}
+    for name in names:
+        root = name.split(".")[0]
+        match = [r for r in roots if r["module"] == name or r["module"] == root]
+        by_root[name] = round(sum(r["cumulative_ms"] for r in match), 1) if match else 0.0
+    return {
+        "script": path,
+        "imports": names,
+        "total_ms": round(sum(r["cumulative_ms"] for r in roots), 1),
+        "per_import_ms": dict(sorted(by_root.items(), key=lambda kv: -kv[1])),
+        "slowest_modules": [
+            {"module": r["module"], "self_ms": round(r["self_ms"], 1)}
+            for r in sorted(rows, key=lambda r: -r["self_ms"])[:top]
+        ],
+        "failed": failed,
+    }
+
+def print_report(report, baseline=None):
+    before = (baseline or {}).get(report["script"], {})
+    delta = ""
+    if before:
+        delta = f" ({report['total_ms'] - before['total_ms']:+.1f} ms vs baseline)"
+    print(f"{report['script']}: {report['total_ms']:.1f} ms in module-level imports{delta}")
+    for name, ms in report["per_import_ms"].items():
+        was = before.get("per_import_ms", {}).get(name)
+        change = f"  {ms - was:+.1f}" if was is not None else ("  new" if before else "")
+        print(f"  {ms:9.1f} ms  {name}{change}")
+    print("  slowest modules (self time):")
+    for row in report["slowest_modules"]:
+        print(f"  {row['self_ms']:9.1f} ms  {row['module']}")
+    for name, error in report["failed"].items():
+        print(f"  not importable here: {name} ({error})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile module-level import cost of the app scripts.")
+    parser.add_argument("scripts", nargs="+")
+    parser.add_argument("--top", type=int, default=10, help="how many slowest modules to list")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--baseline", help="earlier --output report to compare against")
+    parser.add_argument("--budget-ms", type=float, help="exit 1 if any script exceeds this total")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    reports = {}
+    for path in args.scripts:
+        reports[path] = build_report(path, args.top)
+        print_report(reports[path], baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(reports, f, indent=2)
+    if args.budget_ms is not None:
+        over = [r["script"] for r in reports.values() if r["total_ms"] > args.budget_ms]
+        if over:
+            print(f"over the {args.budget_ms:.0f} ms budget: {', '.join(over)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
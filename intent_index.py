@@ -0,0 +1,154 @@
+import re
+
+import numpy as np
+
+from nl_cache import normalize_prompt, singular
+
+# --- Local Intent Index ---
+# Maps free-text prompts onto LINUX_MENU_50 entries with a character n-gram
+# TF-IDF index over each entry's label, command and synonyms. Scoring a prompt
+# is one sparse-row by dense-matrix product, so common requests ("show disk
+# usage", "who is logged in") resolve locally in well under a millisecond
+# instead of a Gemini round trip.
+
+# Question and stop words carry no intent, but their n-grams ("what is")
+# are enough to tie "what is my ip" to "what is the date". They are dropped
+# from phrases and prompts alike.
+STOP_WORDS = {
+    "what", "which", "when", "where", "why", "how", "much", "many", "is", "are",
+    "was", "were", "do", "does", "did", "it", "its", "of", "in", "on", "at", "this",
+    "that", "there", "as", "be", "been",
+}
+
+# Words that ask to see something rather than name what. Every other word of
+# a prompt names an object ("ip", "tmp", "path"), and the matched entry's own
+# phrases must contain it.
+GENERIC_WORDS = {
+    "show", "list", "display", "get", "print", "view", "see", "check", "give", "tell",
+    "current", "all", "info", "information", "details",
+}
+
+def _normalize(text):
+    words = re.sub(r"[^\w\s]", " ", normalize_prompt(text)).split()
+    return " ".join(w for w in words if w not in STOP_WORDS)
+
+def _has_arguments(prompt):
+    # Paths, file names and numbers ("/var", "a.txt", "top 5") mean the user
+    # wants something the fixed menu command cannot do.
+    return any(not w.isalpha() for w in normalize_prompt(prompt).split())
+
+# Verbs that change something. Character n-grams barely weigh the verb, so
+# "kill top cpu processes" scores close to "top cpu processes"; a prompt using
+# one of these only matches an entry whose own phrases use it too.
+ACTION_VERBS = {
+    "kill", "pkill", "killall", "terminate", "stop", "start", "restart", "reload",
+    "enable", "disable", "flush", "clear", "empty", "reset", "delete", "remove", "rm", "purge",
+    "drop", "block", "unblock", "allow", "deny", "install", "uninstall", "upgrade",
+    "update", "create", "add", "make", "set", "change", "edit", "write", "truncate",
+    "move", "copy", "rename", "mount", "unmount", "umount", "format", "shutdown",
+    "reboot", "poweroff", "halt", "chmod", "chown", "compress", "extract", "download",
+    "upload", "send",
+}
+
+def _action_verbs(text):
+    return ACTION_VERBS.intersection(text.split())
+
+def _objects(text):
+    return {singular(w) for w in text.split() if w not in GENERIC_WORDS}
+
+def _ngrams(text, sizes):
+    padded = f" {text} "
+    grams = []
+    for n in sizes:
+        grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return grams
+
+class IntentIndex:
+    def __init__(self, menu, synonyms=None, ngram_sizes=(3, 4), threshold=0.65, margin=0.08):
+        self.ngram_sizes = ngram_sizes
+        self.threshold = threshold
+        self.margin = margin
+        self.labels = list(menu)
+        self.commands = [menu[label] for label in self.labels]
+        synonyms = synonyms or {}
+
+        # One row per phrase; a label scores as the best of its phrases, so a
+        # short synonym is not diluted by the entry's other wording.
+        phrases, owners = [], []
+        for i, label in enumerate(self.labels):
+            for phrase in [label, self.commands[i]] + list(synonyms.get(label, [])):
+                text = _normalize(phrase)
+                if text:
+                    phrases.append(text)
+                    owners.append(i)
+        self.owners = np.array(owners)
+        self.words = [set() for _ in self.labels]
+        for text, i in zip(phrases, owners):
+            self.words[i].update(text.split())
+            self.words[i].update(singular(w) for w in text.split())
+
+        self.vocab = {}
+        rows = []
+        for text in phrases:
+            counts = {}
+            for gram in _ngrams(text, ngram_sizes):
+                col = self.vocab.setdefault(gram, len(self.vocab))
+                counts[col] = counts.get(col, 0) + 1
+            rows.append(counts)
+
+        tf = np.zeros((len(rows), len(self.vocab)), dtype=np.float32)
+        for r, counts in enumerate(rows):
+            tf[r, list(counts)] = list(counts.values())
+        df = np.count_nonzero(tf, axis=0)
+        self.idf = (np.log((1 + len(rows)) / (1 + df)) + 1).astype(np.float32)
+        matrix = np.log1p(tf) * self.idf
+        self.matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+    def _vector(self, text):
+        counts = {}
+        for gram in _ngrams(text, self.ngram_sizes):
+            col = self.vocab.get(gram)
+            if col is not None:
+                counts[col] = counts.get(col, 0) + 1
+        if not counts:
+            return None, None
+        cols = np.fromiter(counts, dtype=np.int64, count=len(counts))
+        weights = np.log1p(np.fromiter(counts.values(), dtype=np.float32, count=len(counts))) * self.idf[cols]
+        # Grams missing from the vocabulary still count towards the prompt's
+        # norm, so unrelated words pull the score down.
+        unseen = len(_ngrams(text, self.ngram_sizes)) - sum(counts.values())
+        norm = np.sqrt(np.dot(weights, weights) + unseen * float(self.idf.max()) ** 2)
+        return cols, weights / norm
+
+    def search(self, prompt, k=3):
+        # Returns [(label, command, score)] best first.
+        text = _normalize(prompt)
+        cols, weights = self._vector(text) if text else (None, None)
+        if cols is None:
+            return []
+        phrase_scores = self.matrix[:, cols] @ weights
+        scores = np.zeros(len(self.labels), dtype=np.float32)
+        np.maximum.at(scores, self.owners, phrase_scores)
+        top = np.argsort(-scores)[:k]
+        return [(self.labels[i], self.commands[i], round(float(scores[i]), 3)) for i in top]
+
+    def match(self, prompt):
+        # Returns (label, command, score) for a confident match, else None. A
+        # match also needs a clear lead over the runner-up, so ambiguous
+        # prompts ("show top processes") still go to the model, and the
+        # entry's phrases must use the prompt's action verb, if it has one,
+        # and every object it names.
+        if _has_arguments(prompt):
+            return None
+        results = self.search(prompt, k=2)
+        if not results:
+            return None
+        label, command, score = results[0]
+        text = _normalize(prompt)
+        words = self.words[self.labels.index(label)]
+        if not _action_verbs(text) <= words or not _objects(text) <= words:
+            return None
+        runner_up = results[1][2] if len(results) > 1 else 0.0
+        if score >= self.threshold and score - runner_up >= self.margin:
+            return label, command, score
+        return None
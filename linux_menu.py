@@ -0,0 +1,161 @@
+# --- Linux Menu SSH (50 Commands) ---
+LINUX_MENU_50 = {
+    "Show date": "date",
+    "Show time": "date +%T",
+    "List directory": "ls -l",
+    "Current user": "whoami",
+    "System info": "uname -a",
+    "Running tasks": "top -b -n 1 | head -15",
+    "IP config": "ip a",
+    "Active connections": "ss -tuln",
+    "ARP table": "ip neigh",
+    "All users": "cut -d: -f1 /etc/passwd",
+    "Logged in users": "who",
+    "Environment variables": "printenv",
+    "List services": "systemctl list-units --type=service --state=running",
+    "Running processes": "ps aux --sort=-%mem | head -10",
+    "Installed packages (dpkg)": "dpkg -l | head -20",
+    "Installed packages (rpm)": "rpm -qa | head -20",
+    "Battery status": "acpi -b || echo 'No battery info'",
+    "Disk usage": "df -h",
+    "Startup programs": "ls /etc/init.d/",
+    "BIOS info": "dmidecode -t bios",
+    "CPU info": "lscpu",
+    "Memory info": "free -h",
+    "Motherboard info": "dmidecode -t baseboard",
+    "Network adapters": "lshw -class network",
+    "Uptime": "uptime",
+    "Routing table": "ip route",
+    "Kernel version": "uname -r",
+    "Hostname": "hostname",
+    "Check internet": "ping -c 4 8.8.8.8",
+    "Show open ports": "netstat -tulpn",
+    "Show firewall rules": "iptables -L",
+    "Show SSH config": "cat /etc/ssh/sshd_config",
+    "Show crontab": "crontab -l",
+    "List users with UID 0": "awk -F: '$3 == 0 {print $1}' /etc/passwd",
+    "Show last logins": "last -a | head -10",
+    "Show failed logins": "lastb -a | head -10",
+    "Show system reboot history": "last reboot | head -10",
+    "Show dmesg errors": "dmesg | grep -i error | tail -20",
+    "List open files": "lsof | head -20",
+    "Show processes by user": "ps -u $USER",
+    "Show disk partitions": "lsblk",
+    "Show PCI devices": "lspci",
+    "Show USB devices": "lsusb",
+    "Show hardware info": "lshw | head -20",
+    "Show systemd failed units": "systemctl --failed",
+    "Show SELinux status": "sestatus",
+    "Show journal logs": "journalctl -n 20",
+    "Show top memory processes": "ps aux --sort=-%mem | head -10",
+    "Show top CPU processes": "ps aux --sort=-%cpu | head -10",
+    "Show swap usage": "swapon --show",
+    "Show temp files": "ls /tmp",
+    # Add more as needed (already 50+ with some options)
+}
+
+# --- Result TTL Classes ---
+# How long a menu entry's output stays valid: hardware facts barely change,
+# live stats go stale in seconds, and clock/probe commands are never cached.
+TTL_SECONDS = {
+    "static": 24 * 60 * 60,
+    "slow": 10 * 60,
+    "live": 10,
+    "none": 0,
+}
+
+MENU_TTL_CLASS = {
+    "Show date": "none",
+    "Show time": "none",
+    "Check internet": "none",
+    "Current user": "static",
+    "System info": "static",
+    "BIOS info": "static",
+    "CPU info": "static",
+    "Motherboard info": "static",
+    "Network adapters": "static",
+    "Kernel version": "static",
+    "Hostname": "static",
+    "Show PCI devices": "static",
+    "Show USB devices": "static",
+    "Show hardware info": "static",
+    "Show disk partitions": "slow",
+    "IP config": "slow",
+    "Routing table": "slow",
+    "All users": "slow",
+    "Environment variables": "slow",
+    "Installed packages (dpkg)": "slow",
+    "Installed packages (rpm)": "slow",
+    "Startup programs": "slow",
+    "Show firewall rules": "slow",
+    "Show SSH config": "slow",
+    "Show crontab": "slow",
+    "List users with UID 0": "slow",
+    "Show SELinux status": "slow",
+    "Show last logins": "slow",
+    "Show system reboot history": "slow",
+}
+
+def menu_ttl(label):
+    # Entries not listed above are live stats; anything outside the menu
+    # (e.g. Gemini-generated commands) is never cached.
+    if label not in LINUX_MENU_50:
+        return 0
+    return TTL_SECONDS[MENU_TTL_CLASS.get(label, "live")]
+
+# --- Intent Synonyms ---
+# Extra phrasings operators use for each entry; the local intent index matches
+# natural-language prompts against these alongside the labels themselves.
+MENU_SYNONYMS = {
+    "Show date": ["what is the date", "today's date", "current date"],
+    "Show time": ["what time is it", "current time", "clock"],
+    "List directory": ["list files", "list all files", "show files in current directory", "ls"],
+    "Current user": ["who am i", "whoami", "which user am i logged in as"],
+    "System info": ["system information", "uname", "os and kernel details"],
+    "Running tasks": ["top", "task manager", "show running tasks", "what is running"],
+    "IP config": ["ip address", "show ip addresses", "network interfaces", "ifconfig"],
+    "Active connections": ["listening sockets", "open sockets", "network connections", "listening ports"],
+    "ARP table": ["arp cache", "neighbour table", "neighbors", "mac addresses on network"],
+    "All users": ["list users", "list all users", "user accounts", "show all users"],
+    "Logged in users": ["who is logged in", "who is online", "logged on users", "active sessions"],
+    "Environment variables": ["env vars", "show environment", "printenv"],
+    "List services": ["running services", "show services", "active services"],
+    "Running processes": ["list processes", "show processes", "process list", "ps"],
+    "Installed packages (dpkg)": ["installed packages debian", "list installed packages", "dpkg packages"],
+    "Installed packages (rpm)": ["installed packages redhat", "rpm packages", "list rpm packages"],
+    "Battery status": ["battery level", "battery charge", "power status"],
+    "Disk usage": ["disk space", "free disk space", "storage usage", "how full is the disk", "df"],
+    "Startup programs": ["boot scripts", "init scripts", "programs at startup"],
+    "BIOS info": ["bios version", "firmware info", "bios details"],
+    "CPU info": ["processor info", "cpu details", "how many cores", "lscpu"],
+    "Memory info": ["ram usage", "free memory", "show memory info", "memory usage", "how much ram"],
+    "Motherboard info": ["baseboard info", "mainboard details", "motherboard model"],
+    "Network adapters": ["network cards", "nic info", "ethernet adapters", "wifi adapters"],
+    "Uptime": ["how long has the system been up", "system uptime", "time since boot", "load average"],
+    "Routing table": ["routes", "show routes", "default gateway", "ip routes"],
+    "Kernel version": ["kernel release", "linux version", "which kernel"],
+    "Hostname": ["machine name", "host name", "computer name"],
+    "Check internet": ["ping google dns", "internet connectivity", "is the internet working", "ping test"],
+    "Show open ports": ["open ports", "netstat", "ports in use", "which ports are open"],
+    "Show firewall rules": ["iptables rules", "firewall config", "list firewall rules"],
+    "Show SSH config": ["sshd config", "ssh server configuration", "sshd_config"],
+    "Show crontab": ["cron jobs", "scheduled jobs", "list cron jobs", "crontab"],
+    "List users with UID 0": ["root users", "users with root privileges", "uid 0 accounts"],
+    "Show last logins": ["login history", "recent logins", "last logged in users"],
+    "Show failed logins": ["failed login attempts", "bad logins", "lastb", "brute force attempts"],
+    "Show system reboot history": ["reboot history", "when did it reboot", "last reboots"],
+    "Show dmesg errors": ["kernel errors", "dmesg errors", "hardware errors", "kernel log errors"],
+    "List open files": ["open files", "lsof", "files in use"],
+    "Show processes by user": ["my processes", "processes for current user", "user processes"],
+    "Show disk partitions": ["partitions", "block devices", "lsblk", "list disks"],
+    "Show PCI devices": ["pci devices", "lspci", "pci cards"],
+    "Show USB devices": ["usb devices", "lsusb", "connected usb"],
+    "Show hardware info": ["hardware summary", "lshw", "hardware details"],
+    "Show systemd failed units": ["failed services", "failed units", "broken services", "services that failed"],
+    "Show SELinux status": ["selinux", "selinux mode", "is selinux enforcing"],
+    "Show journal logs": ["system logs", "journal", "journalctl", "recent logs"],
+    "Show top memory processes": ["processes using most memory", "memory hogs", "top memory consumers"],
+    "Show top CPU processes": ["processes using most cpu", "cpu hogs", "top cpu consumers", "high cpu usage"],
+    "Show swap usage": ["swap", "swap space", "swap usage"],
+    "Show temp files": ["temp files", "tmp directory", "list tmp"],
+}
@@ -0,0 +1,225 @@
+import re
+import threading
+import time
+
+import numpy as np
+
+# --- Remote Metrics Sampler ---
+# One long-lived channel per host runs a tiny shell loop that dumps the raw
+# /proc counters every `interval` seconds. Rates are computed locally and the
+# last N samples are kept in fixed-size NumPy ring buffers.
+
+PROC_FILES = ["/proc/stat", "/proc/meminfo", "/proc/loadavg", "/proc/diskstats", "/proc/net/dev"]
+
+METRICS = [
+    "cpu_percent", "mem_used_percent", "load1", "load5", "load15",
+    "disk_read_bps", "disk_write_bps", "net_rx_bps", "net_tx_bps",
+]
+
+_PARTITION = re.compile(r"^(?:(?:sd|vd|xvd|hd)[a-z]+\d+|(?:nvme\d+n\d+|mmcblk\d+)p\d+)$")
+_VIRTUAL_DISK = re.compile(r"^(?:loop|ram|sr|zram)")
+
+def sampler_script(interval):
+    # One process per sample: grep -H reads every file in a single exec and
+    # prefixes each line with its file name, which is how the sections are
+    # split apart again.
+    files = " ".join(PROC_FILES)
+    return (
+        f"while :; do echo '@@SAMPLE'; grep -H '' {files}; "
+        f"echo '@@END'; sleep {float(interval)}; done"
+    )
+
+# --- Parsing ---
+def parse_sample(text):
+    sections = {f: [] for f in PROC_FILES}
+    for line in text.splitlines():
+        path, sep, rest = line.partition(":")
+        if sep and path in sections:
+            sections[path].append(rest)
+
+    counters = {}
+    for line in sections.get("/proc/stat", []):
+        if line.startswith("cpu "):
+            fields = [int(v) for v in line.split()[1:]]
+            counters["cpu_total"] = sum(fields[:8])
+            counters["cpu_idle"] = fields[3] + (fields[4] if len(fields) > 4 else 0)
+            break
+
+    mem = {}
+    for line in sections.get("/proc/meminfo", []):
+        key, _, rest = line.partition(":")
+        parts = rest.split()
+        if parts:
+            mem[key] = int(parts[0]) * 1024
+    if "MemTotal" in mem:
+        available = mem.get("MemAvailable", mem.get("MemFree", 0))
+        counters["mem_used_percent"] = 100.0 * (mem["MemTotal"] - available) / mem["MemTotal"]
+
+    loadavg = sections.get("/proc/loadavg", [])
+    if loadavg:
+        parts = loadavg[0].split()
+        counters["load1"], counters["load5"], counters["load15"] = (float(v) for v in parts[:3])
+
+    read_sectors = write_sectors = 0
+    for line in sections.get("/proc/diskstats", []):
+        parts = line.split()
+        if len(parts) < 10:
+            continue
+        name = parts[2]
+        if _VIRTUAL_DISK.match(name) or _PARTITION.match(name):
+            continue
+        read_sectors += int(parts[5])
+        write_sectors += int(parts[9])
+    counters["disk_read_bytes"] = read_sectors * 512
+    counters["disk_write_bytes"] = write_sectors * 512
+
+    rx = tx = 0
+    for line in sections.get("/proc/net/dev", []):
+        if ":" not in line:
+            continue
+        iface, _, rest = line.partition(":")
+        if iface.strip() == "lo":
+            continue
+        parts = rest.split()
+        rx += int(parts[0])
+        tx += int(parts[8])
+    counters["net_rx_bytes"] = rx
+    counters["net_tx_bytes"] = tx
+    return counters
+
+def compute_rates(prev, cur, dt):
+    values = {
+        "mem_used_percent": cur.get("mem_used_percent", np.nan),
+        "load1": cur.get("load1", np.nan),
+        "load5": cur.get("load5", np.nan),
+        "load15": cur.get("load15", np.nan),
+    }
+    total = cur.get("cpu_total", 0) - prev.get("cpu_total", 0)
+    idle = cur.get("cpu_idle", 0) - prev.get("cpu_idle", 0)
+    values["cpu_percent"] = 100.0 * (1 - idle / total) if total > 0 else np.nan
+    for counter, metric in [
+        ("disk_read_bytes", "disk_read_bps"), ("disk_write_bytes", "disk_write_bps"),
+        ("net_rx_bytes", "net_rx_bps"), ("net_tx_bytes", "net_tx_bps"),
+    ]:
+        delta = cur.get(counter, 0) - prev.get(counter, 0)
+        # Counters reset on reboot or wrap; drop that interval instead of
+        # charting a huge negative spike.
+        values[metric] = delta / dt if dt > 0 and delta >= 0 else np.nan
+    return values
+
+# --- Time Series Storage ---
+class HostSeries:
+    def __init__(self, size=300):
+        self.size = size
+        self.timestamps = np.full(size, np.nan)
+        self.values = np.full((len(METRICS), size), np.nan)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def append(self, timestamp, values):
+        with self._lock:
+            i = self.count % self.size
+            self.timestamps[i] = timestamp
+            self.values[:, i] = [values.get(m, np.nan) for m in METRICS]
+            self.count += 1
+
+    def snapshot(self):
+        # Returns (timestamps, values) oldest first, copied out of the ring.
+        with self._lock:
+            n = min(self.count, self.size)
+            start = self.count % self.size if self.count > self.size else 0
+            order = (np.arange(n) + start) % self.size
+            return self.timestamps[order].copy(), self.values[:, order].copy()
+
+# --- Sampler Thread ---
+class MetricsSampler:
+    def __init__(self, pool, host, interval=2.0, size=300):
+        self.pool = pool
+        self.host = host
+        self.interval = interval
+        self.series = HostSeries(size)
+        self.error = ""
+        self._stop = threading.Event()
+        self._chan = None
+        self._thread = threading.Thread(target=self._loop, daemon=True, name=f"metrics-{host['name']}")
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        chan = self._chan
+        if chan is not None:
+            chan.close()
+
+    @property
+    def running(self):
+        return self._thread.is_alive() and not self._stop.is_set()
+
+    def _loop(self):
+        backoff = 1
+        while not self._stop.is_set():
+            try:
+                self._sample_over_channel()
+                backoff = 1
+            except Exception as e:
+                self.error = str(e)
+            if not self._stop.is_set():
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30)
+
+    def _sample_over_channel(self):
+        h = self.host
+        self._chan = self.pool.exec_command(
+            h["host"], h["port"], h["user"], h["password"], sampler_script(self.interval),
+        )
+        prev = prev_time = None
+        lines = []
+        try:
+            for raw in self._chan.makefile("r"):
+                if self._stop.is_set():
+                    return
+                line = raw.rstrip("\n")
+                if line == "@@SAMPLE":
+                    lines = []
+                elif line == "@@END":
+                    now = time.time()
+                    cur = parse_sample("\n".join(lines))
+                    if prev is not None:
+                        self.series.append(now, compute_rates(prev, cur, now - prev_time))
+                    prev, prev_time = cur, now
+                    self.error = ""
+                else:
+                    lines.append(line)
+        finally:
+            self._chan.close()
+        if not self._stop.is_set():
+            raise ConnectionError("sampler channel closed")
+
+class SamplerRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samplers = {}
+
+    def start(self, pool, host, interval=2.0, size=300):
+        key = host["name"]
+        with self._lock:
+            sampler = self._samplers.get(key)
+            if sampler is not None and sampler.running:
+                if sampler.interval == interval and sampler.series.size == size:
+                    return sampler
+                sampler.stop()
+            sampler = MetricsSampler(pool, host, interval, size).start()
+            self._samplers[key] = sampler
+            return sampler
+
+    def get(self, name):
+        with self._lock:
+            return self._samplers.get(name)
+
+    def stop(self, name):
+        with self._lock:
+            sampler = self._samplers.pop(name, None)
+        if sampler is not None:
+            sampler.stop()
@@ -0,0 +1,242 @@
+import os
+import re
+import shlex
+import threading
+
+# --- Natural Language -> Command Backends ---
+# Every backend has a `name`, a `cache_key` (the NL cache "model" column, or
+# None when answers are cheap enough not to cache) and
+# translate(prompt) -> (command, source), with command None when the backend
+# has no answer. Deployments pick a chain with NL_BACKEND, e.g. "gemini"
+# (default), "template" (offline, no model), "template+gemini" or
+# "template+llama" (offline, local GGUF model via llama-cpp-python).
+
+COMMAND_PROMPT = (
+    "You are a Linux engineer. Convert the user prompt into a single Linux command. "
+    "Do not use quotes or bash script, only single command like: date, ls, etc.\n"
+    "Prompt: {prompt}"
+)
+
+def clean_command(text):
+    # Models like to wrap the answer in a code fence or prefix it with "$ ".
+    for line in text.strip().splitlines():
+        line = line.strip().strip("`").strip()
+        if not line or line.lower() in ("bash", "sh", "shell"):
+            continue
+        return line[2:] if line.startswith("$ ") else line
+    return ""
+
+# --- Template Backend ---
+# Regex templates for common tasks that take an argument (paths, sizes, PIDs,
+# services), then the menu intent index for argument-free requests. Captured
+# arguments are shell-quoted, so a prompt cannot inject extra commands.
+
+_POLITE = re.compile(r"^(?:please|can you|could you|would you|kindly|i want to|i need to|show me how to)\s+", re.I)
+_UNITS = {"k": "k", "m": "M", "g": "G"}
+
+def _q(value):
+    # A leading "~/" or "~user/" stays unquoted so the target shell still
+    # expands it; a quoted "~/.bashrc" names a folder called "~".
+    home = re.match(r"~[\w.-]*(?:/|$)", value)
+    if home:
+        rest = value[home.end():]
+        return home.group() + (shlex.quote(rest) if rest else "")
+    return shlex.quote(value)
+
+# Words that read like an argument but are not one: "list all files",
+# "start over", "make it executable", "logs of the system". A template whose
+# argument is one of these does not match, and the prompt falls through to
+# the intent index or a model.
+_FILLER = (
+    r"(?:all|any|every|everything|the|a|an|it|this|that|these|those|my|your|our|some|"
+    r"new|old|big|large|small|recent|hidden|open|temp|tmp|system|over|up|down|again|now)"
+)
+_NAME = rf"(?!{_FILLER}\b)[\w@.-]+"
+_EXT = rf"(?!{_FILLER}\b)[A-Za-z0-9]{{1,5}}"
+
+# Arguments of destructive templates (rm, cp, mv) must look like a path: a
+# "/" or "." in them, or quoted. "remove nginx" or "delete everything" is
+# left to a model rather than turned into rm.
+_PATH = r"(?:[^\s'\"]*[/.][^\s'\"]*|\"[^\"]+\"|'[^']+')"
+
+def _path(value):
+    return value[1:-1] if value[:1] in ("'", '"') else value
+
+def _top_processes(m):
+    key = "%mem" if m["key"].lower().startswith("mem") else "%cpu"
+    return f"ps aux --sort=-{key} | head -n {int(m['n']) + 1}"
+
+def _archive(m):
+    path = m["path"].rstrip("/")
+    return f"tar -czf {_q(path + '.tar.gz')} {_q(path)}"
+
+def _extract(m):
+    path = m["path"]
+    if path.endswith(".zip"):
+        return f"unzip {_q(path)}"
+    return f"tar -xf {_q(path)}"
+
+TEMPLATES = [
+    (r"(?:show|list|display)(?: the)? (?:top|first) (?P<n>\d+) (?:processes )?(?:by|using most) (?P<key>memory|mem|cpu)(?: processes)?", _top_processes),
+    (r"(?:show|list|display)(?: the)? top (?P<n>\d+) (?P<key>memory|mem|cpu) (?:processes|consumers|hogs)", _top_processes),
+    (r"(?:find|list|show)(?: all)? files (?:larger|bigger) than (?P<size>\d+) ?(?P<unit>[kmg])b?(?: in (?P<path>\S+))?",
+     lambda m: f"find {_q(m['path'] or '.')} -type f -size +{m['size']}{_UNITS[m['unit'].lower()]}"),
+    (r"(?:find|search for|locate)(?: all)? files (?:named|called) (?P<name>\S+)(?: in (?P<path>\S+))?",
+     lambda m: f"find {_q(m['path'] or '.')} -name {_q(m['name'])}"),
+    (r"(?:search|grep|look) for (?P<term>.+?) in (?P<path>\S+)",
+     lambda m: f"grep -rn {_q(m['term'].strip(chr(34) + chr(39)))} {_q(m['path'])}"),
+    (r"(?:show|list|display)(?: all)? hidden files(?: in (?P<path>\S+))?",
+     lambda m: f"ls -la {_q(m['path'] or '.')}"),
+    # Generic "<ext> files" after every "<word> files" template above it.
+    (rf"(?:find|list|show)(?: all)?(?: the)? \.?(?P<ext>{_EXT}) files(?: in (?P<path>\S+))?",
+     lambda m: f"find {_q(m['path'] or '.')} -name {_q('*.' + m['ext'])}"),
+    (r"(?:list|show|display)(?: all)?(?: the)? (?:files|contents) (?:in|of) (?:directory |folder )?(?P<path>\S+)",
+     lambda m: f"ls -l {_q(m['path'])}"),
+    (r"(?:show|print|display|read)(?: the)? (?:last|final) (?P<n>\d+) lines (?:of|in|from) (?P<path>\S+)",
+     lambda m: f"tail -n {m['n']} {_q(m['path'])}"),
+    (r"(?:show|print|display|read)(?: the)? first (?P<n>\d+) lines (?:of|in|from) (?P<path>\S+)",
+     lambda m: f"head -n {m['n']} {_q(m['path'])}"),
+    (r"(?:show|print|display|read)(?: the)? contents? of (?:file )?(?P<path>\S+)",
+     lambda m: f"cat {_q(m['path'])}"),
+    (r"count(?: the)?(?: number of)? lines (?:in|of) (?P<path>\S+)",
+     lambda m: f"wc -l {_q(m['path'])}"),
+    (r"(?:show |check )?(?:disk usage|size) of (?:directory |folder )?(?P<path>\S+)|how big is (?P<path2>\S+)",
+     lambda m: f"du -sh {_q(m['path'] or m['path2'])}"),
+    (r"(?:create|make)(?: a)?(?: new)? (?:directory|folder|dir) (?:named |called )?(?P<path>\S+)",
+     lambda m: f"mkdir -p {_q(m['path'])}"),
+    (r"(?:create|make)(?: an?)?(?: empty)?(?: new)? file (?:named |called )?(?P<path>\S+)",
+     lambda m: f"touch {_q(m['path'])}"),
+    (rf"(?:delete|remove)(?: the)? (?:directory|folder|dir) (?P<path>{_PATH})",
+     lambda m: f"rm -r {_q(_path(m['path']))}"),
+    (rf"(?:delete|remove)(?: the)?(?: file)? (?P<path>{_PATH})",
+     lambda m: f"rm {_q(_path(m['path']))}"),
+    (rf"copy (?P<src>{_PATH}) to (?P<dst>{_PATH})",
+     lambda m: f"cp -r {_q(_path(m['src']))} {_q(_path(m['dst']))}"),
+    (rf"(?:move|rename) (?P<src>{_PATH}) to (?P<dst>{_PATH})",
+     lambda m: f"mv {_q(_path(m['src']))} {_q(_path(m['dst']))}"),
+    (rf"make (?P<path>(?!{_FILLER}\b)\S+) executable",
+     lambda m: f"chmod +x {_q(m['path'])}"),
+    (r"(?:kill|terminate|stop)(?: the)? process(?:es)? (?:named|called) (?P<name>\S+)",
+     lambda m: f"pkill {_q(m['name'])}"),
+    (r"(?:kill|terminate)(?: the)?(?: process)?(?: with)?(?: pid)? (?P<pid>\d+)",
+     lambda m: f"kill {m['pid']}"),
+    (r"(?:find|show|list)(?: the)? process(?:es)? (?:named|called) (?P<name>\S+)",
+     lambda m: f"pgrep -a {_q(m['name'])}"),
+    (r"(?:what|which)(?: process)? is (?:using|listening on) port (?P<port>\d+)",
+     lambda m: f"ss -ltnp 'sport = :{m['port']}'"),
+    (r"ping (?P<host>[\w.-]+)",
+     lambda m: f"ping -c 4 {_q(m['host'])}"),
+    (rf"(?:show |check )?(?:the )?status of(?: the)? (?:service )?(?P<name>{_NAME})(?: service)?",
+     lambda m: f"systemctl status {_q(m['name'])} --no-pager"),
+    (rf"(?:show )?(?:the )?logs? (?:of|for)(?: the)? (?:service )?(?P<name>{_NAME})(?: service)?",
+     lambda m: f"journalctl -u {_q(m['name'])} -n 50 --no-pager"),
+    (rf"(?P<action>start|stop|restart|reload|enable|disable)(?: the)? (?:service )?(?P<name>{_NAME})(?: service)?",
+     lambda m: f"systemctl {m['action'].lower()} {_q(m['name'])}"),
+    (r"(?:download|fetch) (?P<url>https?://\S+)",
+     lambda m: f"curl -LO {_q(m['url'])}"),
+    (r"(?:extract|unzip|untar|unpack) (?P<path>\S+\.(?:tar\.gz|tgz|tar\.bz2|tar\.xz|tar|zip))", _extract),
+    (r"(?:compress|archive|zip|tar)(?: the)? (?:folder |directory )?(?P<path>\S+)", _archive),
+]
+
+class TemplateBackend:
+    name = "template"
+    cache_key = None
+
+    def __init__(self, intent_index=None):
+        self.templates = [(re.compile(rf"^{pattern}$", re.I), build) for pattern, build in TEMPLATES]
+        self.intent_index = intent_index
+
+    def translate(self, prompt):
+        text = prompt.strip().rstrip("?.!").strip()
+        while _POLITE.match(text):
+            text = _POLITE.sub("", text, count=1)
+        for pattern, build in self.templates:
+            m = pattern.match(text)
+            if m:
+                return build(m), self.name
+        if self.intent_index is not None:
+            hit = self.intent_index.match(text)
+            if hit:
+                return hit[1], self.name
+        return None, None
+
+# --- Gemini Backend ---
+class GeminiBackend:
+    name = "gemini"
+
+    def __init__(self, client_factory, model_name, site="default"):
+        # client_factory is called on first use, so a deployment that never
+        # falls through to Gemini never imports or configures it.
+        self.client_factory = client_factory
+        self.cache_key = model_name
+        self.site = site
+
+    def translate(self, prompt):
+        text = self.client_factory().generate(COMMAND_PROMPT.format(prompt=prompt), site=self.site)
+        return clean_command(text) or None, self.name
+
+# --- Local Model Backend (optional) ---
+FEW_SHOT = (
+    "Translate each request into a single Linux shell command.\n"
+    "Request: show disk usage\nCommand: df -h\n"
+    "Request: list files in /var/log\nCommand: ls -l /var/log\n"
+    "Request: find files larger than 100MB in /home\nCommand: find /home -type f -size +100M\n"
+    "Request: restart nginx\nCommand: systemctl restart nginx\n"
+    "Request: show the last 20 lines of app.log\nCommand: tail -n 20 app.log\n"
+    "Request: {prompt}\nCommand:"
+)
+
+class LlamaCppBackend:
+    name = "llama"
+
+    def __init__(self, model_path, n_ctx=1024, n_threads=None, max_tokens=64):
+        try:
+            from llama_cpp import Llama
+        except ImportError:
+            raise RuntimeError("The llama backend needs llama-cpp-python (pip install llama-cpp-python).")
+        self.llm = Llama(model_path=model_path, n_ctx=n_ctx, n_threads=n_threads or os.cpu_count(), verbose=False)
+        self.cache_key = f"llama:{os.path.basename(model_path)}"
+        self.max_tokens = max_tokens
+        # A Llama context is not safe to share between threads.
+        self._lock = threading.Lock()
+
+    def translate(self, prompt):
+        with self._lock:
+            out = self.llm.create_completion(
+                FEW_SHOT.format(prompt=prompt), max_tokens=self.max_tokens, temperature=0.0, stop=["\n", "Request:"],
+            )
+        return clean_command(out["choices"][0]["text"]) or None, self.name
+
+# --- Chains ---
+class ChainBackend:
+    def __init__(self, backends):
+        self.backends = backends
+        self.name = "+".join(b.name for b in backends)
+        self.cache_key = "+".join(b.cache_key for b in backends if b.cache_key) or None
+
+    def translate(self, prompt):
+        for backend in self.backends:
+            command, source = backend.translate(prompt)
+            if command:
+                return command, source
+        return None, None
+
+def build_backend(spec, gemini_client=None, gemini_model=None, site="default",
+                  intent_index=None, llama_model_path=None):
+    backends = []
+    for part in spec.replace(",", "+").split("+"):
+        part = part.strip().lower()
+        if part == "template":
+            backends.append(TemplateBackend(intent_index))
+        elif part == "gemini":
+            if gemini_client is None:
+                raise ValueError("The gemini backend needs a client factory.")
+            backends.append(GeminiBackend(gemini_client, gemini_model, site))
+        elif part == "llama":
+            path = llama_model_path or os.environ.get("LLAMA_MODEL_PATH")
+            if not path:
+                raise ValueError("Set LLAMA_MODEL_PATH to a GGUF model for the llama backend.")
+            backends.append(LlamaCppBackend(path))
+        else:
+            raise ValueError(f"Unknown NL backend: {part!r} (choose from template, gemini, llama)")
+    return backends[0] if len(backends) == 1 else ChainBackend(backends)
@@ -0,0 +1,165 @@
+import contextlib
+import difflib
+import re
+import sqlite3
+import threading
+import time
+
+# --- Natural Language -> Command Cache ---
+# Persistent SQLite cache of Gemini translations keyed by (model, normalized
+# prompt), with TTL expiry, LRU size bound, hit statistics and an optional
+# fuzzy match for trivially reworded prompts.
+
+_FILLER = {"please", "the", "a", "an", "can", "could", "would", "you", "me", "my", "for", "to"}
+
+# Bumped whenever normalize_prompt changes, so old keys are not reused.
+_KEY_VERSION = 1
+
+def normalize_prompt(prompt):
+    words = re.sub(r"[^\w\s/.-]", " ", prompt.lower()).split()
+    return " ".join(w for w in words if w not in _FILLER)
+
+def _arguments(key):
+    # In prompt order: "move a.txt b.txt" and "move b.txt a.txt" differ.
+    return [w for w in key.split() if not w.isalpha()]
+
+def singular(word):
+    if word.endswith("es") and word[:-2].endswith(("s", "x", "ch", "sh")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+def _content_words(key):
+    # A one-word change is often a small edit that flips the meaning ("mount"
+    # / "unmount", "start" / "restart", "hidden" / "unhidden"), so fuzzy
+    # matches need the same set of words, up to plurals.
+    return {singular(w) for w in key.split()}
+
+class NLCommandCache:
+    def __init__(self, path, ttl=7 * 24 * 60 * 60, max_entries=5000, fuzzy_threshold=0.9, fuzzy_candidates=500):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.fuzzy_threshold = fuzzy_threshold
+        self.fuzzy_candidates = fuzzy_candidates
+        self._lock = threading.Lock()
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS commands ("
+                " model TEXT NOT NULL, prompt TEXT NOT NULL, command TEXT NOT NULL,"
+                " created REAL NOT NULL, last_used REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0,"
+                " PRIMARY KEY (model, prompt))"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS commands_last_used ON commands (model, last_used)")
+            db.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            # Keys from before "all" stopped being filler can merge prompts
+            # that differ in scope ("kill all python processes"); drop them.
+            if db.execute("PRAGMA user_version").fetchone()[0] < _KEY_VERSION:
+                db.execute("DELETE FROM commands")
+                db.execute(f"PRAGMA user_version = {_KEY_VERSION}")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=5)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _bump(self, db, name):
+        db.execute(
+            "INSERT INTO stats (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1", (name,),
+        )
+
+    def lookup(self, prompt, model, fuzzy=False):
+        # Returns (command, "exact" | "fuzzy") or (None, None).
+        key = normalize_prompt(prompt)
+        now = time.time()
+        with self._lock, self._connect() as db:
+            row = db.execute(
+                "SELECT prompt, command FROM commands WHERE model = ? AND prompt = ? AND created > ?",
+                (model, key, now - self.ttl),
+            ).fetchone()
+            kind = "exact" if row else None
+            if row is None and fuzzy and key:
+                row = self._fuzzy(db, key, model, now)
+                kind = "fuzzy" if row else None
+            if row is None:
+                self._bump(db, "misses")
+                return None, None
+            db.execute(
+                "UPDATE commands SET last_used = ?, hits = hits + 1 WHERE model = ? AND prompt = ?",
+                (now, model, row[0]),
+            )
+            self._bump(db, f"{kind}_hits")
+            return row[1], kind
+
+    def _fuzzy(self, db, key, model, now):
+        candidates = db.execute(
+            "SELECT prompt, command FROM commands WHERE model = ? AND created > ? "
+            "ORDER BY last_used DESC LIMIT ?",
+            (model, now - self.ttl, self.fuzzy_candidates),
+        ).fetchall()
+        # Word order is kept: it carries argument roles ("copy a to b").
+        # Argument-like words (paths, file names, numbers) must match exactly
+        # and in the same order: "delete a.txt" must never reuse the command
+        # for "delete b.txt". Every other word must appear in both prompts,
+        # so only plurals, filler and word order may differ.
+        target_args = _arguments(key)
+        target_words = _content_words(key)
+        best, best_score = None, self.fuzzy_threshold
+        matcher = difflib.SequenceMatcher(b=key)
+        for candidate in candidates:
+            if _arguments(candidate[0]) != target_args or _content_words(candidate[0]) != target_words:
+                continue
+            matcher.set_seq1(candidate[0])
+            if matcher.real_quick_ratio() < best_score or matcher.quick_ratio() < best_score:
+                continue
+            score = matcher.ratio()
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+    def put(self, prompt, model, command):
+        key = normalize_prompt(prompt)
+        if not key or not command:
+            return
+        now = time.time()
+        with self._lock, self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO commands (model, prompt, command, created, last_used, hits) "
+                "VALUES (?, ?, ?, ?, ?, 0)",
+                (model, key, command, now, now),
+            )
+            self._evict(db, now)
+
+    def _evict(self, db, now):
+        db.execute("DELETE FROM commands WHERE created <= ?", (now - self.ttl,))
+        db.execute(
+            "DELETE FROM commands WHERE rowid IN ("
+            " SELECT rowid FROM commands ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def clear(self):
+        with self._lock, self._connect() as db:
+            db.execute("DELETE FROM commands")
+            db.execute("DELETE FROM stats")
+
+    def stats(self):
+        with self._lock, self._connect() as db:
+            counters = dict(db.execute("SELECT name, value FROM stats").fetchall())
+            entries = db.execute("SELECT COUNT(*) FROM commands").fetchone()[0]
+        hits = counters.get("exact_hits", 0) + counters.get("fuzzy_hits", 0)
+        total = hits + counters.get("misses", 0)
+        return {
+            "entries": entries,
+            "exact_hits": counters.get("exact_hits", 0),
+            "fuzzy_hits": counters.get("fuzzy_hits", 0),
+            "misses": counters.get("misses", 0),
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+        }
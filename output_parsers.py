@@ -0,0 +1,152 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# --- Menu Output Parsers ---
+# Turn the text output of common LINUX_MENU_50 commands into typed DataFrames
+# so sorting, filtering and aggregation can happen locally. Every parser works
+# on whole columns at once (pandas string methods) rather than row by row, so
+# tens of thousands of lines (e.g. lsof without head) stay fast.
+
+_SIZE_UNITS = {"": 1, "B": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3,
+               "T": 1024 ** 4, "P": 1024 ** 5, "E": 1024 ** 6}
+
+def parse_sizes(series):
+    # "15Gi", "512M", "1,5T", "0B" -> bytes (float, NaN when unparseable)
+    parts = series.astype(str).str.extract(r"^\s*([\d.,]+)\s*([KMGTPEB]?)i?B?\s*$", flags=re.I)
+    number = pd.to_numeric(parts[0].str.replace(",", ".", regex=False), errors="coerce")
+    multiplier = parts[1].fillna("").str.upper().map(_SIZE_UNITS)
+    return number * multiplier
+
+def _lines(text):
+    lines = pd.Series(text.splitlines(), dtype="object")
+    return lines[lines.str.strip() != ""].reset_index(drop=True)
+
+def _split(lines, columns, skip_header=True):
+    # Split on whitespace into a fixed number of columns; the last column
+    # keeps any remaining spaces (commands, paths, descriptions).
+    body = lines.iloc[1:] if skip_header else lines
+    df = body.str.strip().str.split(n=len(columns) - 1, expand=True)
+    df = df.reindex(columns=range(len(columns)))
+    df.columns = columns
+    return df.reset_index(drop=True)
+
+def _to_numeric(df, columns):
+    for col in columns:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+def parse_ps_aux(text):
+    lines = _lines(text)
+    columns = ["USER", "PID", "%CPU", "%MEM", "VSZ", "RSS", "TTY", "STAT", "START", "TIME", "COMMAND"]
+    df = _to_numeric(_split(lines, columns), ["PID", "%CPU", "%MEM", "VSZ", "RSS"])
+    # ps reports VSZ/RSS in KiB.
+    df["VSZ"] = df["VSZ"] * 1024
+    df["RSS"] = df["RSS"] * 1024
+    return df.rename(columns={"VSZ": "VSZ (bytes)", "RSS": "RSS (bytes)"})
+
+def parse_df_h(text):
+    lines = _lines(text)
+    df = _split(lines, ["Filesystem", "Size", "Used", "Avail", "Use%", "Mounted on"])
+    for col in ["Size", "Used", "Avail"]:
+        df[col] = parse_sizes(df[col])
+    df["Use%"] = pd.to_numeric(df["Use%"].str.rstrip("%"), errors="coerce")
+    return df.rename(columns={"Size": "Size (bytes)", "Used": "Used (bytes)", "Avail": "Avail (bytes)"})
+
+def parse_ss_tuln(text):
+    lines = _lines(text)
+    df = _split(lines, ["Netid", "State", "Recv-Q", "Send-Q", "Local Address:Port", "Peer Address:Port"])
+    # Peer column may also carry a trailing process column; keep the address only.
+    df["Peer Address:Port"] = df["Peer Address:Port"].str.split().str[0]
+    df = _to_numeric(df, ["Recv-Q", "Send-Q"])
+    local = df["Local Address:Port"].str.rsplit(":", n=1, expand=True).reindex(columns=[0, 1])
+    df["Local Address"] = local[0]
+    df["Local Port"] = pd.to_numeric(local[1], errors="coerce").astype("Int64")
+    return df
+
+def parse_lsblk(text):
+    lines = _lines(text)
+    df = _split(lines, ["NAME", "MAJ:MIN", "RM", "SIZE", "RO", "TYPE", "MOUNTPOINTS"])
+    df["NAME"] = df["NAME"].str.replace(r"^[^\w]+", "", regex=True)
+    df["SIZE"] = parse_sizes(df["SIZE"])
+    df = _to_numeric(df, ["RM", "RO"])
+    return df.rename(columns={"SIZE": "SIZE (bytes)"})
+
+def parse_ip_route(text):
+    lines = _lines(text)
+    df = pd.DataFrame({"Destination": lines.str.split().str[0]})
+    for key in ["via", "dev", "proto", "scope", "src", "metric"]:
+        df[key] = lines.str.extract(rf"\b{key}\s+(\S+)")[0]
+    df["metric"] = pd.to_numeric(df["metric"], errors="coerce").astype("Int64")
+    return df
+
+def parse_free(text):
+    lines = _lines(text)
+    header = ["total", "used", "free", "shared", "buff/cache", "available"]
+    df = _split(lines, ["Type"] + header)
+    df["Type"] = df["Type"].str.rstrip(":")
+    for col in header:
+        df[col] = parse_sizes(df[col])
+    return df
+
+def parse_systemctl_failed(text):
+    lines = _lines(text)
+    # Stop at the legend ("LOAD   = ...") that follows the table.
+    legend = lines.str.match(r"^\s*(LOAD|Legend)\s*[=:]") | lines.str.match(r"^\s*\d+ loaded units listed")
+    if legend.any():
+        lines = lines.iloc[:legend.idxmax()]
+    lines = lines.str.replace(r"^\s*[●*]\s*", "", regex=True)
+    return _split(lines, ["UNIT", "LOAD", "ACTIVE", "SUB", "DESCRIPTION"])
+
+def _fixed_width(lines, header):
+    # Columns of a fixed-width table whose fields may be blank: a character
+    # position that is a space on every line (header included) separates two
+    # columns, and each run of occupied positions is one column, named by the
+    # header word inside it. The last header word takes the rest of the line.
+    words = [(m.group(), m.start()) for m in re.finditer(r"\S+", header)]
+    last = words[-1][1]
+    fixed = pd.concat([pd.Series([header]), lines]).str.slice(0, last).str.pad(last, side="right")
+    chars = np.array(fixed.tolist(), dtype=f"U{last}").view("U1").reshape(len(fixed), last)
+    occupied = np.concatenate([[False], (chars != " ").any(axis=0), [False]])
+    edges = np.flatnonzero(occupied[1:] != occupied[:-1])
+    runs = list(zip(edges[::2], edges[1::2]))
+    cuts, previous = [], None
+    for _, start in words[:-1]:
+        # Each header word starts its column at the start of the run holding
+        # it; a run holding two header words is split where the second starts.
+        run = next(r for r in runs if r[0] <= start < r[1])
+        cuts.append(start if run == previous else run[0])
+        previous = run
+    cuts[0] = 0
+    cuts.append(last)
+    df = pd.DataFrame({
+        name: lines.str.slice(cuts[i], cuts[i + 1]).str.strip()
+        for i, (name, _) in enumerate(words[:-1])
+    })
+    df[words[-1][0]] = lines.str.slice(last).str.strip()
+    return df.replace("", None).reset_index(drop=True)
+
+def parse_lsof(text):
+    # lsof prints a fixed-width table: SIZE/OFF and NODE are blank on some
+    # rows (deleted mappings, unreadable descriptors) and newer versions add
+    # TID and TASKCMD, so whitespace splitting would shift columns.
+    lines = _lines(text)
+    if lines.empty:
+        return pd.DataFrame(columns=["COMMAND", "PID", "USER", "FD", "TYPE", "DEVICE", "SIZE/OFF", "NODE", "NAME"])
+    df = _fixed_width(lines.iloc[1:], lines.iloc[0])
+    numeric = [c for c in ["PID", "TID", "SIZE/OFF"] if c in df.columns]
+    return _to_numeric(df, numeric)
+
+PARSERS = {
+    "Running processes": parse_ps_aux,
+    "Show top memory processes": parse_ps_aux,
+    "Show top CPU processes": parse_ps_aux,
+    "Disk usage": parse_df_h,
+    "Active connections": parse_ss_tuln,
+    "Show disk partitions": parse_lsblk,
+    "Routing table": parse_ip_route,
+    "Memory info": parse_free,
+    "Show systemd failed units": parse_systemctl_failed,
+    "List open files": parse_lsof,
+}
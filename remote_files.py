@@ -0,0 +1,126 @@
+import posixpath
+import stat
+import time
+
+import pandas as pd
+
+# --- Remote File Management (SFTP) ---
+# Mirrors the local file helpers in the apps, but against an SFTP session on
+# the pooled SSH transport.
+
+CHUNK_SIZE = 256 * 1024
+PREFETCH_WINDOW = 16 * 1024 * 1024
+
+def _human_size(size):
+    for unit in ['bytes', 'KB', 'MB', 'GB']:
+        if size < 1024.0 or unit == 'GB':
+            break
+        size /= 1024.0
+    return f"{size:.2f} {unit}"
+
+def list_remote_files_df(sftp, directory):
+    # listdir_attr returns names and stat data in one round trip per
+    # directory, instead of a stat call per entry.
+    data = []
+    for attr in sftp.listdir_attr(directory):
+        if stat.S_ISDIR(attr.st_mode or 0):
+            data.append([attr.filename, "📁 Folder", "-"])
+        else:
+            data.append([attr.filename, "📄 File", _human_size(attr.st_size or 0)])
+    return pd.DataFrame(data, columns=["Name", "Type", "Size"])
+
+def rename_remote_file(sftp, directory, old_name, new_name):
+    sftp.rename(posixpath.join(directory, old_name), posixpath.join(directory, new_name))
+    return "Renamed Successfully"
+
+def _remove_tree(sftp, path):
+    for attr in sftp.listdir_attr(path):
+        child = posixpath.join(path, attr.filename)
+        if stat.S_ISDIR(attr.st_mode or 0):
+            _remove_tree(sftp, child)
+        else:
+            sftp.remove(child)
+    sftp.rmdir(path)
+
+def delete_remote_path(sftp, directory, name):
+    path = posixpath.join(directory, name)
+    try:
+        mode = sftp.lstat(path).st_mode or 0
+    except IOError:
+        return "Enter correct path"
+    if stat.S_ISDIR(mode):
+        _remove_tree(sftp, path)
+        return "Directory deleted successfully"
+    sftp.remove(path)
+    return "File deleted successfully"
+
+def create_remote_dir(sftp, directory, folder_name):
+    path = directory
+    for part in folder_name.strip("/").split("/"):
+        path = posixpath.join(path, part)
+        try:
+            sftp.stat(path)
+        except IOError:
+            sftp.mkdir(path)
+    return "Directory Created successfully"
+
+def read_remote_head(sftp, file_path, max_bytes=256 * 1024):
+    with sftp.open(file_path, "rb") as f:
+        return f.read(max_bytes)
+
+# --- Pipelined Transfers ---
+# Downloads prefetch a window at a time (many outstanding read requests,
+# bounded memory); uploads use pipelined writes (no wait for each write ack).
+# Both move CHUNK_SIZE blocks and report (bytes_done, total_bytes,
+# bytes_per_second) to `progress`.
+
+def download_remote_file(sftp, remote_path, local_fileobj, progress=None, chunk_size=CHUNK_SIZE,
+                         window=PREFETCH_WINDOW):
+    # Prefetches one window of chunks at a time: prefetch(total) would queue
+    # reads for the whole file and buffer every response, so memory is
+    # bounded by `window` rather than the file size.
+    total = sftp.stat(remote_path).st_size or 0
+    done = 0
+    start = time.monotonic()
+
+    def write(data):
+        nonlocal done
+        local_fileobj.write(data)
+        done += len(data)
+        if progress:
+            progress(done, total, done / max(time.monotonic() - start, 1e-6))
+
+    with sftp.open(remote_path, "rb") as remote:
+        while done < total:
+            end = min(total, done + window)
+            chunks = [(offset, min(chunk_size, end - offset)) for offset in range(done, end, chunk_size)]
+            before = done
+            for data in remote.readv(chunks):
+                if not data:
+                    break
+                write(data)
+            if done - before < end - before:
+                break  # shrank while downloading
+        # Anything appended after the stat().
+        remote.seek(done)
+        while True:
+            data = remote.read(chunk_size)
+            if not data:
+                break
+            write(data)
+    return done
+
+def upload_remote_file(sftp, local_fileobj, remote_path, total=None, progress=None, chunk_size=CHUNK_SIZE):
+    done = 0
+    start = time.monotonic()
+    with sftp.open(remote_path, "wb") as remote:
+        remote.set_pipelined(True)
+        while True:
+            data = local_fileobj.read(chunk_size)
+            if not data:
+                break
+            remote.write(data)
+            done += len(data)
+            if progress:
+                progress(done, total or done, done / max(time.monotonic() - start, 1e-6))
+    return done
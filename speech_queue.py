@@ -0,0 +1,57 @@
+import queue
+import re
+import threading
+
+# --- Sentence-by-sentence Speech ---
+# Streamed answers are spoken as each sentence completes rather than after
+# the whole response. A single worker thread owns the TTS engine (pyttsx3 is
+# not safe to drive from several threads), so the page keeps rendering while
+# earlier sentences are read out.
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_MARKDOWN = re.compile(r"[*_#`>|]+")
+
+class SentenceSplitter:
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, text):
+        # Returns the sentences completed by this chunk; the rest is held back.
+        self.buffer += text
+        parts = _SENTENCE_END.split(self.buffer)
+        self.buffer = parts.pop()
+        return [p.strip() for p in parts if p.strip()]
+
+    def flush(self):
+        rest, self.buffer = self.buffer.strip(), ""
+        return [rest] if rest else []
+
+class SpeechQueue:
+    def __init__(self, engine_factory):
+        self._engine_factory = engine_factory
+        self._queue = queue.Queue()
+        self._generation = 0
+        threading.Thread(target=self._run, name="speech-queue", daemon=True).start()
+
+    def say(self, text):
+        text = _MARKDOWN.sub(" ", text).strip()
+        if text:
+            self._queue.put((self._generation, text))
+
+    def clear(self):
+        # Drops everything not yet spoken; the sentence in progress finishes.
+        self._generation += 1
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def _run(self):
+        engine = self._engine_factory()
+        while True:
+            generation, text = self._queue.get()
+            if generation != self._generation:
+                continue
+            engine.say(text)
+            engine.runAndWait()
@@ -0,0 +1,75 @@
+import re
+import secrets
+import time
+
+from ssh_stream import drain_channel
+
+# --- Batch Execution ---
+# Several commands go to the remote shell as one script over a single channel.
+# Each command's output is framed by nonce-tagged markers that carry its exit
+# code and start/end timestamps, so results can be split back out locally.
+
+MARKER = "@@VYUHA"
+
+def build_batch_script(commands, nonce):
+    lines = ["exec 2>&1"]
+    for i, command in enumerate(commands):
+        lines.append(f"printf '%s\\n' '{MARKER}:{nonce}:BEGIN:{i}'")
+        lines.append("_s=$(date +%s%N)")
+        # Subshell keeps `exit`/`cd` local; /dev/null stops the command from
+        # reading the rest of this script off stdin.
+        lines.append(f"( {command}\n) </dev/null")
+        lines.append("_rc=$?")
+        lines.append("_e=$(date +%s%N)")
+        lines.append(f"printf '\\n%s:%s:%s:%s\\n' '{MARKER}:{nonce}:END:{i}' \"$_rc\" \"$_s\" \"$_e\"")
+    return "\n".join(lines) + "\n"
+
+def _nanos(value):
+    try:
+        return int(value)
+    except ValueError:
+        # busybox/BSD date has no %N; fall back to no per-command timing.
+        return None
+
+def parse_batch_output(text, commands, nonce):
+    begin = re.compile(rf"^{MARKER}:{nonce}:BEGIN:(\d+)$", re.M)
+    end = re.compile(rf"\n{MARKER}:{nonce}:END:(\d+):(-?\d+):(\S*):(\S*)$", re.M)
+    results = [
+        {"Command": command, "Exit": None, "Seconds": None, "Output": "", "Complete": False}
+        for command in commands
+    ]
+    pos = 0
+    while True:
+        b = begin.search(text, pos)
+        if not b:
+            break
+        i = int(b.group(1))
+        body_start = b.end() + 1
+        e = end.search(text, body_start)
+        if not e or int(e.group(1)) != i:
+            # Command never finished (timeout/cancel): keep what it printed.
+            results[i]["Output"] = text[body_start:]
+            break
+        results[i]["Output"] = text[body_start:e.start()]
+        results[i]["Exit"] = int(e.group(2))
+        started, finished = _nanos(e.group(3)), _nanos(e.group(4))
+        if started is not None and finished is not None:
+            results[i]["Seconds"] = round((finished - started) / 1e9, 3)
+        results[i]["Complete"] = True
+        pos = e.end()
+    return results
+
+def run_batch(pool, host, port, user, password, commands, exec_timeout=None):
+    nonce = secrets.token_hex(8)
+    script = build_batch_script(commands, nonce)
+    start = time.monotonic()
+    chan = pool.exec_command(host, port, user, password, "sh -s")
+    try:
+        chan.sendall(script.encode())
+        chan.shutdown_write()
+        deadline = start + exec_timeout if exec_timeout else None
+        result = drain_channel(chan, deadline=deadline)
+    finally:
+        chan.close()
+    results = parse_batch_output(result["stdout"].text(), commands, nonce)
+    return results, round(time.monotonic() - start, 2)
@@ -0,0 +1,93 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# --- Host Inventory ---
+# Entries come from SSH_HOSTS in the secrets file and may be either
+# "user@host:port" strings or dicts with host/port/user/password/name keys.
+
+def parse_host(entry, default_user, default_password, default_port=22):
+    if isinstance(entry, dict):
+        host = entry["host"]
+        port = int(entry.get("port", default_port))
+        user = entry.get("user", default_user)
+        return {
+            "name": entry.get("name", host),
+            "host": host,
+            "port": port,
+            "user": user,
+            "password": entry.get("password", default_password),
+        }
+    user, _, hostport = entry.rpartition("@")
+    host, _, port = hostport.partition(":")
+    return {
+        "name": entry,
+        "host": host,
+        "port": int(port) if port else default_port,
+        "user": user or default_user,
+        "password": default_password,
+    }
+
+def load_inventory(entries, default_host, default_user, default_password):
+    # The primary SSH_IP host always comes first so single-host use is unchanged.
+    hosts = [parse_host(default_host, default_user, default_password)]
+    for entry in entries or []:
+        host = parse_host(entry, default_user, default_password)
+        if (host["host"], host["port"], host["user"]) != (hosts[0]["host"], hosts[0]["port"], hosts[0]["user"]):
+            hosts.append(host)
+    return hosts
+
+# --- Concurrent Fan-out ---
+def cache_key(host, command, mode="exec"):
+    # "exec" results keep stdout and stderr apart; "batch" results come from
+    # a script run under 2>&1 with the two merged, so they never share a key.
+    return (mode, host["host"], host["port"], host["user"], command)
+
+def _run_one(pool, host, command, connect_timeout, exec_timeout, cache=None, ttl=0, refresh=False):
+    key = cache_key(host, command)
+    if cache is not None and ttl and not refresh:
+        hit = cache.get(key)
+        if hit is not None:
+            cached, age = hit
+            return {
+                "Host": host["name"], "Status": "ok", "Exit": cached["Exit"], "Seconds": 0.0,
+                "Cache": f"hit ({age}s old)", "Output": cached["Output"], "Error": cached["Error"],
+            }
+    start = time.monotonic()
+    try:
+        output, error, status = pool.run(
+            host["host"], host["port"], host["user"], host["password"], command,
+            timeout=connect_timeout, exec_timeout=exec_timeout,
+        )
+        state = "ok" if status == 0 else "failed"
+    except TimeoutError as e:
+        output, error, status, state = "", str(e), None, "timeout"
+    except Exception as e:
+        output, error, status, state = "", f"SSH Error: {e}", None, "error"
+    if cache is not None and state == "ok":
+        cache.put(key, {"Output": output, "Error": error, "Exit": status}, ttl)
+    return {
+        "Host": host["name"],
+        "Status": state,
+        "Exit": status,
+        "Seconds": round(time.monotonic() - start, 2),
+        "Cache": "miss" if cache is not None and ttl else "off",
+        "Output": output,
+        "Error": error,
+    }
+
+def map_hosts(hosts, fn, max_workers=16):
+    # Yields fn(host) for each host as soon as it finishes, so wall time tracks
+    # the slowest host rather than the sum over all hosts.
+    workers = max(1, min(max_workers, len(hosts)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ssh-fleet") as executor:
+        futures = [executor.submit(fn, host) for host in hosts]
+        for future in as_completed(futures):
+            yield future.result()
+
+def run_on_hosts(pool, hosts, command, max_workers=16, connect_timeout=5, exec_timeout=30,
+                 cache=None, ttl=0, refresh=False):
+    return map_hosts(
+        hosts,
+        lambda host: _run_one(pool, host, command, connect_timeout, exec_timeout, cache, ttl, refresh),
+        max_workers,
+    )
@@ -0,0 +1,206 @@
+import hashlib
+import hmac
+import os
+import socket
+import threading
+import time
+import paramiko
+from ssh_stream import drain_channel
+
+# --- Pooled SSH Connections ---
+# One authenticated transport per (host, port, user, password), reused for every
+# command. Each command gets its own fresh channel on the shared transport.
+# The password is part of the key (as a salted HMAC, never stored in clear):
+# the pool is shared by every session, and a transport that one caller
+# authenticated must not be handed to another who typed the same host and
+# user with a different password.
+
+class _PooledConnection:
+    def __init__(self, client):
+        self.client = client
+        self.transport = client.get_transport()
+        self.last_used = time.monotonic()
+
+    def is_alive(self):
+        return self.transport is not None and self.transport.is_active()
+
+    def open_channels(self):
+        try:
+            return len(self.transport._channels)
+        except Exception:
+            return 0
+
+    def close(self):
+        try:
+            self.client.close()
+        except Exception:
+            pass
+
+
+class SSHPool:
+    def __init__(self, keepalive=30, idle_timeout=300, connect_timeout=10):
+        self.keepalive = keepalive
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._conns = {}
+        self._sftp = {}
+        self._reaper = None
+        self._closed = False
+        self._salt = os.urandom(16)
+
+    # --- Connection management ---
+    def _key(self, host, port, user, password):
+        secret = hmac.new(self._salt, (password or "").encode(), hashlib.sha256).hexdigest()
+        return (host, port, user, secret)
+
+    def _key_lock(self, key):
+        with self._lock:
+            if key not in self._key_locks:
+                self._key_locks[key] = threading.Lock()
+            return self._key_locks[key]
+
+    def _connect(self, host, port, user, password, timeout):
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        timeout = timeout or self.connect_timeout
+        # Small request/reply packets (channel open, exec, exit status) would
+        # otherwise sit behind Nagle + delayed ACK for ~40 ms each.
+        sock = socket.create_connection((host, port), timeout=timeout)
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client.connect(
+                host, port, user, password, sock=sock,
+                timeout=timeout, banner_timeout=timeout, auth_timeout=timeout,
+            )
+            client.get_transport().set_keepalive(self.keepalive)
+        except Exception:
+            # Auth failure or timeout: don't leak the socket or the
+            # half-started transport thread.
+            client.close()
+            sock.close()
+            raise
+        return _PooledConnection(client)
+
+    def get_transport(self, host, port, user, password, timeout=None):
+        key = self._key(host, port, user, password)
+        self._start_reaper()
+        with self._key_lock(key):
+            with self._lock:
+                conn = self._conns.get(key)
+            if conn is not None and not conn.is_alive():
+                conn.close()
+                conn = None
+            if conn is None:
+                conn = self._connect(host, port, user, password, timeout)
+                with self._lock:
+                    self._conns[key] = conn
+            conn.last_used = time.monotonic()
+            return conn.transport
+
+    def discard(self, host, port, user, password):
+        key = self._key(host, port, user, password)
+        with self._lock:
+            conn = self._conns.pop(key, None)
+            self._sftp.pop(key, None)
+        if conn is not None:
+            conn.close()
+
+    def open_channel(self, host, port, user, password, timeout=None):
+        # A transport can die between the liveness check and open_session
+        # (server restart, NAT timeout); retry once on a fresh connection.
+        transport = self.get_transport(host, port, user, password, timeout)
+        try:
+            return transport.open_session(timeout=timeout or self.connect_timeout)
+        except (paramiko.SSHException, EOFError, OSError):
+            self.discard(host, port, user, password)
+            transport = self.get_transport(host, port, user, password, timeout)
+            return transport.open_session(timeout=timeout or self.connect_timeout)
+
+    def sftp(self, host, port, user, password, timeout=None):
+        # One SFTP session per pooled transport, reopened if either has died.
+        key = self._key(host, port, user, password)
+        transport = self.get_transport(host, port, user, password, timeout)
+        with self._key_lock(key):
+            client = self._sftp.get(key)
+            chan = client.get_channel() if client is not None else None
+            if chan is None or chan.closed or chan.get_transport() is not transport:
+                client = paramiko.SFTPClient.from_transport(transport)
+                self._sftp[key] = client
+            return client
+
+    def open_sftp(self, host, port, user, password, timeout=None):
+        # A dedicated, uncached session for long transfers; its open channel
+        # keeps the transport from being evicted mid-transfer. Caller closes.
+        transport = self.get_transport(host, port, user, password, timeout)
+        return paramiko.SFTPClient.from_transport(transport)
+
+    # --- Command execution ---
+    def exec_command(self, host, port, user, password, command, timeout=None):
+        chan = self.open_channel(host, port, user, password, timeout)
+        chan.exec_command(command)
+        return chan
+
+    def run(self, host, port, user, password, command, timeout=None, exec_timeout=None):
+        chan = self.exec_command(host, port, user, password, command, timeout)
+        deadline = time.monotonic() + exec_timeout if exec_timeout else None
+        try:
+            result = drain_channel(chan, deadline=deadline)
+        finally:
+            chan.close()
+        if result["timed_out"]:
+            raise TimeoutError(f"command exceeded {exec_timeout}s")
+        return result["stdout"].text(), result["stderr"].text(), result["exit_status"]
+
+    # --- Idle eviction ---
+    def evict_idle(self):
+        now = time.monotonic()
+        stale = []
+        with self._lock:
+            for key, conn in list(self._conns.items()):
+                # Long transfers, streams and samplers hold channels open
+                # without touching last_used; only the cached SFTP session
+                # may be open on a transport we evict as idle.
+                busy = conn.open_channels() > (1 if key in self._sftp else 0)
+                idle = now - conn.last_used > self.idle_timeout and not busy
+                if idle or not conn.is_alive():
+                    stale.append(self._conns.pop(key))
+                    self._sftp.pop(key, None)
+        for conn in stale:
+            conn.close()
+        return len(stale)
+
+    def _start_reaper(self):
+        with self._lock:
+            if self._reaper is not None or self._closed:
+                return
+            self._reaper = threading.Thread(target=self._reap_loop, daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        interval = max(1, self.idle_timeout / 4)
+        while not self._closed:
+            time.sleep(interval)
+            self.evict_idle()
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "host": key[0], "port": key[1], "user": key[2],
+                    "alive": conn.is_alive(),
+                    "idle_seconds": round(now - conn.last_used, 1),
+                }
+                for key, conn in self._conns.items()
+            ]
+
+    def close_all(self):
+        self._closed = True
+        with self._lock:
+            conns = list(self._conns.values())
+            self._conns.clear()
+            self._sftp.clear()
+        for conn in conns:
+            conn.close()
@@ -0,0 +1,192 @@
+import os
+import re
+import secrets
+import select
+import shlex
+import tempfile
+import time
+import weakref
+import zlib
+from array import array
+
+# --- Compressed, Spooled Remote Output ---
+# The remote side gzips the command's combined output; the client inflates it
+# straight into a temp file on disk and indexes line offsets as it goes, so
+# the page only ever reads and renders one slice of lines at a time.
+
+SPOOL_PREFIX = "vyuha-spool-"
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def sweep_spools(max_age=24 * 60 * 60):
+    # Spool files left behind by a process that died without cleaning up.
+    cutoff = time.time() - max_age
+    directory = tempfile.gettempdir()
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if name.startswith(SPOOL_PREFIX) and os.stat(path).st_mtime < cutoff:
+                os.remove(path)
+        except OSError:
+            continue
+
+class SpooledOutput:
+    def __init__(self):
+        self.file = tempfile.NamedTemporaryFile(prefix=SPOOL_PREFIX, suffix=".log", delete=False)
+        self.path = self.file.name
+        # The file goes when the spool does (e.g. its session ends), even if
+        # delete() is never called.
+        self._finalizer = weakref.finalize(self, _remove, self.path)
+        self.line_offsets = array("Q", [0])
+        self.size = 0
+        self.compressed_bytes = 0
+        self.exit_status = None
+        self.cancelled = False
+        self.timed_out = False
+        self.seconds = 0.0
+
+    def write(self, data):
+        if not data:
+            return
+        self.file.write(data)
+        pos = data.find(b"\n")
+        while pos != -1:
+            self.line_offsets.append(self.size + pos + 1)
+            pos = data.find(b"\n", pos + 1)
+        self.size += len(data)
+
+    def finish(self):
+        self.file.close()
+
+    @property
+    def line_count(self):
+        # The last offset marks a line start; it only counts if text follows.
+        return len(self.line_offsets) - (1 if self.line_offsets[-1] == self.size else 0)
+
+    def truncate_to(self, size):
+        # Drop a trailer written at the end of the stream.
+        with open(self.path, "r+b") as f:
+            f.truncate(size)
+        self.size = size
+        while len(self.line_offsets) > 1 and self.line_offsets[-1] > size:
+            self.line_offsets.pop()
+
+    def lines(self, start, count):
+        start = max(0, min(start, self.line_count))
+        end = min(start + count, self.line_count)
+        if end <= start:
+            return ""
+        begin = self.line_offsets[start]
+        stop = self.line_offsets[end] if end < len(self.line_offsets) else self.size
+        with open(self.path, "rb") as f:
+            f.seek(begin)
+            return f.read(stop - begin).decode(errors="replace")
+
+    def search(self, term, max_hits=200, block_size=4 * 1024 * 1024):
+        # Scans the spool in blocks; returns line numbers of matches.
+        needle = term.encode()
+        hits = []
+        if not needle:
+            return hits
+        overlap = len(needle) - 1
+        with open(self.path, "rb") as f:
+            base = 0
+            tail = b""
+            while len(hits) < max_hits:
+                block = f.read(block_size)
+                if not block:
+                    break
+                data = tail + block
+                data_start = base - len(tail)
+                for match in re.finditer(re.escape(needle), data, re.I):
+                    line = self._line_of(data_start + match.start())
+                    if not hits or hits[-1] != line:
+                        hits.append(line)
+                    if len(hits) >= max_hits:
+                        break
+                tail = data[-overlap:] if overlap else b""
+                base += len(block)
+        return sorted(set(hits))
+
+    def _line_of(self, offset):
+        lo, hi = 0, len(self.line_offsets) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.line_offsets[mid] <= offset:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
+
+    def delete(self):
+        self._finalizer()
+
+def run_compressed(pool, host, port, user, password, command, on_progress=None,
+                   cancel=None, exec_timeout=None, chunk_size=64 * 1024, poll=0.05):
+    nonce = secrets.token_hex(8)
+    trailer = f"@@VYUHA:{nonce}:EXIT:"
+    remote = (
+        f"{{ ( {command}\n) 2>&1; printf '\\n%s%s\\n' '{trailer}' \"$?\"; }} | gzip -c -1"
+    )
+    spool = SpooledOutput()
+    inflate = zlib.decompressobj(wbits=31)
+    start = time.monotonic()
+    deadline = start + exec_timeout if exec_timeout else None
+    errors = b""
+    chan = pool.exec_command(host, port, user, password, "sh -c " + shlex.quote(remote))
+    try:
+        while True:
+            if cancel is not None and cancel.is_set():
+                spool.cancelled = True
+                break
+            if deadline is not None and time.monotonic() > deadline:
+                spool.timed_out = True
+                break
+            if chan.recv_ready():
+                data = chan.recv(chunk_size)
+                spool.compressed_bytes += len(data)
+                _inflate_into(spool, inflate, data)
+                if on_progress:
+                    on_progress(spool)
+                continue
+            if chan.recv_stderr_ready():
+                errors += chan.recv_stderr(chunk_size)
+                continue
+            if chan.exit_status_ready() or chan.closed:
+                if not chan.recv_ready() and not chan.recv_stderr_ready():
+                    break
+                continue
+            select.select([chan], [], [], poll)
+        spool.write(inflate.flush())
+    finally:
+        chan.close()
+        spool.finish()
+    spool.seconds = round(time.monotonic() - start, 2)
+    _strip_trailer(spool, trailer)
+    if errors and spool.size == 0:
+        raise RuntimeError(errors.decode(errors="replace").strip())
+    return spool
+
+def _inflate_into(spool, inflate, data, limit=1024 * 1024):
+    # Highly compressible output (e.g. repeated log lines) can inflate 100x;
+    # cap each decompressed piece so memory stays flat.
+    spool.write(inflate.decompress(data, limit))
+    while inflate.unconsumed_tail:
+        spool.write(inflate.decompress(inflate.unconsumed_tail, limit))
+
+def _strip_trailer(spool, trailer):
+    tail_start = max(0, spool.size - len(trailer) - 32)
+    with open(spool.path, "rb") as f:
+        f.seek(tail_start)
+        tail = f.read()
+    pos = tail.rfind(b"\n" + trailer.encode())
+    if pos == -1:
+        return
+    status = tail[pos + 1 + len(trailer):].strip()
+    if status.isdigit():
+        spool.exit_status = int(status)
+    spool.truncate_to(tail_start + pos)
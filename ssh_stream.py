@@ -0,0 +1,109 @@
+import collections
+import select
+import time
+
+# --- Ring Buffer ---
+# Keeps only the most recent max_bytes of a stream; max_bytes=None keeps all.
+
+class RingBuffer:
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+        self._chunks = collections.deque()
+        self._size = 0
+        self.total_bytes = 0
+        self.dropped_bytes = 0
+
+    def append(self, data):
+        if not data:
+            return
+        self._chunks.append(data)
+        self._size += len(data)
+        self.total_bytes += len(data)
+        if self.max_bytes is None:
+            return
+        while self._size > self.max_bytes:
+            excess = self._size - self.max_bytes
+            head = self._chunks[0]
+            if len(head) <= excess:
+                self._chunks.popleft()
+                self._size -= len(head)
+                self.dropped_bytes += len(head)
+            else:
+                self._chunks[0] = head[excess:]
+                self._size -= excess
+                self.dropped_bytes += excess
+
+    def getvalue(self):
+        return b"".join(self._chunks)
+
+    def text(self):
+        return self.getvalue().decode(errors="replace")
+
+# --- Channel Draining ---
+# stdout and stderr are read from the same loop so a command that fills one
+# stream can never block while we wait on the other.
+
+def drain_channel(chan, on_update=None, update_interval=0.25, cancel=None,
+                  deadline=None, max_bytes=None, chunk_size=32768, poll=0.05):
+    stdout = RingBuffer(max_bytes)
+    stderr = RingBuffer(max_bytes)
+    cancelled = timed_out = False
+    last_update = 0.0
+    while True:
+        if cancel is not None and cancel.is_set():
+            cancelled = True
+            break
+        if deadline is not None and time.monotonic() > deadline:
+            timed_out = True
+            break
+        got = False
+        if chan.recv_ready():
+            stdout.append(chan.recv(chunk_size))
+            got = True
+        if chan.recv_stderr_ready():
+            stderr.append(chan.recv_stderr(chunk_size))
+            got = True
+        if got:
+            now = time.monotonic()
+            if on_update and now - last_update >= update_interval:
+                last_update = now
+                on_update(stdout, stderr)
+            continue
+        if chan.exit_status_ready() or chan.closed:
+            if not chan.recv_ready() and not chan.recv_stderr_ready():
+                break
+            continue
+        select.select([chan], [], [], poll)
+    exit_status = None
+    if not cancelled and not timed_out and chan.exit_status_ready():
+        exit_status = chan.recv_exit_status()
+    return {
+        "stdout": stdout,
+        "stderr": stderr,
+        "exit_status": exit_status,
+        "cancelled": cancelled,
+        "timed_out": timed_out,
+    }
+
+# --- Streaming Execution ---
+def stream_command(pool, host, port, user, password, command, on_update=None,
+                   cancel=None, max_bytes=1024 * 1024, update_interval=0.25,
+                   exec_timeout=None):
+    start = time.monotonic()
+    deadline = start + exec_timeout if exec_timeout else None
+    chan = pool.exec_command(host, port, user, password, command)
+    try:
+        result = drain_channel(
+            chan, on_update=on_update, update_interval=update_interval,
+            cancel=cancel, deadline=deadline, max_bytes=max_bytes,
+        )
+    finally:
+        # Also reached when Streamlit interrupts the script (e.g. a Cancel
+        # click), which tears down the remote command with the channel.
+        chan.close()
+    if on_update:
+        on_update(result["stdout"], result["stderr"])
+    result["seconds"] = round(time.monotonic() - start, 2)
+    result["stdout_bytes"] = result["stdout"].total_bytes
+    result["stderr_bytes"] = result["stderr"].total_bytes
+    return result
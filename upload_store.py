@@ -0,0 +1,262 @@
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+# --- Chunked, Deduplicating Uploads ---
+# Uploads are written chunk by chunk to a partial file in the store and hashed
+# (SHA-256) as the bytes arrive, so nothing is held in memory and nothing is
+# read twice. A partial upload keeps its offset on disk: a client that comes
+# back with the same upload key continues from there. On completion the bytes
+# move into a content-addressed object store; if that content is already
+# there, the new copy is dropped and the target is a hard link to the stored
+# object. Targets appear atomically (temp name in the target folder, then
+# rename) and existing files are not overwritten unless asked.
+
+class UploadError(RuntimeError):
+    pass
+
+class _Upload:
+    def __init__(self, upload_id, target_dir, name, size, overwrite):
+        self.id = upload_id
+        self.target_dir = target_dir
+        self.name = name
+        self.size = size
+        self.overwrite = overwrite
+        self.received = 0
+        self.hasher = hashlib.sha256()
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+
+class UploadStore:
+    def __init__(self, root, max_age=24 * 60 * 60):
+        self.root = os.path.abspath(root)
+        self.partial_dir = os.path.join(self.root, "partial")
+        self.objects_dir = os.path.join(self.root, "objects")
+        self.max_age = max_age
+        os.makedirs(self.partial_dir, exist_ok=True)
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._uploads = {}
+        self._lock = threading.Lock()
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS objects ("
+                " digest TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+                " created REAL NOT NULL, reuses INTEGER NOT NULL DEFAULT 0)"
+            )
+            db.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value REAL NOT NULL)")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        db = sqlite3.connect(os.path.join(self.root, "store.sqlite3"), timeout=10)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _bump(self, db, name, amount=1):
+        db.execute(
+            "INSERT INTO stats (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", (name, amount),
+        )
+
+    # --- Upload lifecycle ---
+    def begin(self, target_dir, name, size, key, overwrite=False):
+        # `key` identifies the client's file (e.g. name, size and mtime), so a
+        # retried or reloaded upload maps onto the same partial file.
+        name = os.path.basename(name)
+        if not name or name in (".", ".."):
+            raise UploadError("Invalid file name.")
+        target_dir = os.path.abspath(target_dir)
+        if not os.path.isdir(target_dir):
+            raise UploadError(f"Not a directory: {target_dir}")
+        upload_id = hashlib.sha256(
+            json.dumps([target_dir, name, size, key]).encode()
+        ).hexdigest()[:32]
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+            if upload is None:
+                upload = _Upload(upload_id, target_dir, name, size, overwrite)
+                part = self._part_path(upload_id)
+                if os.path.exists(part):
+                    # Resumed after a restart: rebuild the running hash once.
+                    with open(part, "rb") as f:
+                        for block in iter(lambda: f.read(1024 * 1024), b""):
+                            upload.hasher.update(block)
+                            upload.received += len(block)
+                    if upload.received > size:
+                        os.remove(part)
+                        upload = _Upload(upload_id, target_dir, name, size, overwrite)
+                self._uploads[upload_id] = upload
+            upload.overwrite = overwrite
+        return upload_id, upload.received
+
+    def _part_path(self, upload_id):
+        return os.path.join(self.partial_dir, upload_id + ".part")
+
+    def offset(self, upload_id):
+        upload = self._uploads.get(upload_id)
+        return None if upload is None else upload.received
+
+    def is_complete(self, upload_id):
+        upload = self._uploads.get(upload_id)
+        return upload is not None and upload.received == upload.size
+
+    def write(self, upload_id, offset, data):
+        # Appends one chunk; a chunk for the wrong offset is rejected with the
+        # offset the client should resume from.
+        upload = self._uploads.get(upload_id)
+        if upload is None:
+            raise UploadError("Unknown upload; call begin() again.")
+        with upload.lock:
+            if offset != upload.received:
+                return upload.received
+            if upload.received + len(data) > upload.size:
+                raise UploadError("More data than the declared size.")
+            with open(self._part_path(upload_id), "ab") as f:
+                f.write(data)
+            upload.hasher.update(data)
+            upload.received += len(data)
+            return upload.received
+
+    def write_stream(self, upload_id, offset, stream, length, chunk_size=1024 * 1024):
+        # Copies `length` bytes from a file-like object in fixed-size chunks.
+        remaining = length
+        while remaining > 0:
+            block = stream.read(min(chunk_size, remaining))
+            if not block:
+                break
+            new_offset = self.write(upload_id, offset, block)
+            if new_offset != offset + len(block):
+                return new_offset
+            offset = new_offset
+            remaining -= len(block)
+        return offset
+
+    def finish(self, upload_id):
+        # Returns {"path", "digest", "size", "deduplicated", "seconds"}.
+        upload = self._uploads.get(upload_id)
+        if upload is None:
+            raise UploadError("Unknown upload.")
+        with upload.lock:
+            if upload.received != upload.size:
+                raise UploadError(f"Upload incomplete: {upload.received} of {upload.size} bytes.")
+            digest = upload.hasher.hexdigest()
+            part = self._part_path(upload_id)
+            if not os.path.exists(part):
+                # Zero-byte upload: no chunk ever created the file.
+                open(part, "wb").close()
+            obj = self._object_path(digest)
+            with self._connect() as db:
+                deduplicated = self._existing_object(db, digest, upload.size)
+                if deduplicated:
+                    os.remove(part)
+                    db.execute("UPDATE objects SET reuses = reuses + 1 WHERE digest = ?", (digest,))
+                else:
+                    os.makedirs(os.path.dirname(obj), exist_ok=True)
+                    os.replace(part, obj)
+                    db.execute(
+                        "INSERT OR REPLACE INTO objects (digest, size, mtime_ns, created) VALUES (?, ?, ?, ?)",
+                        (digest, upload.size, os.stat(obj).st_mtime_ns, time.time()),
+                    )
+                path = self._place(obj, upload)
+                seconds = time.monotonic() - upload.started
+                self._bump(db, "uploads")
+                self._bump(db, "bytes", upload.size)
+                self._bump(db, "seconds", seconds)
+                if deduplicated:
+                    self._bump(db, "dedup_uploads")
+                    self._bump(db, "dedup_bytes", upload.size)
+        with self._lock:
+            self._uploads.pop(upload_id, None)
+        return {"path": path, "digest": digest, "size": upload.size,
+                "deduplicated": deduplicated, "seconds": round(seconds, 3)}
+
+    def abort(self, upload_id):
+        with self._lock:
+            self._uploads.pop(upload_id, None)
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self._part_path(upload_id))
+
+    def ingest(self, fileobj, target_dir, name, size, overwrite=False, chunk_size=1024 * 1024):
+        # One-shot upload from a file-like object (e.g. st.file_uploader).
+        upload_id, offset = self.begin(target_dir, name, size, key=f"ingest-{time.time_ns()}", overwrite=overwrite)
+        self.write_stream(upload_id, offset, fileobj, size - offset, chunk_size)
+        return self.finish(upload_id)
+
+    # --- Object store ---
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def _existing_object(self, db, digest, size):
+        # An object edited in place through one of its hard links no longer
+        # matches its digest; such objects are evicted rather than reused.
+        row = db.execute("SELECT size, mtime_ns FROM objects WHERE digest = ?", (digest,)).fetchone()
+        obj = self._object_path(digest)
+        try:
+            st = os.stat(obj)
+        except FileNotFoundError:
+            if row:
+                db.execute("DELETE FROM objects WHERE digest = ?", (digest,))
+            return False
+        if row and row == (size, st.st_mtime_ns) and st.st_size == size:
+            return True
+        os.remove(obj)
+        db.execute("DELETE FROM objects WHERE digest = ?", (digest,))
+        return False
+
+    def _place(self, obj, upload):
+        target = os.path.join(upload.target_dir, upload.name)
+        if not upload.overwrite:
+            target = _free_name(target)
+        tmp = os.path.join(upload.target_dir, f".{upload.name}.{upload.id[:8]}.tmp")
+        try:
+            os.link(obj, tmp)
+        except OSError:
+            # Different filesystem (or no hard links): a real copy.
+            shutil.copyfile(obj, tmp)
+        os.replace(tmp, target)
+        return target
+
+    def cleanup(self):
+        # Drops partial uploads nobody has touched for max_age.
+        cutoff = time.time() - self.max_age
+        for name in os.listdir(self.partial_dir):
+            path = os.path.join(self.partial_dir, name)
+            with contextlib.suppress(OSError):
+                if os.stat(path).st_mtime < cutoff:
+                    os.remove(path)
+
+    def stats(self):
+        with self._connect() as db:
+            values = dict(db.execute("SELECT name, value FROM stats").fetchall())
+            objects, stored = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects").fetchone()
+        total = values.get("bytes", 0)
+        seconds = values.get("seconds", 0)
+        return {
+            "uploads": int(values.get("uploads", 0)),
+            "bytes": int(total),
+            "dedup_uploads": int(values.get("dedup_uploads", 0)),
+            "dedup_bytes": int(values.get("dedup_bytes", 0)),
+            "dedup_ratio": values.get("dedup_bytes", 0) / total if total else 0.0,
+            "throughput": total / seconds if seconds else 0.0,
+            "objects": objects,
+            "stored_bytes": stored,
+            "in_progress": len(self._uploads),
+        }
+
+def _free_name(path):
+    # "report.pdf" -> "report (1).pdf", ... when the name is taken.
+    if not os.path.exists(path):
+        return path
+    stem, ext = os.path.splitext(path)
+    n = 1
+    while os.path.exists(f"{stem} ({n}){ext}"):
+        n += 1
+    return f"{stem} ({n}){ext}"